@@ -0,0 +1,219 @@
+
+"""
+Archive Reader
+--------------
+This script provides a small virtual-filesystem layer for the ingestion pipeline.
+Instead of extracting archives to disk, members are streamed straight out of .zip,
+.tar, .tar.gz and .tar.zst archives (including archives nested inside other
+archives) and handed to the preprocessors as read-only file-like objects.
+
+Features included:
+- Streaming access to zip and tar members without temporary files.
+- Recursive descent into nested archives up to a configurable depth.
+- Size and zip-bomb guards based on both archive headers and bytes actually read.
+- Per-member filtering by file extension.
+"""
+
+import io
+import tarfile
+import zipfile
+from collections import namedtuple
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency, only needed for .tar.zst archives
+    zstandard = None
+
+ZIP_SUFFIXES = ('.zip',)
+TAR_SUFFIXES = ('.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz')
+ZSTD_TAR_SUFFIXES = ('.tar.zst', '.tzst')
+ARCHIVE_SUFFIXES = ZIP_SUFFIXES + TAR_SUFFIXES + ZSTD_TAR_SUFFIXES
+
+ArchiveMember = namedtuple('ArchiveMember', ['name', 'size', 'fileobj'])
+
+class ArchiveLimitError(Exception):
+    """
+    Raised when an archive exceeds the configured size, ratio, count or depth limits.
+    """
+
+class ArchiveLimits:
+    """
+    Limits applied while streaming an archive, together with the running totals
+    shared by every nested archive of the same top-level file.
+    """
+    
+    def __init__(self, max_member_size=1024 ** 3, max_total_size=8 * 1024 ** 3,
+                 max_ratio=200, max_members=1000000, max_depth=3):
+        """
+        Args:
+            max_member_size (int): Maximum uncompressed size of a single member in bytes.
+            max_total_size (int): Maximum uncompressed bytes read from one top-level archive.
+            max_ratio (float): Maximum uncompressed/compressed ratio of a zip member.
+            max_members (int): Maximum number of members across all nested archives.
+            max_depth (int): Maximum archive nesting depth.
+        """
+        self.max_member_size = max_member_size
+        self.max_total_size = max_total_size
+        self.max_ratio = max_ratio
+        self.max_members = max_members
+        self.max_depth = max_depth
+        self.total_read = 0
+        self.member_count = 0
+    
+    def fresh(self):
+        """
+        Returns a copy of these limits with the running totals reset.
+        
+        Returns:
+            ArchiveLimits: Limits for a new top-level archive.
+        """
+        return ArchiveLimits(self.max_member_size, self.max_total_size, self.max_ratio,
+                             self.max_members, self.max_depth)
+    
+    def count_member(self, name):
+        """
+        Counts one more archive member against the member limit.
+        
+        Args:
+            name (str): Name of the member, used in the error message.
+        """
+        self.member_count += 1
+        if self.member_count > self.max_members:
+            raise ArchiveLimitError(f"Too many archive members (limit {self.max_members}) at {name}")
+
+class _GuardedReader(io.RawIOBase):
+    """
+    Read-only stream wrapper that enforces the member and total size limits on the
+    bytes actually decompressed, regardless of what the archive headers claim.
+    """
+    
+    def __init__(self, stream, name, limits):
+        self._stream = stream
+        self._name = name
+        self._limits = limits
+        self._member_read = 0
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        size = len(data)
+        self._member_read += size
+        self._limits.total_read += size
+        if self._member_read > self._limits.max_member_size:
+            raise ArchiveLimitError(
+                f"Member {self._name} exceeds {self._limits.max_member_size} bytes when decompressed")
+        if self._limits.total_read > self._limits.max_total_size:
+            raise ArchiveLimitError(
+                f"Archive exceeds {self._limits.max_total_size} decompressed bytes at {self._name}")
+        buffer[:size] = data
+        return size
+
+def _guarded(stream, name, limits):
+    return io.BufferedReader(_GuardedReader(stream, name, limits))
+
+def is_archive(name):
+    """
+    Checks whether a file name has a supported archive suffix.
+    
+    Args:
+        name (str): File or member name.
+    
+    Returns:
+        bool: True if the name looks like a supported archive.
+    """
+    return name.lower().endswith(ARCHIVE_SUFFIXES)
+
+def _iter_zip(fileobj, archive_name, suffixes, limits, depth):
+    if not fileobj.seekable():
+        # Zip central directories live at the end of the file, so the archive must be
+        # buffered; the guard keeps the buffer within the member size limit.
+        fileobj = io.BytesIO(fileobj.read())
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir():
+                continue
+            name = f"{archive_name}/{info.filename}"
+            limits.count_member(name)
+            if info.file_size > limits.max_member_size:
+                raise ArchiveLimitError(f"Member {name} declares {info.file_size} bytes")
+            if info.compress_size and info.file_size / info.compress_size > limits.max_ratio:
+                raise ArchiveLimitError(
+                    f"Member {name} has a compression ratio above {limits.max_ratio}")
+            if not is_archive(info.filename) and suffixes and not info.filename.lower().endswith(suffixes):
+                continue
+            with archive.open(info) as member:
+                yield from _iter_member(name, info.file_size, _guarded(member, name, limits),
+                                        suffixes, limits, depth)
+
+def _iter_tar(fileobj, archive_name, suffixes, limits, depth, mode='r|*'):
+    with tarfile.open(fileobj=fileobj, mode=mode) as archive:
+        for info in archive:
+            if not info.isfile():
+                continue
+            name = f"{archive_name}/{info.name}"
+            limits.count_member(name)
+            if info.size > limits.max_member_size:
+                raise ArchiveLimitError(f"Member {name} declares {info.size} bytes")
+            if not is_archive(info.name) and suffixes and not info.name.lower().endswith(suffixes):
+                continue
+            member = archive.extractfile(info)
+            yield from _iter_member(name, info.size, _guarded(member, name, limits),
+                                    suffixes, limits, depth)
+
+def _iter_zstd_tar(fileobj, archive_name, suffixes, limits, depth):
+    if zstandard is None:
+        raise RuntimeError(f"Reading {archive_name} requires the 'zstandard' package")
+    with zstandard.ZstdDecompressor().stream_reader(fileobj) as stream:
+        yield from _iter_tar(stream, archive_name, suffixes, limits, depth, mode='r|')
+
+def _iter_archive(fileobj, archive_name, suffixes, limits, depth):
+    if depth > limits.max_depth:
+        raise ArchiveLimitError(f"Archive {archive_name} is nested deeper than {limits.max_depth} levels")
+    lowered = archive_name.lower()
+    if lowered.endswith(ZIP_SUFFIXES):
+        yield from _iter_zip(fileobj, archive_name, suffixes, limits, depth)
+    elif lowered.endswith(ZSTD_TAR_SUFFIXES):
+        yield from _iter_zstd_tar(fileobj, archive_name, suffixes, limits, depth)
+    else:
+        yield from _iter_tar(fileobj, archive_name, suffixes, limits, depth)
+
+def _iter_member(name, size, fileobj, suffixes, limits, depth):
+    if is_archive(name):
+        yield from _iter_archive(fileobj, name, suffixes, limits, depth + 1)
+    else:
+        yield ArchiveMember(name, size, fileobj)
+
+def iter_archive_members(archive_path, suffixes=None, limits=None):
+    """
+    Streams the members of an archive, descending into nested archives.
+    
+    Each member's file object is only valid until the next member is requested,
+    because tar archives are read as a single forward-only stream. Consumers that
+    need the data later must read it before advancing the iterator.
+    
+    Args:
+        archive_path (str): Path to a .zip, .tar, .tar.gz or .tar.zst archive.
+        suffixes (tuple): Optional member name suffixes to keep, e.g. ('.json', '.html').
+            Nested archives are always descended into.
+        limits (ArchiveLimits): Size and zip-bomb limits. Defaults to ArchiveLimits().
+    
+    Yields:
+        ArchiveMember: The member's name (prefixed by the archive path), its declared
+        uncompressed size and a binary file-like object streaming its contents.
+    
+    Raises:
+        ArchiveLimitError: If the archive exceeds any of the configured limits.
+    """
+    limits = (limits or ArchiveLimits()).fresh()
+    if suffixes:
+        suffixes = tuple(suffix.lower() for suffix in suffixes)
+    with open(archive_path, 'rb') as file:
+        yield from _iter_archive(file, archive_path, suffixes, limits, depth=0)
+
+# Example usage
+if __name__ == "__main__":
+    archive_path = '/path/to/your/archive.zip'  # Update this to your archive path
+    for member in iter_archive_members(archive_path, suffixes=('.json',)):
+        print(f"{member.name}: {len(member.fileobj.read())} bytes")
@@ -0,0 +1,208 @@
+
+"""
+Config Cache
+------------
+This script provides a shared, hot-reloading cache for the JSON configuration files
+of the platform (ethical guidelines, resource configuration, API keys, performance
+metrics). Each file is parsed, and optionally compiled, once; a background watcher
+checks the files' modification times and swaps in a freshly compiled version when a
+file changes, so long-running workers pick up changes without a restart.
+
+Readers never wait for a reload: they always get the latest completely compiled
+version, and a file that fails to parse during a reload leaves the previous version
+in place. Cached values are shared between callers and must be treated as read-only.
+
+Features included:
+- One parse (and compile) per file version, shared across the process.
+- mtime/size/inode change detection on a background watcher thread.
+- Atomic swap of recompiled versions; failed reloads keep the previous version.
+- Hit, miss, reload and reload error counters.
+"""
+
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+def parse_json(path):
+    """
+    Parses a JSON file.
+    
+    Args:
+        path (str): Path to the JSON file.
+    
+    Returns:
+        object: Parsed document.
+    """
+    with open(path, 'r') as file:
+        return json.load(file)
+
+class ConfigCache:
+    """
+    Process-wide cache of parsed and compiled configuration files.
+    """
+    
+    def __init__(self, poll_interval=1.0):
+        """
+        Args:
+            poll_interval (float): Seconds between checks of the cached files.
+        """
+        self.poll_interval = poll_interval
+        self._entries = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._watcher = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.reload_errors = 0
+    
+    def _load(self, path, compile):
+        signature = _signature(path)
+        value = parse_json(path)
+        if compile is not None:
+            value = compile(value)
+        return signature, value
+    
+    def get(self, path, compile=None):
+        """
+        Returns the cached version of a file, loading it on first use.
+        
+        Args:
+            path (str): Path to the JSON file.
+            compile (callable): Optional function turning the parsed document into the
+                cached value, e.g. ethical_rule_engine.RuleSet.
+        
+        Returns:
+            object: Parsed (and compiled) file contents.
+        """
+        key = (os.path.abspath(path), compile)
+        # Entries are replaced, never mutated, so a plain dictionary read is safe
+        # without the lock; counters are best-effort under contention.
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._load(key[0], compile)
+                self._entries[key] = entry
+        self._ensure_watcher()
+        return entry[1]
+    
+    def check(self):
+        """
+        Reloads every cached file whose modification time, size or inode changed.
+        
+        Returns:
+            int: Number of files reloaded.
+        """
+        reloaded = 0
+        for key, (signature, _) in list(self._entries.items()):
+            path, compile = key
+            try:
+                current = _signature(path)
+            except OSError:
+                current = None
+            # A version that failed to load is only retried once it changes again.
+            if current == signature or (key in self._failed and self._failed[key] == current):
+                continue
+            try:
+                if current is None:
+                    raise FileNotFoundError(f"{path} is missing")
+                entry = self._load(path, compile)
+            except Exception as e:
+                # Any failure, including one raised by the compile function, keeps the last good value.
+                self.reload_errors += 1
+                self._failed[key] = current
+                logger.error(f"Keeping the previous version of {path}: reload failed: {e}")
+                continue
+            self._failed.pop(key, None)
+            with self._lock:
+                if key not in self._entries:
+                    continue
+                self._entries[key] = entry
+            self.reloads += 1
+            reloaded += 1
+            logger.info(f"Reloaded {path}")
+        return reloaded
+    
+    def invalidate(self, path=None):
+        """
+        Drops cached files so they are loaded again on next use.
+        
+        Args:
+            path (str): File to drop, or None to drop every file.
+        """
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            path = os.path.abspath(path)
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+    
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception(f"Config watcher failed: {e}")
+    
+    def _ensure_watcher(self):
+        if self._watcher is not None or self.poll_interval is None:
+            return
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, name='config-watcher', daemon=True)
+                self._watcher.start()
+    
+    def stop(self):
+        """
+        Stops the background watcher.
+        """
+        self._stopped.set()
+        if self._watcher is not None:
+            self._watcher.join()
+    
+    def stats(self):
+        """
+        Returns the cache counters.
+        
+        Returns:
+            dict: Number of cached files, hits, misses, reloads and reload errors.
+        """
+        return {'files': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'reloads': self.reloads, 'reload_errors': self.reload_errors}
+
+default_cache = ConfigCache()
+
+def load_json(path, compile=None):
+    """
+    Returns a file from the shared config cache.
+    
+    Args:
+        path (str): Path to the JSON file.
+        compile (callable): Optional function compiling the parsed document.
+    
+    Returns:
+        object: Cached file contents; shared, so treat it as read-only.
+    """
+    return default_cache.get(path, compile)
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    config_path = "/path/to/resource_config.json"  # Example path
+    print(load_json(config_path))
+    print(default_cache.stats())
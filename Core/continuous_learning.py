@@ -10,44 +10,150 @@ Features included:
 - Periodic model retraining.
 - Model performance evaluation.
 - Performance logging and monitoring.
+
+Retraining is incremental: the deployed model is resumed from its checkpoint and trained on the data that
+arrived since the last watermark plus a replay sample of older data. A full retrain from scratch only happens
+after evaluation has detected drift.
+
+The stages run on an event-driven job runner: ingestion and training use separate worker pools, retraining
+only runs once ingestion has produced new data, evaluation follows every retrain, overlapping runs are
+skipped, and new files or a data-volume threshold in the data directory trigger the stages early.
+
+Paths and Files (Commented Out):
+# Data Directory: /path/to/data/
+# Ingestion Manifest Path: /path/to/ingestion_manifest.sqlite
+# Models Directory: /path/to/models/
+# Holdout Path: /path/to/holdout.csv
 """
 
-import schedule
+import os
 import time
+import shutil
+import logging
+from directory_ingestion_preprocessor import iter_process_directory
+from incremental_training import retrain, check_drift
+from model_evaluation import ModelRegistry, load_holdout, champion_baseline, evaluate_challenger
+from job_runner import JobRunner, DirectoryWatcher
+
+DATA_DIRECTORY = "/path/to/data/"  # Update this to your data directory
+INGESTION_MANIFEST_PATH = "/path/to/ingestion_manifest.sqlite"  # Update this to your manifest path
+MODELS_DIRECTORY = "/path/to/models/"  # Update this to your models directory
+HOLDOUT_PATH = "/path/to/holdout.csv"  # Update this to your holdout set
+LABEL_COLUMN = 'label'
+
+MODEL_REGISTRY = ModelRegistry(MODELS_DIRECTORY)
+TRAINING_STATE_PATH = os.path.join(MODELS_DIRECTORY, 'training_state.json')
 
-def ingest_and_preprocess_continuous_data():
+DAY = 24 * 60 * 60
+WEEK = 7 * DAY
+
+def ingest_and_preprocess_continuous_data(data_directory=DATA_DIRECTORY, manifest_path=INGESTION_MANIFEST_PATH):
     """
     Continuously ingest and preprocess data.
     
     This function should be scheduled to run at regular intervals, ensuring the system has the latest data for training.
+    The ingestion manifest limits each run to the files that are new or changed since the previous run.
+    
+    Args:
+        data_directory (str): Directory receiving new data.
+        manifest_path (str): Path to the shared ingestion manifest.
+    
+    Returns:
+        int: Number of files ingested successfully in this run.
     """
-    # Placeholder for continuous data ingestion and preprocessing logic
-    pass
+    results = iter_process_directory(data_directory, manifest_path=manifest_path)
+    return sum(1 for result in results if result.error is None)
 
-def retrain_model():
+def retrain_model(data_directory=DATA_DIRECTORY):
     """
     Retrain the model with new data.
     
     This function re-trains the ML/DL models with newly ingested and preprocessed data, ensuring the models adapt to new information.
+    The deployed model is warm-started on the data since the last watermark plus a replay sample of older data; a full
+    retrain from scratch only runs when drift was detected by the previous evaluation or no model is deployed yet.
+    
+    Args:
+        data_directory (str): Directory containing the CSV training shards.
+    
+    Returns:
+        dict: Summary of the retrain, or None if there was nothing to train on.
     """
-    # Placeholder for model retraining logic
-    pass
+    output_dir = MODEL_REGISTRY.new_version_dir()
+    try:
+        summary = retrain(data_directory, MODEL_REGISTRY.current(), output_dir, TRAINING_STATE_PATH,
+                          label=LABEL_COLUMN)
+    except Exception:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        raise
+    if summary is None:
+        shutil.rmtree(output_dir, ignore_errors=True)
+        return None
+    # Only a completely written model becomes the challenger.
+    MODEL_REGISTRY.stage(output_dir)
+    return summary
 
-def evaluate_and_update_model():
+def evaluate_and_update_model(holdout_path=HOLDOUT_PATH):
     """
     Evaluate the newly trained model and update if it performs better.
     
     This function evaluates the performance of the newly trained model against the currently deployed model, updating the system's models if the new one performs better.
+    The deployed model's holdout predictions are cached per holdout snapshot, the challenger is scored with early stopping,
+    and promotion swaps the registry's 'current' pointer atomically. The deployed model is then checked for drift on the held-out rows of the latest retrain window; detected drift makes the next
+    retrain a full retrain.
+    
+    Args:
+        holdout_path (str): Path to the labelled holdout CSV file.
+    
+    Returns:
+        bool: True if the challenger was promoted.
     """
-    # Placeholder for model evaluation and update logic
-    pass
+    holdout = load_holdout(holdout_path, label=LABEL_COLUMN)
+    result = evaluate_challenger(MODEL_REGISTRY, holdout)
+    if result is None:
+        return False
+    
+    # The new champion's baseline is computed once here and reused by later evaluations.
+    baseline = champion_baseline(MODEL_REGISTRY, holdout)
+    check_drift(MODEL_REGISTRY.current(), TRAINING_STATE_PATH, label=LABEL_COLUMN,
+                reference_accuracy=baseline['accuracy'])
+    return result.promote
 
-# Scheduling tasks
-schedule.every(1).days.do(ingest_and_preprocess_continuous_data)
-schedule.every(1).weeks.do(retrain_model)
-schedule.every(1).weeks.do(evaluate_and_update_model)
+def build_job_runner(data_directory=DATA_DIRECTORY, retrain_volume_threshold=1024 ** 3, poll_interval=60.0):
+    """
+    Build the job runner and directory watcher driving the continuous learning loop.
+    
+    Ingestion runs daily and whenever new files arrive. Retraining runs weekly, or early once the newly
+    arrived data reaches the volume threshold, but only after ingestion has produced new data since the
+    previous retrain. Evaluation runs after every retrain that produced a new model.
+    
+    Args:
+        data_directory (str): Directory receiving new data.
+        retrain_volume_threshold (int): Bytes of new data that trigger an early retrain.
+        poll_interval (float): Seconds between scans of the data directory.
+    
+    Returns:
+        tuple: (JobRunner, DirectoryWatcher), not yet started.
+    """
+    runner = JobRunner(pools={'ingestion': 1, 'training': 1})
+    runner.add_job('ingest', ingest_and_preprocess_continuous_data, pool='ingestion',
+                   every=DAY, on_events=['new_files'])
+    runner.add_job('retrain', retrain_model, pool='training', depends_on=['ingest'],
+                   every=WEEK, on_events=['data_volume'])
+    runner.add_job('evaluate', evaluate_and_update_model, pool='training', depends_on=['retrain'],
+                   run_after_dependencies=True)
+    watcher = DirectoryWatcher(runner, data_directory, poll_interval=poll_interval,
+                               volume_threshold=retrain_volume_threshold)
+    return runner, watcher
 
 if __name__ == "__main__":
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    logging.basicConfig(level=logging.INFO)
+    runner, watcher = build_job_runner()
+    runner.start()
+    watcher.start()
+    try:
+        while True:
+            time.sleep(60)
+            logging.info(f"Job statistics: {runner.stats()}")
+    except KeyboardInterrupt:
+        watcher.stop()
+        runner.stop()
@@ -0,0 +1,294 @@
+
+"""
+CSV Loader
+----------
+This script provides a memory-efficient loader for large CSV training tables. It
+replaces a default pd.read_csv call, which infers 64-bit and object dtypes and
+holds several copies of the file in memory, with typed, optionally chunked reads.
+
+Features included:
+- Explicit or sample-inferred schemas.
+- Downcasting to compact integer, float32 and categorical dtypes.
+- Chunked reads with consistent categories across chunks.
+- Multi-threaded parsing through the pyarrow engine.
+- A converted Arrow or Parquet cache that later runs memory-map instead of parsing CSV.
+
+Paths and Files (Commented Out):
+# Data Path: /path/to/data.csv
+# Cache Directory: /path/to/cache/
+"""
+
+import os
+import json
+import hashlib
+import logging
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow
+    import pyarrow.feather as feather
+except ImportError:  # Optional dependency, only needed for the pyarrow engine and the cache
+    pyarrow = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMATS = ('arrow', 'parquet')
+
+def infer_schema(data_path, sample_rows=100000, max_category_ratio=0.5):
+    """
+    Infers a compact schema from a sample of a CSV file.
+    
+    Floating point columns become float32 and low-cardinality text columns become
+    categories. Integer and boolean columns use the nullable Int64 and boolean dtypes,
+    since missing values may appear after the sample; integers are narrowed after
+    loading, because a sample cannot prove the range of the full column.
+    
+    Args:
+        data_path (str): Path to the CSV file.
+        sample_rows (int): Number of rows used for inference.
+        max_category_ratio (float): Maximum ratio of distinct values to rows for a text
+            column to be stored as a category.
+    
+    Returns:
+        dict: Mapping of column name to pandas dtype name.
+    """
+    sample = pd.read_csv(data_path, nrows=sample_rows)
+    schema = {}
+    for column, dtype in sample.dtypes.items():
+        if pd.api.types.is_bool_dtype(dtype):
+            schema[column] = 'boolean'
+        elif pd.api.types.is_integer_dtype(dtype):
+            schema[column] = 'Int64'
+        elif pd.api.types.is_float_dtype(dtype):
+            schema[column] = 'float32'
+        elif len(sample) and sample[column].nunique() / len(sample) <= max_category_ratio:
+            schema[column] = 'category'
+        else:
+            schema[column] = 'object'
+    return schema
+
+def downcast_frame(data):
+    """
+    Narrows numeric columns of a DataFrame to the smallest dtype holding their values.
+    
+    Args:
+        data (DataFrame): Data to downcast in place.
+    
+    Returns:
+        DataFrame: The same DataFrame, for chaining.
+    """
+    for column in data.columns:
+        series = data[column]
+        if pd.api.types.is_bool_dtype(series.dtype):
+            continue
+        if pd.api.types.is_integer_dtype(series.dtype):
+            kind = 'unsigned' if len(series) and series.min() >= 0 else 'integer'
+            data[column] = pd.to_numeric(series, downcast=kind)
+        elif pd.api.types.is_float_dtype(series.dtype):
+            data[column] = pd.to_numeric(series, downcast='float')
+    return data
+
+def _concat_chunks(chunks):
+    """
+    Concatenates typed chunks, unifying categorical columns so they stay categorical.
+    
+    Args:
+        chunks (list): DataFrames with identical columns.
+    
+    Returns:
+        DataFrame: The concatenated data.
+    """
+    if not chunks:
+        return pd.DataFrame()
+    categorical = [column for column, dtype in chunks[0].dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+    unified = {column: union_categoricals([chunk[column] for chunk in chunks]) for column in categorical}
+    data = pd.concat([chunk.drop(columns=categorical) for chunk in chunks], ignore_index=True)
+    for column in categorical:
+        data[column] = unified[column]
+    return data[chunks[0].columns]
+
+# Dtypes a column is widened to, in order, when its values do not fit the schema.
+WIDER_DTYPES = {'boolean': 'object', 'Int64': 'float32', 'float32': 'object'}
+
+def _parse_dtypes(schema):
+    """
+    Returns the part of a schema that can be applied while parsing without failing.
+    
+    Text dtypes accept any value; numeric and boolean columns are parsed with pandas'
+    own inference and cast afterwards, so a value that does not fit only widens its column.
+    
+    Args:
+        schema (dict): Mapping of column name to dtype.
+    
+    Returns:
+        dict: Mapping of column name to dtype for the text columns.
+    """
+    return {column: dtype for column, dtype in schema.items() if dtype not in WIDER_DTYPES}
+
+def fit_schema(data, schema, data_path=None):
+    """
+    Casts the numeric and boolean columns of parsed data to a schema, widening a
+    column whose values do not fit its dtype (Int64 to float32, then object) instead
+    of failing. Widened dtypes are written back to the schema, so later chunks and later
+    passes over the file use them.
+    
+    Args:
+        data (DataFrame): Data parsed with _parse_dtypes(schema); cast in place.
+        schema (dict): Mapping of column name to dtype; updated in place.
+        data_path (str): Path of the CSV file, for the log message.
+    
+    Returns:
+        DataFrame: The same DataFrame, for chaining.
+    """
+    for column in data.columns:
+        dtype = schema.get(column)
+        while dtype in WIDER_DTYPES:
+            try:
+                data[column] = data[column].astype(dtype)
+                break
+            except (ValueError, TypeError):
+                widened = WIDER_DTYPES[dtype]
+                logger.warning(f"Column {column!r} of {data_path} does not fit {dtype}; reading it as {widened}")
+                schema[column] = dtype = widened
+    return data
+
+def iter_csv_chunks(data_path, chunksize=1000000, schema=None, usecols=None, widen=None):
+    """
+    Reads a CSV file as a sequence of typed DataFrame chunks.
+    
+    Args:
+        data_path (str): Path to the CSV file.
+        chunksize (int): Number of rows per chunk.
+        schema (dict): Mapping of column name to dtype. Inferred when omitted; an empty
+            mapping reads the columns with pandas' own dtype inference.
+        usecols (list): Optional subset of columns to read.
+        widen (bool): Whether a column whose values do not fit its dtype is widened
+            instead of failing the read (see fit_schema). The schema is updated in place,
+            so a second pass over the file can reuse it. Defaults to True for an inferred
+            schema and False for a given one.
+    
+    Yields:
+        DataFrame: The next chunk of rows.
+    """
+    if widen is None:
+        widen = schema is None
+    if schema is None:
+        schema = infer_schema(data_path)
+    dtype = _parse_dtypes(schema) if widen else schema
+    with pd.read_csv(data_path, dtype=dtype or None, usecols=usecols, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield fit_schema(chunk, schema, data_path) if widen else chunk
+
+def _cache_path(data_path, cache_dir, schema, downcast, cache_format):
+    """
+    Builds the cache file path for a CSV file, keyed on its identity and load options.
+    
+    Args:
+        data_path (str): Path to the CSV file.
+        cache_dir (str): Directory holding converted copies.
+        schema (dict): Schema used for the conversion, or None.
+        downcast (bool): Whether numeric columns were downcast.
+        cache_format (str): Either 'arrow' or 'parquet'.
+    
+    Returns:
+        str: Path of the cached copy.
+    """
+    stat = os.stat(data_path)
+    key = json.dumps([os.path.abspath(data_path), stat.st_size, stat.st_mtime_ns, schema, downcast], sort_keys=True)
+    digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+    stem = os.path.splitext(os.path.basename(data_path))[0]
+    return os.path.join(cache_dir, f"{stem}-{digest}.{cache_format}")
+
+def _read_cache(cache_path, cache_format):
+    if cache_format == 'arrow':
+        table = feather.read_table(cache_path, memory_map=True)
+        return table.to_pandas(split_blocks=True)
+    return pd.read_parquet(cache_path, memory_map=True)
+
+def _write_cache(data, cache_path, cache_format):
+    temporary_path = f"{cache_path}.tmp-{os.getpid()}"
+    if cache_format == 'arrow':
+        # Uncompressed Arrow IPC can be memory-mapped without decoding.
+        feather.write_feather(data, temporary_path, compression='uncompressed')
+    else:
+        data.to_parquet(temporary_path, index=False)
+    os.replace(temporary_path, cache_path)
+
+def _read_typed(data_path, schema, chunksize, engine, downcast, usecols, widen):
+    if chunksize:
+        original = dict(schema)
+        chunks = [
+            downcast_frame(chunk) if downcast else chunk
+            for chunk in iter_csv_chunks(data_path, chunksize=chunksize, schema=schema, usecols=usecols,
+                                         widen=widen)
+        ]
+        # Chunks read before a column was widened still hold the narrower dtype.
+        widened = {column: dtype for column, dtype in schema.items() if original.get(column) != dtype}
+        if widened:
+            chunks = [chunk.astype({c: d for c, d in widened.items() if c in chunk.columns}) for chunk in chunks]
+        return _concat_chunks(chunks)
+    if not widen:
+        return pd.read_csv(data_path, dtype=schema or None, usecols=usecols, engine=engine)
+    data = pd.read_csv(data_path, dtype=_parse_dtypes(schema) or None, usecols=usecols, engine=engine)
+    return fit_schema(data, schema, data_path)
+
+def load_csv(data_path, schema=None, chunksize=None, engine=None, downcast=True,
+             cache_dir=None, cache_format='arrow', usecols=None):
+    """
+    Loads a CSV file into a compactly typed DataFrame.
+    
+    Args:
+        data_path (str): Path to the CSV file.
+        schema (dict): Mapping of column name to dtype. Inferred from a sample when omitted;
+            a column whose later rows do not fit its inferred dtype is widened on its own
+            (see fit_schema), while a given schema is enforced.
+        chunksize (int): Read the file in chunks of this many rows to bound parser memory.
+        engine (str): pandas parser engine; 'pyarrow' parses with multiple threads.
+            Ignored when chunksize is set, since the pyarrow engine cannot read in chunks.
+        downcast (bool): Whether to narrow numeric columns after loading.
+        cache_dir (str): Directory for a converted Arrow/Parquet copy. When set, later
+            calls memory-map the copy instead of parsing the CSV again.
+        cache_format (str): Either 'arrow' (uncompressed Arrow IPC) or 'parquet'.
+        usecols (list): Optional subset of columns to read.
+    
+    Returns:
+        DataFrame: Loaded data.
+    """
+    if cache_format not in CACHE_FORMATS:
+        raise ValueError(f"Unknown cache format: {cache_format!r} (expected one of {CACHE_FORMATS})")
+    if cache_dir is not None and pyarrow is None:
+        raise ImportError("Caching converted CSV files requires the 'pyarrow' package")
+    
+    cache_path = None
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_key_schema = {'schema': schema, 'usecols': usecols}
+        cache_path = _cache_path(data_path, cache_dir, cache_key_schema, downcast, cache_format)
+        if os.path.exists(cache_path):
+            logger.info(f"Loading cached copy of {data_path} from {cache_path}")
+            return _read_cache(cache_path, cache_format)
+    
+    inferred = schema is None
+    if inferred:
+        schema = infer_schema(data_path)
+    
+    data = _read_typed(data_path, schema, chunksize, engine, downcast, usecols, widen=inferred)
+    
+    if downcast:
+        # Chunks may have been narrowed to different widths; settle on one per column.
+        downcast_frame(data)
+    
+    if cache_path is not None:
+        _write_cache(data, cache_path, cache_format)
+        logger.info(f"Cached {data_path} as {cache_path}")
+    return data
+
+# Example usage
+if __name__ == "__main__":
+    data_path = "/path/to/data.csv"  # Example path
+    cache_dir = "/path/to/cache/"  # Example path
+    data = load_csv(data_path, chunksize=1000000, cache_dir=cache_dir)
+    print(data.dtypes)
+    print(f"Memory usage: {data.memory_usage(deep=True).sum() / 1024 ** 2:.1f} MB")
@@ -3,56 +3,146 @@
 Directory Ingestion and Preprocessing
 -------------------------------------
 This script navigates through a specified directory, ingests its contents,
-unzips any compressed files, and preprocesses the contents based on specified
-rules or functions.
+streams the members of any compressed archives, and preprocesses the contents
+based on specified rules or functions.
 
 It demonstrates a generic approach that can be adapted for specific data types
-and preprocessing tasks.
+and preprocessing tasks. The directory walk and the preprocessing stages run on the
+pipelined ingestion engine, so large trees are processed in parallel and results are
+streamed back as they become available. An optional ingestion manifest restricts
+reruns to new or changed files. Archive members are read straight out of the
+archive as file-like objects, so nothing is extracted to disk.
 """
 
-import os
 import zipfile
+import logging
+from functools import partial
+from archive_reader import ArchiveLimits, is_archive, iter_archive_members
+from ingestion_engine import scan_files, ingest_paths
+from ingestion_manifest import FileManifest
+
+logger = logging.getLogger(__name__)
 
 def unzip_file(zip_path, extract_path):
     """
     Unzips a file to a specified location.
     
+    The ingestion pipeline streams archive members instead; this is kept for callers
+    that need the extracted files on disk.
+    
     Args:
         zip_path (str): Path to the zip file.
         extract_path (str): Path where to extract the contents.
     """
     with zipfile.ZipFile(zip_path, 'r') as zip_ref:
         zip_ref.extractall(extract_path)
-    print(f"Extracted: {zip_path}")
+    logger.debug(f"Extracted: {zip_path}")
 
-def preprocess_file(file_path):
+def preprocess_file(file_path, fileobj=None):
     """
     Placeholder function for file preprocessing.
     Customize this function based on the specific preprocessing needs.
     
     Args:
-        file_path (str): Path to the file to preprocess.
+        file_path (str): Path to the file to preprocess. For archive members this is
+            the archive path followed by the member name.
+        fileobj (file): Optional binary file-like object with the file's contents,
+            used for archive members that only exist inside an archive.
+    
+    Returns:
+        str: Path of the preprocessed file. Replace with the actual preprocessing output.
+    """
+    # Example: Log the file path. Replace with actual preprocessing logic.
+    logger.debug(f"Preprocessing file: {file_path}")
+    return file_path
+
+def ingest_file(file_path, member_suffixes=None, archive_limits=None):
+    """
+    Runs the preprocessing stage that matches a single file.
+    
+    Archive members are streamed out of the archive and preprocessed one by one;
+    every other file is preprocessed directly.
+    
+    Args:
+        file_path (str): Path to the file to ingest.
+        member_suffixes (tuple): Optional archive member suffixes to preprocess.
+        archive_limits (ArchiveLimits): Size and zip-bomb limits for archives.
+    
+    Returns:
+        object: Result of the preprocessing stage, or a list of per-member results
+        for archives.
     """
-    # Example: Print the file path. Replace with actual preprocessing logic.
-    print(f"Preprocessing file: {file_path}")
+    if is_archive(file_path):
+        return [
+            preprocess_file(member.name, member.fileobj)
+            for member in iter_archive_members(file_path, suffixes=member_suffixes, limits=archive_limits)
+        ]
+    # Preprocess the file
+    return preprocess_file(file_path)
+
+def iter_process_directory(directory_path, workers=None, executor='thread', queue_size=1024,
+                           manifest_path=None, use_hash=False, member_suffixes=None, archive_limits=None):
+    """
+    Navigates through a directory and ingests every file on a worker pool, yielding
+    results as they complete.
+    
+    When a manifest path is given, only files that are new or changed since the
+    previous run are ingested. A file is recorded in the manifest only after it was
+    ingested without error, and files deleted since the previous run are reported
+    once the whole directory has been consumed.
+    
+    Args:
+        directory_path (str): Path to the directory to process.
+        workers (int): Number of pool workers, or None for the pool default.
+        executor (str): Either 'thread' or 'process'.
+        queue_size (int): Maximum number of scanned paths buffered ahead of the pool.
+        manifest_path (str): Optional path to the shared ingestion manifest.
+        use_hash (bool): Whether the manifest compares content hashes.
+        member_suffixes (tuple): Optional archive member suffixes to preprocess.
+        archive_limits (ArchiveLimits): Size and zip-bomb limits for archives.
+    
+    Yields:
+        IngestionResult: The path, the preprocessing result and any exception raised.
+    """
+    paths = scan_files(directory_path)
+    handler = partial(ingest_file, member_suffixes=member_suffixes,
+                      archive_limits=archive_limits or ArchiveLimits())
+    if manifest_path is None:
+        yield from ingest_paths(paths, handler, workers=workers,
+                                executor=executor, queue_size=queue_size)
+        return
+    
+    with FileManifest(manifest_path, scope='directory', use_hash=use_hash) as manifest:
+        fingerprints = {}
+        
+        def changed_paths():
+            for file_path, fingerprint in manifest.select_changed(paths):
+                fingerprints[file_path] = fingerprint
+                yield file_path
+        
+        for result in ingest_paths(changed_paths(), handler, workers=workers,
+                                   executor=executor, queue_size=queue_size):
+            fingerprint = fingerprints.pop(result.path)
+            if result.error is None:
+                manifest.record(result.path, fingerprint)
+            yield result
+        
+        for deleted_path in manifest.sweep_deleted(directory_path):
+            logger.info(f"File deleted since last ingestion: {deleted_path}")
 
-def process_directory(directory_path):
+def process_directory(directory_path, workers=None, executor='thread', manifest_path=None):
     """
-    Navigates through a directory, unzips compressed files, and preprocesses contents.
+    Navigates through a directory, streams archive members, and preprocesses contents.
     
     Args:
         directory_path (str): Path to the directory to process.
+        workers (int): Number of pool workers, or None for the pool default.
+        executor (str): Either 'thread' or 'process'.
+        manifest_path (str): Optional path to the shared ingestion manifest.
     """
-    for root, dirs, files in os.walk(directory_path):
-        for filename in files:
-            file_path = os.path.join(root, filename)
-            
-            if filename.endswith('.zip'):
-                # Unzip the file
-                unzip_file(file_path, root)
-            else:
-                # Preprocess the file
-                preprocess_file(file_path)
+    for _ in iter_process_directory(directory_path, workers=workers, executor=executor,
+                                    manifest_path=manifest_path):
+        pass
 
 # Example usage
 if __name__ == "__main__":
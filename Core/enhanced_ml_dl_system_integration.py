@@ -7,9 +7,9 @@ into an autonomous software platform. It provides examples for data ingestion, p
 evaluation processes, leveraging popular Python libraries and frameworks.
 
 Features included:
-- Example of data ingestion using pandas.
+- Example of data ingestion using pandas, with compact dtypes and an optional columnar cache.
 - Data preprocessing using scikit-learn.
-- Model training with a simple neural network using TensorFlow/Keras.
+- Model training with a simple neural network using TensorFlow/Keras, optionally fed by a tf.data pipeline.
 - Basic model evaluation.
 
 Paths and Files (Commented Out):
@@ -17,36 +17,54 @@ Paths and Files (Commented Out):
 # Models Path: /path/to/models/
 """
 
-import pandas as pd
+import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import tensorflow as tf
 from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Dense
+from tensorflow.keras.layers import Dense, Input
 from tensorflow.keras.optimizers import Adam
+from csv_loader import load_csv
+from tf_input_pipeline import ThroughputCallback, make_array_dataset
 
-def ingest_data(data_path):
+def ingest_data(data_path, schema=None, chunksize=None, engine=None, downcast=True, cache_dir=None, cache_format='arrow'):
     """
     Ingest data from the specified path using pandas.
     
+    The data is loaded with compact dtypes (see csv_loader.load_csv). Pass engine='pyarrow'
+    for multi-threaded parsing, a chunksize to bound parser memory, and a cache_dir to keep a
+    converted Arrow/Parquet copy that later runs memory-map instead of parsing the CSV again.
+    
     Args:
         data_path (str): Path to the data file.
+        schema (dict): Optional mapping of column name to dtype. Inferred from a sample when omitted.
+        chunksize (int): Optional number of rows per chunk.
+        engine (str): Optional pandas parser engine, e.g. 'pyarrow'.
+        downcast (bool): Whether to narrow numeric columns to the smallest fitting dtype.
+        cache_dir (str): Optional directory for the converted copy.
+        cache_format (str): Either 'arrow' or 'parquet'.
     
     Returns:
         DataFrame: Ingested data.
     """
-    data = pd.read_csv(data_path)
+    data = load_csv(data_path, schema=schema, chunksize=chunksize, engine=engine, downcast=downcast,
+                    cache_dir=cache_dir, cache_format=cache_format)
     return data
 
-def preprocess_data(data):
+def preprocess_data(data, return_scaler=False):
     """
     Preprocess the ingested data using scikit-learn.
     
+    This keeps several copies of the data in memory. For datasets that do not fit, use
+    streaming_preprocessor.preprocess_data_out_of_core, which writes memory-mapped arrays.
+    
     Args:
         data (DataFrame): Ingested data to preprocess.
+        return_scaler (bool): Whether to also return the fitted scaler, e.g. for serving.
     
     Returns:
-        tuple: Tuple containing the preprocessed features and labels.
+        tuple: Tuple containing the preprocessed features and labels, followed by the
+        fitted scaler when requested.
     """
     X = data.drop('label', axis=1)
     y = data['label']
@@ -56,44 +74,73 @@ def preprocess_data(data):
     X_train_scaled = scaler.fit_transform(X_train)
     X_test_scaled = scaler.transform(X_test)
     
+    if return_scaler:
+        return X_train_scaled, X_test_scaled, y_train, y_test, scaler
     return X_train_scaled, X_test_scaled, y_train, y_test
 
-def build_model(input_shape):
+def build_model(input_shape, hidden_units=(64, 64), jit_compile=None, mixed_precision=False):
     """
     Build a simple neural network model for classification using TensorFlow/Keras.
     
     Args:
         input_shape (int): The shape of the input features.
+        hidden_units (tuple): Width of each hidden Dense layer.
+        jit_compile (bool): Whether to compile the training step with XLA. None keeps the Keras default.
+        mixed_precision (bool): Whether hidden layers compute in bfloat16 (with float32
+            variables), which is the fast reduced-precision type on CPUs. The output layer
+            always computes in float32 for a numerically stable loss.
     
     Returns:
         Sequential: Compiled neural network model.
     """
-    model = Sequential([
-        Dense(64, activation='relu', input_shape=(input_shape,)),
-        Dense(64, activation='relu'),
-        Dense(1, activation='sigmoid')
-    ])
+    hidden_dtype = 'mixed_bfloat16' if mixed_precision else None
+    model = Sequential(
+        [Input(shape=(input_shape,))]
+        + [Dense(units, activation='relu', dtype=hidden_dtype) for units in hidden_units]
+        + [Dense(1, activation='sigmoid', dtype='float32')]
+    )
     
-    model.compile(optimizer=Adam(), loss='binary_crossentropy', metrics=['accuracy'])
+    compile_options = {} if jit_compile is None else {'jit_compile': jit_compile}
+    model.compile(optimizer=Adam(), loss='binary_crossentropy', metrics=['accuracy'], **compile_options)
     return model
 
-def train_and_evaluate_model(model, X_train, X_test, y_train, y_test):
+def train_and_evaluate_model(model, X_train, X_test, y_train, y_test, epochs=10, batch_size=32,
+                             use_pipeline=False, shuffle_buffer=None, cache=False):
     """
     Train the model and evaluate its performance.
     
+    In pipeline mode the arrays (which may be memory-mapped, see streaming_preprocessor) are fed
+    through a tf.data pipeline with a parallel gather, optional shuffling and caching, and
+    prefetching, so input preparation overlaps with training and the data does not need to fit in RAM.
+    
     Args:
         model (Sequential): The neural network model to train.
         X_train (ndarray): Training features.
         X_test (ndarray): Testing features.
         y_train (Series): Training labels.
         y_test (Series): Testing labels.
+        epochs (int): Number of training epochs.
+        batch_size (int): Number of examples per batch.
+        use_pipeline (bool): Whether to feed the model through a tf.data pipeline.
+        shuffle_buffer (int): Shuffle buffer size in pipeline mode, or None to keep the order.
+        cache (bool or str): Caching mode in pipeline mode, see tf_input_pipeline.make_array_dataset.
     
     Returns:
-        dict: Training history and evaluation results.
+        dict: Training history, evaluation results and examples per second for each epoch.
     """
-    history = model.fit(X_train, y_train, validation_data=(X_test, y_test), epochs=10, batch_size=32)
-    evaluation = model.evaluate(X_test, y_test, verbose=0)
-    return {"history": history, "evaluation": evaluation}
+    throughput = ThroughputCallback(len(X_train))
+    if use_pipeline:
+        y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+        train_dataset = make_array_dataset(X_train, y_train, batch_size=batch_size,
+                                           shuffle_buffer=shuffle_buffer, cache=cache)
+        test_dataset = make_array_dataset(X_test, y_test, batch_size=batch_size)
+        history = model.fit(train_dataset, validation_data=test_dataset, epochs=epochs, callbacks=[throughput])
+        evaluation = model.evaluate(test_dataset, verbose=0)
+    else:
+        history = model.fit(X_train, y_train, validation_data=(X_test, y_test), epochs=epochs,
+                            batch_size=batch_size, callbacks=[throughput])
+        evaluation = model.evaluate(X_test, y_test, verbose=0)
+    return {"history": history, "evaluation": evaluation, "examples_per_second": throughput.epoch_throughput}
 
 # Example usage
 if __name__ == "__main__":
@@ -9,46 +9,80 @@ autonomy features.
 Features included:
 - Ethical decision-making framework.
 - Integration with autonomous operations.
+- Guidelines compiled once into an indexed rule set (see ethical_rule_engine).
 
 Paths and Files (Commented Out):
 # Ethical Guidelines Path: /path/to/ethical_guidelines.json
 """
 
-import json
+from config_cache import load_json
+from ethical_rule_engine import RuleSet, compile_guidelines
 
 def load_ethical_guidelines(guidelines_path):
     """
     Load ethical guidelines from a JSON file.
     
+    The file is parsed once and served from the shared config cache, which reloads it in the background when it
+    changes on disk. The returned dict is shared and must not be modified.
+    
     Args:
         guidelines_path (str): Path to the ethical guidelines JSON file.
     
     Returns:
         dict: Ethical guidelines.
     """
-    with open(guidelines_path, 'r') as file:
-        return json.load(file)
+    return load_json(guidelines_path)
+
+def load_compiled_guidelines(guidelines_path):
+    """
+    Load ethical guidelines compiled into an indexed rule set.
+    
+    The rule set is compiled once per version of the file; when the file changes, a recompiled rule set is
+    swapped in by the config cache.
+    
+    Args:
+        guidelines_path (str): Path to the ethical guidelines JSON file.
+    
+    Returns:
+        RuleSet: Compiled ethical guidelines.
+    """
+    return load_json(guidelines_path, compile=RuleSet)
 
 def make_ethical_decision(context, guidelines):
     """
     Make a decision based on the provided context and ethical guidelines.
     
+    The guidelines are compiled into an indexed rule set on first use, so each decision only evaluates the
+    rules matching the context's situation and indexed values, and repeated contexts are answered from a cache.
+    
     Args:
         context (dict): Information about the decision context.
-        guidelines (dict): Ethical guidelines.
+        guidelines (dict or RuleSet): Ethical guidelines, or a rule set compiled by compile_guidelines.
     
     Returns:
         str: Decision made based on ethical guidelines.
     """
-    # Placeholder for ethical decision-making logic
-    return "Decision made in accordance with ethical guidelines."
+    return compile_guidelines(guidelines).decide(context)
+
+def make_ethical_decisions(contexts, guidelines):
+    """
+    Make decisions for a batch of contexts.
+    
+    Args:
+        contexts (list): Decision contexts.
+        guidelines (dict or RuleSet): Ethical guidelines, or a compiled rule set.
+    
+    Returns:
+        list: Decisions, in the order of the contexts.
+    """
+    return compile_guidelines(guidelines).decide_many(contexts)
 
 # Example usage
 if __name__ == "__main__":
     guidelines_path = "/path/to/ethical_guidelines.json"  # Example path
     context = {"situation": "data_usage", "options": ["option1", "option2"]}  # Example context
     
-    ethical_guidelines = load_ethical_guidelines(guidelines_path)
+    ethical_guidelines = load_compiled_guidelines(guidelines_path)
     decision = make_ethical_decision(context, ethical_guidelines)
     
     print(f"Ethical Decision: {decision}")
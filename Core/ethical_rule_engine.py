@@ -0,0 +1,458 @@
+
+"""
+Ethical Rule Engine
+-------------------
+This script compiles the ethical guidelines used by ethical_decision_maker into an
+indexed rule set, so a decision only evaluates the rules that can match its context
+instead of scanning every guideline.
+
+Guidelines format:
+    {
+        "rules": [
+            {
+                "id": "no-pii-without-consent",
+                "situation": "data_usage",
+                "conditions": {"data_type": ["pii", "health"], "consent": false,
+                               "risk_score": {">=": 0.5}},
+                "decision": "Reject: personal data requires consent.",
+                "priority": 100
+            }
+        ],
+        "default_decision": "Decision made in accordance with ethical guidelines."
+    }
+
+A condition value is matched by equality, a list by membership, and an object by
+operators ('==', '!=', '<', '<=', '>', '>=', 'in', 'not_in', 'exists'). A rule without
+a situation (or with "*") applies to every situation. The matching rule with the
+highest priority wins; ties go to the rule listed first.
+
+Features included:
+- Rules bucketed by situation and indexed by one equality or membership predicate.
+- Compiled condition predicates.
+- Batch evaluation over lists of contexts.
+- LRU cache of decisions keyed on the context restricted to the keys rules refer to.
+- Microbenchmark of decisions per second against a linear scan.
+"""
+
+import time
+import random
+import logging
+import operator
+import functools
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DECISION = "Decision made in accordance with ethical guidelines."
+ANY_SITUATION = '*'
+
+Decision = namedtuple('Decision', ['decision', 'rule_id'])
+
+_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, allowed: value in allowed,
+    'not_in': lambda value, excluded: value not in excluded,
+}
+
+_MISSING = object()
+
+def _compile_condition(key, spec):
+    """
+    Compiles one condition into a predicate over a context.
+    
+    Args:
+        key (str): Context key the condition refers to.
+        spec (object): Literal, list of allowed values or operator object.
+    
+    Returns:
+        callable: Predicate taking a context dict.
+    """
+    if isinstance(spec, list):
+        allowed = frozenset(_freeze(value) for value in spec)
+        return lambda context: _freeze(context.get(key, _MISSING)) in allowed
+    if not isinstance(spec, dict):
+        return lambda context: context.get(key, _MISSING) == spec
+    
+    tests = []
+    for name, operand in spec.items():
+        if name == 'exists':
+            continue
+        if name not in _OPERATORS:
+            raise ValueError(f"Unknown operator {name!r} in condition on {key!r}")
+        if name in ('in', 'not_in'):
+            operand = frozenset(_freeze(value) for value in operand)
+        tests.append((_OPERATORS[name], operand))
+    must_exist = spec.get('exists', True)
+    
+    def predicate(context):
+        value = context.get(key, _MISSING)
+        if value is _MISSING:
+            return not must_exist
+        if not must_exist:
+            return False
+        try:
+            return all(test(_freeze(value), operand) for test, operand in tests)
+        except TypeError:
+            # Incomparable types, e.g. a string compared with a number.
+            return False
+    return predicate
+
+def _freeze(value):
+    """
+    Converts a context value into a hashable equivalent.
+    
+    Args:
+        value (object): Context value.
+    
+    Returns:
+        object: Hashable value.
+    """
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, set):
+        return frozenset(_freeze(item) for item in value)
+    return value
+
+class CompiledRule:
+    """
+    A guideline rule with compiled predicates.
+    """
+    
+    def __init__(self, rule, rank):
+        self.id = rule.get('id', f"rule-{rank}")
+        self.situation = rule.get('situation', ANY_SITUATION)
+        self.decision = rule['decision']
+        self.conditions = dict(rule.get('conditions', {}))
+        self.priority = rule.get('priority', 0)
+        self.rank = rank
+        self.predicates = [_compile_condition(key, spec) for key, spec in self.conditions.items()]
+    
+    def index_key(self):
+        """
+        Picks the condition the rule is indexed by.
+        
+        Returns:
+            tuple: (key, values) of an equality or membership condition, or None if the
+            rule has none.
+        """
+        for key, spec in self.conditions.items():
+            if isinstance(spec, list):
+                return key, [_freeze(value) for value in spec]
+            if not isinstance(spec, dict):
+                return key, [spec]
+        return None
+    
+    def matches(self, context):
+        return all(predicate(context) for predicate in self.predicates)
+
+class RuleSet:
+    """
+    Guidelines compiled into rules bucketed by situation and indexed by predicate.
+    
+    For every situation bucket, each rule is registered under the values of one of its
+    equality or membership conditions; rules without such a condition are kept in a
+    residual list. A decision looks up the context's values in the bucket of its
+    situation and in the wildcard bucket and evaluates only those candidates, in
+    priority order, until one matches.
+    """
+    
+    def __init__(self, guidelines, cache_size=65536):
+        """
+        Args:
+            guidelines (dict): Guidelines in the format described in the module docstring.
+            cache_size (int): Maximum number of cached decisions, 0 to disable caching.
+        """
+        rules = [CompiledRule(rule, position) for position, rule in enumerate(guidelines.get('rules', []))]
+        # Rank by descending priority, then by position in the guidelines.
+        rules.sort(key=lambda rule: (-rule.priority, rule.rank))
+        for rank, rule in enumerate(rules):
+            rule.rank = rank
+        self.rules = rules
+        self.default_decision = guidelines.get('default_decision', DEFAULT_DECISION)
+        
+        self._buckets = {}
+        for rule in rules:
+            bucket = self._buckets.setdefault(rule.situation, {'indexed': {}, 'residual': []})
+            index_key = rule.index_key()
+            if index_key is None:
+                bucket['residual'].append(rule)
+                continue
+            key, values = index_key
+            for value in values:
+                bucket['indexed'].setdefault(key, {}).setdefault(value, []).append(rule)
+        
+        # Only the keys some rule refers to can change a decision, so the cache key is
+        # the context restricted to them.
+        self.keys = sorted({'situation'} | {key for rule in rules for key in rule.conditions})
+        self._cached = functools.lru_cache(maxsize=cache_size)(self._evaluate_normalized) if cache_size else None
+    
+    def _candidates(self, context):
+        candidates = []
+        for situation in (context.get('situation', ANY_SITUATION), ANY_SITUATION):
+            bucket = self._buckets.get(situation)
+            if bucket is None:
+                continue
+            candidates.extend(bucket['residual'])
+            for key, index in bucket['indexed'].items():
+                value = context.get(key, _MISSING)
+                if value is _MISSING:
+                    continue
+                candidates.extend(index.get(_freeze(value), ()))
+            if situation == ANY_SITUATION:
+                break
+        return candidates
+    
+    def evaluate_uncached(self, context):
+        """
+        Evaluates a context without the decision cache.
+        
+        Args:
+            context (dict): Decision context.
+        
+        Returns:
+            Decision: The decision and the id of the rule that made it (None for the default).
+        """
+        candidates = self._candidates(context)
+        candidates.sort(key=lambda rule: rule.rank)
+        for rule in candidates:
+            if rule.matches(context):
+                return Decision(rule.decision, rule.id)
+        return Decision(self.default_decision, None)
+    
+    def normalize(self, context):
+        """
+        Builds the cache key of a context.
+        
+        Args:
+            context (dict): Decision context.
+        
+        Returns:
+            tuple: Hashable (key, value) pairs of the keys the rules refer to.
+        """
+        return tuple((key, _freeze(context[key])) for key in self.keys if key in context)
+    
+    def _evaluate_normalized(self, normalized):
+        return self.evaluate_uncached(dict(normalized))
+    
+    def evaluate(self, context):
+        """
+        Evaluates a context, using the decision cache when enabled.
+        
+        Args:
+            context (dict): Decision context.
+        
+        Returns:
+            Decision: The decision and the id of the rule that made it.
+        """
+        if self._cached is None:
+            return self.evaluate_uncached(context)
+        return self._cached(self.normalize(context))
+    
+    def decide(self, context):
+        """
+        Returns only the decision text for a context.
+        
+        Args:
+            context (dict): Decision context.
+        
+        Returns:
+            str: Decision.
+        """
+        return self.evaluate(context).decision
+    
+    def decide_many(self, contexts):
+        """
+        Decides a batch of contexts. Contexts with the same normalized form are
+        evaluated once.
+        
+        Args:
+            contexts (list): Decision contexts.
+        
+        Returns:
+            list: Decisions, in the order of the contexts.
+        """
+        decided = {}
+        results = []
+        for context in contexts:
+            normalized = self.normalize(context)
+            if normalized not in decided:
+                decided[normalized] = (self._cached(normalized) if self._cached is not None
+                                       else self.evaluate_uncached(context))
+            results.append(decided[normalized].decision)
+        return results
+    
+    def cache_info(self):
+        """
+        Returns the decision cache statistics.
+        
+        Returns:
+            CacheInfo: hits, misses, maxsize and currsize, or None if caching is disabled.
+        """
+        return self._cached.cache_info() if self._cached is not None else None
+
+_compiled = {}
+
+def compile_guidelines(guidelines, cache_size=65536):
+    """
+    Compiles guidelines into a RuleSet, reusing the rule set already compiled for the
+    same guidelines object.
+    
+    The guidelines are treated as immutable once compiled.
+    
+    Args:
+        guidelines (dict or RuleSet): Loaded guidelines, or an already compiled rule set.
+        cache_size (int): Maximum number of cached decisions.
+    
+    Returns:
+        RuleSet: Compiled rule set.
+    """
+    if isinstance(guidelines, RuleSet):
+        return guidelines
+    entry = _compiled.get(id(guidelines))
+    # The guidelines object is kept in the entry so its id cannot be reused.
+    if entry is not None and entry[0] is guidelines:
+        return entry[1]
+    if len(_compiled) >= 16:
+        _compiled.clear()
+    rule_set = RuleSet(guidelines, cache_size=cache_size)
+    _compiled[id(guidelines)] = (guidelines, rule_set)
+    return rule_set
+
+def _compile_linear(guidelines):
+    """
+    Compiles the conditions of every rule for _linear_decision, in guideline order.
+    """
+    return [
+        (rule.get('situation', ANY_SITUATION),
+         [_compile_condition(key, spec) for key, spec in rule.get('conditions', {}).items()],
+         -rule.get('priority', 0), rule['decision'])
+        for rule in guidelines['rules']
+    ]
+
+def _linear_decision(context, rules, default_decision=DEFAULT_DECISION):
+    """
+    Reference implementation scanning every rule, used by the benchmark.
+    
+    Args:
+        context (dict): Decision context.
+        rules (list): Rules compiled by _compile_linear, so only the scan is measured.
+        default_decision (str): Decision when no rule matches.
+    """
+    best = None
+    for position, (situation, predicates, priority, decision) in enumerate(rules):
+        if situation not in (context.get('situation'), ANY_SITUATION):
+            continue
+        if not all(predicate(context) for predicate in predicates):
+            continue
+        rank = (priority, position)
+        if best is None or rank < best[0]:
+            best = (rank, decision)
+    return best[1] if best else default_decision
+
+def generate_guidelines(n_rules=1000, n_situations=20, n_values=50, seed=0):
+    """
+    Generates synthetic guidelines for benchmarking.
+    
+    Args:
+        n_rules (int): Number of rules.
+        n_situations (int): Number of distinct situations.
+        n_values (int): Number of distinct values per context key.
+        seed (int): Random seed.
+    
+    Returns:
+        dict: Guidelines.
+    """
+    rng = random.Random(seed)
+    rules = []
+    for index in range(n_rules):
+        rules.append({
+            'id': f"rule-{index}",
+            'situation': f"situation-{rng.randrange(n_situations)}",
+            'conditions': {
+                'actor': f"actor-{rng.randrange(n_values)}",
+                'data_type': [f"type-{rng.randrange(n_values)}" for _ in range(3)],
+                'risk_score': {'>=': round(rng.random(), 2)},
+            },
+            'decision': f"decision-{index}",
+            'priority': rng.randrange(10),
+        })
+    return {'rules': rules, 'default_decision': DEFAULT_DECISION}
+
+def generate_contexts(n_contexts=100000, n_situations=20, n_values=50, n_distinct=None, seed=1):
+    """
+    Generates synthetic decision contexts for benchmarking.
+    
+    Args:
+        n_contexts (int): Number of contexts.
+        n_situations (int): Number of distinct situations.
+        n_values (int): Number of distinct values per context key.
+        n_distinct (int): Number of distinct contexts to draw from, or None for all random.
+        seed (int): Random seed.
+    
+    Returns:
+        list: Contexts.
+    """
+    rng = random.Random(seed)
+    
+    def context():
+        return {
+            'situation': f"situation-{rng.randrange(n_situations)}",
+            'actor': f"actor-{rng.randrange(n_values)}",
+            'data_type': f"type-{rng.randrange(n_values)}",
+            'risk_score': round(rng.random(), 2),
+            'options': ['option1', 'option2'],
+        }
+    if n_distinct is None:
+        return [context() for _ in range(n_contexts)]
+    distinct = [context() for _ in range(n_distinct)]
+    return [rng.choice(distinct) for _ in range(n_contexts)]
+
+def benchmark_decisions(n_rules=1000, n_contexts=20000, n_distinct=1000, linear_contexts=500):
+    """
+    Measures decisions per second of a linear scan, the indexed rule set, and the
+    indexed rule set with its decision cache.
+    
+    Args:
+        n_rules (int): Number of synthetic rules.
+        n_contexts (int): Number of contexts decided per measurement.
+        n_distinct (int): Number of distinct contexts in the cached measurement.
+        linear_contexts (int): Number of contexts decided by the (slow) linear scan.
+    
+    Returns:
+        dict: Decisions per second for 'linear', 'indexed', 'cached' and 'batch'.
+    """
+    guidelines = generate_guidelines(n_rules)
+    contexts = generate_contexts(n_contexts)
+    repeated = generate_contexts(n_contexts, n_distinct=n_distinct)
+    
+    def rate(decide, batch):
+        start = time.perf_counter()
+        for context in batch:
+            decide(context)
+        return len(batch) / (time.perf_counter() - start)
+    
+    linear_rules = _compile_linear(guidelines)
+    default_decision = guidelines.get('default_decision', DEFAULT_DECISION)
+    results = {'linear': rate(lambda context: _linear_decision(context, linear_rules, default_decision),
+                              contexts[:linear_contexts])}
+    results['indexed'] = rate(RuleSet(guidelines, cache_size=0).decide, contexts)
+    results['cached'] = rate(RuleSet(guidelines).decide, repeated)
+    rule_set = RuleSet(guidelines)
+    start = time.perf_counter()
+    rule_set.decide_many(repeated)
+    results['batch'] = len(repeated) / (time.perf_counter() - start)
+    for name, decisions_per_second in results.items():
+        logger.info(f"{name}: {decisions_per_second:,.0f} decisions/s with {n_rules} rules")
+    return results
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark_decisions())
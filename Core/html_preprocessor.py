@@ -11,6 +11,7 @@ It demonstrates basic web scraping techniques using BeautifulSoup.
 
 import os
 from bs4 import BeautifulSoup
+from ingestion_manifest import incremental_paths
 
 def preprocess_html_content(html_content):
     """
@@ -47,24 +48,31 @@ def read_and_process_html_file(file_path):
     processed_content = preprocess_html_content(html_content)
     return processed_content
 
-def process_directory(directory_path):
+def process_directory(directory_path, manifest_path=None):
     """
     Searches for HTML files in the specified directory, reading and preprocessing
     each file's contents.
     
+    When a manifest path is given, only files that are new or changed since the
+    previous run are processed, and deleted files are reported.
+    
     Args:
         directory_path (str): Path to the directory containing HTML files.
+        manifest_path (str): Optional path to the shared ingestion manifest.
     
     Returns:
-        list: A list of preprocessed data from all HTML files in the directory.
+        list: A list of preprocessed data from all (new or changed) HTML files in the directory.
     """
     preprocessed_data_list = []
+    file_paths = [
+        os.path.join(directory_path, filename)
+        for filename in os.listdir(directory_path)
+        if filename.endswith('.html')
+    ]
     
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.html'):
-            file_path = os.path.join(directory_path, filename)
-            processed_content = read_and_process_html_file(file_path)
-            preprocessed_data_list.append(processed_content)
+    for file_path in incremental_paths(file_paths, manifest_path, 'html', directory_path):
+        processed_content = read_and_process_html_file(file_path)
+        preprocessed_data_list.append(processed_content)
     
     return preprocessed_data_list
 
@@ -0,0 +1,319 @@
+
+"""
+Incremental Training
+--------------------
+This script provides warm-start incremental retraining for the continuous learning
+loop. Instead of retraining from scratch every week, the deployed model is resumed
+from its checkpoint and trained only on the data shards that arrived since the last
+watermark, mixed with a replay sample of older data to limit forgetting. A full
+retrain from scratch only happens when drift has been detected (or when no model has
+been deployed yet).
+
+Training data is expected as append-only CSV shards with a 'label' column in a data
+directory; a shard is new when its modification time is past the watermark.
+
+Features included:
+- Persistent training state with a shard watermark.
+- Warm-start training from the deployed checkpoint with a replay sample.
+- Drift detection from accuracy drops and feature mean shifts, measured on a part of
+  each new data window that is held out of training.
+- Logging of wall-clock time and compute saved against a full retrain.
+
+Paths and Files (Commented Out):
+# Data Directory: /path/to/data/
+# Models Directory: /path/to/models/
+# Training State Path: /path/to/models/training_state.json
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import StandardScaler
+from csv_loader import load_csv
+from streaming_preprocessor import hash_split
+from ingestion_engine import scan_files
+from enhanced_ml_dl_system_integration import build_model
+from inference_server import save_inference_artifacts, load_inference_artifacts
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILENAME = 'model.keras'
+SCALER_FILENAME = 'scaler.joblib'
+
+def load_training_state(state_path):
+    """
+    Loads the persistent training state.
+    
+    Args:
+        state_path (str): Path to the training state JSON file.
+    
+    Returns:
+        dict: Training state, empty if no state has been saved yet.
+    """
+    if not os.path.exists(state_path):
+        return {}
+    with open(state_path, 'r') as file:
+        return json.load(file)
+
+def save_training_state(state_path, state):
+    """
+    Atomically saves the training state.
+    
+    Args:
+        state_path (str): Path to the training state JSON file.
+        state (dict): Training state.
+    """
+    temporary_path = f"{state_path}.tmp"
+    with open(temporary_path, 'w') as file:
+        json.dump(state, file, indent=2)
+    os.replace(temporary_path, state_path)
+
+def list_shards(data_directory):
+    """
+    Lists the CSV training shards of a data directory, oldest first.
+    
+    Args:
+        data_directory (str): Directory containing CSV shards.
+    
+    Returns:
+        list: (path, mtime_ns) tuples sorted by modification time.
+    """
+    shards = [(path, os.stat(path).st_mtime_ns) for path in scan_files(data_directory, suffixes=('.csv',))]
+    return sorted(shards, key=lambda shard: shard[1])
+
+def read_shards(paths):
+    """
+    Reads and concatenates CSV shards.
+    
+    Args:
+        paths (list): Shard paths.
+    
+    Returns:
+        DataFrame: Rows of all shards.
+    """
+    frames = [load_csv(path) for path in paths]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+def sample_replay(paths, n_rows, seed=42):
+    """
+    Draws a replay sample of roughly n_rows rows from older shards.
+    
+    Shards are visited in random order and sampled uniformly, so only as many old
+    shards are read as are needed to fill the sample.
+    
+    Args:
+        paths (list): Paths of previously trained shards.
+        n_rows (int): Target number of replay rows.
+        seed (int): Sampling seed.
+    
+    Returns:
+        DataFrame: Replay rows.
+    """
+    rng = random.Random(seed)
+    paths = list(paths)
+    rng.shuffle(paths)
+    samples, collected = [], 0
+    for path in paths:
+        if collected >= n_rows:
+            break
+        shard = load_csv(path)
+        take = min(len(shard), n_rows - collected)
+        samples.append(shard.sample(n=take, random_state=rng.randrange(2 ** 31)))
+        collected += take
+    return pd.concat(samples, ignore_index=True) if samples else pd.DataFrame()
+
+def _split_features(data, label):
+    X = data.drop(columns=label).to_numpy(dtype=np.float32)
+    y = data[label].to_numpy(dtype=np.float32)
+    return X, y
+
+def window_holdout_mask(n_rows, fraction, seed=42):
+    """
+    Selects the rows of a data window that are held out of training for drift checks.
+    
+    Args:
+        n_rows (int): Number of rows in the window, in shard order.
+        fraction (float): Fraction of rows held out.
+        seed (int): Seed of the hash split.
+    
+    Returns:
+        ndarray: Boolean mask, True for held-out rows.
+    """
+    return hash_split(np.arange(n_rows), fraction, seed)
+
+def detect_drift(model, scaler, data, label='label', reference_accuracy=None, max_accuracy_drop=0.05,
+                 max_mean_shift=0.5):
+    """
+    Checks new data for drift against the deployed model.
+    
+    Two signals are used: the accuracy of the deployed model on the new data compared
+    with its reference (holdout) accuracy, and the shift of each feature's mean in
+    units of the training standard deviation, taken from the fitted scaler.
+    
+    Args:
+        model (Sequential): Deployed model.
+        scaler (StandardScaler): Scaler fitted on the deployed model's training data.
+        data (DataFrame): New labelled data.
+        label (str): Name of the label column.
+        reference_accuracy (float): Accuracy of the deployed model on the holdout set.
+        max_accuracy_drop (float): Largest tolerated accuracy drop.
+        max_mean_shift (float): Largest tolerated standardized mean shift of any feature.
+    
+    Returns:
+        dict: 'drift' flag, the accuracy on new data and the largest mean shift.
+    """
+    X, y = _split_features(data, label)
+    X_scaled = scaler.transform(X)
+    mean_shift = float(np.max(np.abs(X_scaled.mean(axis=0)))) if len(X_scaled) else 0.0
+    _, accuracy = model.evaluate(X_scaled, y, batch_size=4096, verbose=0)
+    accuracy_drop = (reference_accuracy - accuracy) if reference_accuracy is not None else 0.0
+    drift = accuracy_drop > max_accuracy_drop or mean_shift > max_mean_shift
+    if drift:
+        logger.warning(f"Drift detected: accuracy {accuracy:.4f} (reference {reference_accuracy}), "
+                       f"largest mean shift {mean_shift:.2f} standard deviations")
+    return {'drift': drift, 'accuracy': float(accuracy), 'max_mean_shift': mean_shift}
+
+def check_drift(deployed_dir, state_path, label='label', reference_accuracy=None, **thresholds):
+    """
+    Checks the data window of the latest retrain for drift and records the result.
+    
+    Only the rows of the window that retrain() held out of training are used, so the
+    deployed model is measured on data it has not been fitted to. When drift is found,
+    the next call to retrain() trains from scratch.
+    
+    Args:
+        deployed_dir (str): Directory holding the deployed model and scaler.
+        state_path (str): Path to the training state JSON file.
+        label (str): Name of the label column.
+        reference_accuracy (float): Holdout accuracy of the deployed model.
+        **thresholds: max_accuracy_drop and max_mean_shift, see detect_drift.
+    
+    Returns:
+        dict: Result of detect_drift, or None if there was nothing to check.
+    """
+    state = load_training_state(state_path)
+    window = state.get('last_window', [])
+    holdout = state.get('window_holdout')
+    if not window or not holdout or not os.path.exists(os.path.join(deployed_dir, MODEL_FILENAME)):
+        return None
+    if not all(os.path.exists(path) for path in window):
+        # The held-out rows are identified by their position in the whole window.
+        logger.warning("Shards of the last training window are missing; skipping the drift check")
+        return None
+    data = read_shards(window)
+    data = data[window_holdout_mask(len(data), holdout['fraction'], holdout['seed'])]
+    if not len(data):
+        return None
+    model, scaler = load_inference_artifacts(os.path.join(deployed_dir, MODEL_FILENAME),
+                                             os.path.join(deployed_dir, SCALER_FILENAME))
+    result = detect_drift(model, scaler, data, label=label, reference_accuracy=reference_accuracy, **thresholds)
+    state['drift_detected'] = result['drift']
+    save_training_state(state_path, state)
+    return result
+
+def _train_full(data, label, epochs, batch_size):
+    X, y = _split_features(data, label)
+    scaler = StandardScaler()
+    X_scaled = scaler.fit_transform(X)
+    model = build_model(X.shape[1])
+    model.fit(X_scaled, y, epochs=epochs, batch_size=batch_size, verbose=0)
+    return model, scaler
+
+def _train_warm(model, scaler, data, label, epochs, batch_size):
+    # The deployed scaler is kept as is: refitting it would shift the inputs the
+    # resumed weights were trained on.
+    X, y = _split_features(data, label)
+    model.fit(scaler.transform(X), y, epochs=epochs, batch_size=batch_size, shuffle=True, verbose=0)
+    return model, scaler
+
+def retrain(data_directory, deployed_dir, output_dir, state_path, label='label', replay_ratio=0.25,
+            warm_epochs=2, full_epochs=10, batch_size=256, seed=42, drift_holdout=0.1):
+    """
+    Retrains the model incrementally, or from scratch when drift was detected.
+    
+    Args:
+        data_directory (str): Directory containing CSV training shards.
+        deployed_dir (str): Directory holding the deployed model and scaler, or None.
+        output_dir (str): Directory receiving the retrained model and scaler.
+        state_path (str): Path to the training state JSON file.
+        label (str): Name of the label column.
+        replay_ratio (float): Replay rows drawn from older shards per new row.
+        warm_epochs (int): Epochs over the new data and replay sample in incremental mode.
+        full_epochs (int): Epochs over all data in a full retrain.
+        batch_size (int): Number of examples per batch.
+        seed (int): Replay sampling and holdout seed.
+        drift_holdout (float): Fraction of the new rows held out of training for check_drift.
+    
+    Returns:
+        dict: Summary of the run, or None if there was no new data and no drift.
+    """
+    state = load_training_state(state_path)
+    watermark = state.get('watermark_ns', 0)
+    shards = list_shards(data_directory)
+    new_shards = [path for path, mtime_ns in shards if mtime_ns > watermark]
+    old_shards = [path for path, mtime_ns in shards if mtime_ns <= watermark]
+    has_deployed = deployed_dir is not None and os.path.exists(os.path.join(deployed_dir, MODEL_FILENAME))
+    full = state.get('drift_detected', False) or not has_deployed
+    
+    if not new_shards and not full:
+        logger.info("No new training data since the last watermark; skipping retrain")
+        return None
+    
+    start = time.perf_counter()
+    new_data = read_shards(new_shards)
+    held_out = window_holdout_mask(len(new_data), drift_holdout, seed)
+    new_train = new_data[~held_out]
+    if full:
+        old_data = read_shards(old_shards)
+        data = pd.concat([old_data, new_train], ignore_index=True) if len(old_data) else new_train
+        model, scaler = _train_full(data, label, full_epochs, batch_size)
+        examples = len(data) * full_epochs
+        total_rows = len(old_data) + len(new_data)
+    else:
+        replay = sample_replay(old_shards, int(len(new_train) * replay_ratio), seed=seed)
+        data = pd.concat([new_train, replay], ignore_index=True) if len(replay) else new_train
+        model, scaler = load_inference_artifacts(os.path.join(deployed_dir, MODEL_FILENAME),
+                                                 os.path.join(deployed_dir, SCALER_FILENAME))
+        model, scaler = _train_warm(model, scaler, data, label, warm_epochs, batch_size)
+        examples = len(data) * warm_epochs
+        total_rows = state.get('total_rows', 0) + len(new_data)
+    elapsed = time.perf_counter() - start
+    
+    os.makedirs(output_dir, exist_ok=True)
+    save_inference_artifacts(model, scaler, os.path.join(output_dir, MODEL_FILENAME),
+                             os.path.join(output_dir, SCALER_FILENAME))
+    
+    summary = {'mode': 'full' if full else 'incremental', 'seconds': elapsed, 'examples_processed': examples,
+               'new_shards': len(new_shards), 'total_rows': total_rows}
+    if full:
+        state['seconds_per_example'] = elapsed / examples if examples else None
+    else:
+        full_examples = total_rows * full_epochs
+        summary['compute_saved'] = 1 - examples / full_examples if full_examples else 0.0
+        if state.get('seconds_per_example'):
+            summary['estimated_seconds_saved'] = state['seconds_per_example'] * full_examples - elapsed
+    logger.info(f"Retrain summary: {summary}")
+    
+    state.update({
+        'watermark_ns': max([mtime_ns for _, mtime_ns in shards], default=watermark),
+        'total_rows': total_rows,
+        'drift_detected': False,
+        'last_window': new_shards,
+        'window_holdout': {'fraction': drift_holdout, 'seed': seed},
+        'last_retrain': summary,
+    })
+    save_training_state(state_path, state)
+    return summary
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    data_directory = "/path/to/data/"  # Example path
+    models_dir = "/path/to/models/"  # Example path
+    summary = retrain(data_directory, os.path.join(models_dir, 'deployed'), os.path.join(models_dir, 'challenger'),
+                      os.path.join(models_dir, 'training_state.json'))
+    print(summary)
@@ -0,0 +1,371 @@
+
+"""
+Inference Server
+----------------
+This script serves predictions from the classifier built by
+enhanced_ml_dl_system_integration. The saved model and the fitted StandardScaler are
+loaded once, and concurrent requests are grouped by a dynamic micro-batcher: a batch
+is dispatched as soon as it reaches the maximum batch size or the oldest request has
+waited for the maximum wait window, whichever comes first.
+
+Features included:
+- Asyncio prediction API with dynamic micro-batching.
+- In-process feature scaling with the training-time StandardScaler.
+- A minimal local HTTP/1.1 JSON endpoint built on asyncio streams.
+- p50/p99 latency and throughput reporting.
+- Optional export to TFLite (or ONNX, when tf2onnx is installed) for faster CPU inference.
+
+Paths and Files (Commented Out):
+# Model Path: /path/to/models/classifier.keras
+# Scaler Path: /path/to/models/scaler.joblib
+"""
+
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+import joblib
+import numpy as np
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+def save_inference_artifacts(model, scaler, model_path, scaler_path):
+    """
+    Saves a trained model and its fitted scaler for serving.
+    
+    Args:
+        model (Sequential): Trained model.
+        scaler (StandardScaler): Scaler fitted on the training features.
+        model_path (str): Destination of the Keras model file.
+        scaler_path (str): Destination of the scaler file.
+    """
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+
+def load_inference_artifacts(model_path, scaler_path):
+    """
+    Loads a saved model and its fitted scaler.
+    
+    Args:
+        model_path (str): Path to the saved Keras model.
+        scaler_path (str): Path to the saved scaler.
+    
+    Returns:
+        tuple: (model, scaler).
+    """
+    model = tf.keras.models.load_model(model_path)
+    scaler = joblib.load(scaler_path)
+    return model, scaler
+
+def export_tflite(model, tflite_path, quantize=False):
+    """
+    Converts a Keras model to a TFLite flatbuffer for faster CPU inference.
+    
+    Args:
+        model (Sequential): Trained model.
+        tflite_path (str): Destination of the .tflite file.
+        quantize (bool): Whether to quantize the weights to int8 (dynamic range
+            quantization). This makes the file about four times smaller and usually
+            faster, but the weights lose precision, so predicted probabilities can
+            differ from the Keras model and borderline predictions can flip. Compare
+            both models on a holdout set before serving a quantized one.
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    if quantize:
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    with open(tflite_path, 'wb') as file:
+        file.write(converter.convert())
+
+def export_onnx(model, onnx_path):
+    """
+    Converts a Keras model to ONNX. Requires the optional tf2onnx package.
+    
+    Args:
+        model (Sequential): Trained model.
+        onnx_path (str): Destination of the .onnx file.
+    """
+    try:
+        import tf2onnx
+    except ImportError as e:
+        raise ImportError("Exporting to ONNX requires the 'tf2onnx' package") from e
+    input_signature = [tf.TensorSpec([None, model.input_shape[-1]], tf.float32, name='features')]
+    tf2onnx.convert.from_keras(model, input_signature=input_signature, output_path=onnx_path)
+
+class TFLitePredictor:
+    """
+    Callable wrapper running batches through a TFLite interpreter.
+    """
+    
+    def __init__(self, tflite_path, num_threads=None):
+        """
+        Args:
+            tflite_path (str): Path to the .tflite file.
+            num_threads (int): Number of interpreter threads, or None for the default.
+        """
+        self._interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=num_threads)
+        self._input = self._interpreter.get_input_details()[0]
+        self._output = self._interpreter.get_output_details()[0]
+        self._batch_size = None
+    
+    def __call__(self, features):
+        if features.shape[0] != self._batch_size:
+            self._interpreter.resize_tensor_input(self._input['index'], features.shape)
+            self._interpreter.allocate_tensors()
+            self._batch_size = features.shape[0]
+        self._interpreter.set_tensor(self._input['index'], features)
+        self._interpreter.invoke()
+        return self._interpreter.get_tensor(self._output['index'])
+
+class LatencyStats:
+    """
+    Rolling latency and throughput statistics over the most recent requests.
+    """
+    
+    def __init__(self, window=10000):
+        """
+        Args:
+            window (int): Number of most recent requests kept for the percentiles.
+        """
+        self._latencies = deque(maxlen=window)
+        self._completions = deque(maxlen=window)
+        self.total_requests = 0
+        self.total_batches = 0
+    
+    def record_batch(self, latencies):
+        """
+        Records the latencies of the requests answered by one batch.
+        
+        Args:
+            latencies (list): Per-request latency in seconds.
+        """
+        now = time.perf_counter()
+        self._latencies.extend(latencies)
+        self._completions.extend([now] * len(latencies))
+        self.total_requests += len(latencies)
+        self.total_batches += 1
+    
+    def snapshot(self):
+        """
+        Summarizes the recorded requests.
+        
+        Returns:
+            dict: p50/p99 latency in milliseconds, throughput in requests per second over
+            the window, and request and batch totals.
+        """
+        if not self._latencies:
+            return {'p50_ms': None, 'p99_ms': None, 'requests_per_second': 0.0,
+                    'total_requests': self.total_requests, 'total_batches': self.total_batches,
+                    'average_batch_size': 0.0}
+        p50, p99 = np.percentile(np.fromiter(self._latencies, dtype=np.float64), [50, 99])
+        span = self._completions[-1] - self._completions[0]
+        return {
+            'p50_ms': float(p50) * 1000,
+            'p99_ms': float(p99) * 1000,
+            'requests_per_second': (len(self._completions) - 1) / span if span > 0 else 0.0,
+            'total_requests': self.total_requests,
+            'total_batches': self.total_batches,
+            'average_batch_size': self.total_requests / self.total_batches,
+        }
+
+class InferenceServer:
+    """
+    Asyncio inference service with dynamic micro-batching.
+    
+    Requests submitted through predict() are queued; a background task groups them into
+    batches of at most `max_batch_size`, waiting at most `max_wait_ms` after the first
+    request of a batch, and runs scaling and the model on a worker thread so the event
+    loop keeps accepting requests while a batch is computed.
+    """
+    
+    def __init__(self, model, scaler=None, max_batch_size=64, max_wait_ms=2.0, predictor=None):
+        """
+        Args:
+            model (Sequential): Trained model. Ignored when a predictor is given.
+            scaler (StandardScaler): Fitted scaler applied to raw features, or None if the
+                features arrive already scaled.
+            max_batch_size (int): Maximum number of requests per batch.
+            max_wait_ms (float): Maximum time the first request of a batch waits for more.
+            predictor (callable): Optional batch prediction function, e.g. a TFLitePredictor.
+        """
+        self.model = model
+        self.scaler = scaler
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.predictor = predictor or (lambda features: model(features, training=False).numpy())
+        self.stats = LatencyStats()
+        # Requests are validated on submission, so one malformed request cannot fail a whole batch.
+        if scaler is not None:
+            self.n_features = scaler.n_features_in_
+        elif predictor is None:
+            self.n_features = model.input_shape[-1]
+        else:
+            self.n_features = None
+        self._queue = None
+        self._batcher = None
+    
+    async def start(self):
+        """
+        Starts the batching task on the running event loop.
+        """
+        self._queue = asyncio.Queue()
+        self._batcher = asyncio.create_task(self._batch_loop())
+    
+    async def stop(self):
+        """
+        Stops the batching task.
+        """
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            self._batcher = None
+    
+    def _predict_batch(self, features):
+        features = np.asarray(features, dtype=np.float32)
+        if self.scaler is not None:
+            features = self.scaler.transform(features).astype(np.float32, copy=False)
+        return np.asarray(self.predictor(features)).reshape(len(features), -1)[:, 0]
+    
+    async def _collect_batch(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Drain whatever is already queued before waiting on the clock.
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            remaining = deadline - asyncio.get_running_loop().time()
+            if len(batch) >= self.max_batch_size or remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect_batch()
+            features = [item[0] for item in batch]
+            try:
+                predictions = await loop.run_in_executor(None, self._predict_batch, features)
+            except Exception as e:
+                logger.error(f"Batch of {len(batch)} requests failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            now = time.perf_counter()
+            for (_, future, submitted), prediction in zip(batch, predictions):
+                if not future.done():
+                    future.set_result(float(prediction))
+            self.stats.record_batch([now - submitted for _, _, submitted in batch])
+    
+    async def predict(self, features):
+        """
+        Predicts the positive-class probability for one example.
+        
+        Args:
+            features (list): Raw (unscaled) feature values of one example.
+        
+        Returns:
+            float: Predicted probability.
+        
+        Raises:
+            ValueError: If the example does not have the model's number of features.
+        """
+        if self._batcher is None:
+            raise RuntimeError("InferenceServer.start() must be awaited before predict()")
+        features = np.asarray(features, dtype=np.float32)
+        if features.ndim != 1 or (self.n_features is not None and len(features) != self.n_features):
+            raise ValueError(f"Expected {self.n_features} feature values, got shape {features.shape}")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((features, future, time.perf_counter()))
+        return await future
+    
+    async def predict_many(self, instances):
+        """
+        Predicts several examples, letting them share batches with other requests.
+        
+        Args:
+            instances (list): Raw feature vectors.
+        
+        Returns:
+            list: Predicted probabilities.
+        """
+        return list(await asyncio.gather(*(self.predict(features) for features in instances)))
+    
+    async def _handle_http(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                
+                status, payload = await self._route(method, path, body)
+                response = json.dumps(payload).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(response)}\r\n\r\n".encode('latin-1') + response
+                )
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError) as e:
+            logger.debug(f"Closing HTTP connection: {e}")
+        finally:
+            writer.close()
+    
+    async def _route(self, method, path, body):
+        if method == 'GET' and path == '/stats':
+            return '200 OK', self.stats.snapshot()
+        if method == 'POST' and path == '/predict':
+            try:
+                request = json.loads(body)
+                predictions = await self.predict_many(request['instances'])
+            except (ValueError, KeyError, TypeError) as e:
+                return '400 Bad Request', {'error': str(e)}
+            return '200 OK', {'predictions': predictions}
+        return '404 Not Found', {'error': f"No route for {method} {path}"}
+    
+    async def serve_http(self, host='127.0.0.1', port=8080):
+        """
+        Serves the HTTP endpoint until cancelled.
+        
+        Routes:
+            POST /predict with {"instances": [[...], ...]} returns {"predictions": [...]}.
+            GET /stats returns the latency and throughput statistics.
+        
+        Args:
+            host (str): Interface to bind.
+            port (int): Port to listen on.
+        """
+        if self._batcher is None:
+            await self.start()
+        server = await asyncio.start_server(self._handle_http, host, port)
+        logger.info(f"Serving predictions on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    model_path = "/path/to/models/classifier.keras"  # Example path
+    scaler_path = "/path/to/models/scaler.joblib"  # Example path
+    
+    model, scaler = load_inference_artifacts(model_path, scaler_path)
+    server = InferenceServer(model, scaler, max_batch_size=128, max_wait_ms=2.0)
+    asyncio.run(server.serve_http(port=8080))
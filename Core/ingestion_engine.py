@@ -0,0 +1,199 @@
+
+"""
+Ingestion Engine
+----------------
+This script provides a pipelined engine for ingesting very large directory trees.
+A producer thread walks the tree with os.scandir and feeds file paths into a bounded
+queue, which applies back-pressure when the workers fall behind. A configurable
+thread or process pool runs the preprocessing stage for every file, and results are
+handed back to the caller as a generator as soon as they are ready.
+
+Features included:
+- Iterative os.scandir tree walk with optional suffix filtering.
+- Bounded queue and bounded in-flight work for constant memory use.
+- Thread or process pool execution of the per-file handler.
+- Lazy, generator-based result delivery.
+"""
+
+import os
+import queue
+import logging
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+logger = logging.getLogger(__name__)
+
+IngestionResult = namedtuple('IngestionResult', ['path', 'value', 'error'])
+
+_END_OF_SCAN = None
+
+def scan_files(directory_path, suffixes=None, recursive=True):
+    """
+    Yields the paths of all regular files below a directory using os.scandir.
+    
+    The walk is iterative so deep trees do not hit the recursion limit, and entries
+    that cannot be read are logged and skipped instead of aborting the scan.
+    
+    Args:
+        directory_path (str): Path to the directory to scan.
+        suffixes (tuple): Optional file name suffixes to keep, e.g. ('.json', '.zip').
+        recursive (bool): Whether to descend into subdirectories.
+    
+    Yields:
+        str: Path of each matching file.
+    """
+    pending = [directory_path]
+    while pending:
+        current = pending.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                pending.append(entry.path)
+                        elif entry.is_file():
+                            if suffixes is None or entry.name.endswith(suffixes):
+                                yield entry.path
+                    except OSError as e:
+                        logger.warning(f"Skipping unreadable entry {entry.path}: {e}")
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {current}: {e}")
+
+def _produce(paths, path_queue, stop_event):
+    """
+    Feeds paths into the bounded queue until the source is exhausted or the
+    consumer asks the producer to stop.
+    
+    Args:
+        paths (iterable): Source of file paths.
+        path_queue (Queue): Bounded queue shared with the consumer.
+        stop_event (Event): Set by the consumer when it stops early.
+    """
+    try:
+        for path in paths:
+            while not stop_event.is_set():
+                try:
+                    path_queue.put(path, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if stop_event.is_set():
+                return
+    except Exception as e:
+        logger.error(f"Directory scan failed: {e}")
+    finally:
+        while not stop_event.is_set():
+            try:
+                path_queue.put(_END_OF_SCAN, timeout=0.1)
+                break
+            except queue.Full:
+                continue
+
+def _create_executor(executor, workers):
+    """
+    Creates the worker pool used by the ingestion engine.
+    
+    Args:
+        executor (str): Either 'thread' or 'process'.
+        workers (int): Number of workers, or None for the pool default.
+    
+    Returns:
+        Executor: The worker pool.
+    """
+    if executor == 'thread':
+        return ThreadPoolExecutor(max_workers=workers)
+    if executor == 'process':
+        return ProcessPoolExecutor(max_workers=workers)
+    raise ValueError(f"Unknown executor type: {executor!r} (expected 'thread' or 'process')")
+
+def ingest_paths(paths, handler, workers=None, executor='thread', queue_size=1024, max_in_flight=None):
+    """
+    Runs a handler over a stream of file paths in a worker pool.
+    
+    The paths are consumed by a producer thread, buffered in a bounded queue, and
+    submitted to the pool with a bounded number of outstanding tasks. Results are
+    yielded in completion order. When the executor is 'process', the handler must be
+    a picklable, module-level function.
+    
+    Args:
+        paths (iterable): Source of file paths, typically scan_files().
+        handler (callable): Function called with each file path.
+        workers (int): Number of pool workers, or None for the pool default.
+        executor (str): Either 'thread' or 'process'.
+        queue_size (int): Maximum number of scanned paths buffered ahead of the pool.
+        max_in_flight (int): Maximum number of submitted but unfinished tasks.
+            Defaults to four times the number of workers.
+    
+    Yields:
+        IngestionResult: The path, the handler's return value and any exception raised.
+    """
+    if max_in_flight is None:
+        max_in_flight = 4 * (workers or os.cpu_count() or 1)
+    pool = _create_executor(executor, workers)
+    
+    path_queue = queue.Queue(maxsize=queue_size)
+    stop_event = threading.Event()
+    producer = threading.Thread(target=_produce, args=(paths, path_queue, stop_event), daemon=True)
+    producer.start()
+    
+    in_flight = {}
+    scan_finished = False
+    try:
+        while in_flight or not scan_finished:
+            while not scan_finished and len(in_flight) < max_in_flight:
+                try:
+                    # Only block on the queue when there is nothing else to wait for.
+                    path = path_queue.get(block=not in_flight, timeout=0.1 if not in_flight else None)
+                except queue.Empty:
+                    break
+                if path is _END_OF_SCAN:
+                    scan_finished = True
+                    break
+                in_flight[pool.submit(handler, path)] = path
+            
+            if not in_flight:
+                continue
+            
+            done, _ = wait(in_flight, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = in_flight.pop(future)
+                error = future.exception()
+                if error is not None:
+                    logger.error(f"Failed to ingest {path}: {error}")
+                    yield IngestionResult(path, None, error)
+                else:
+                    yield IngestionResult(path, future.result(), None)
+    finally:
+        stop_event.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+        producer.join()
+
+def ingest_directory(directory_path, handler, suffixes=None, recursive=True, workers=None,
+                     executor='thread', queue_size=1024, max_in_flight=None):
+    """
+    Scans a directory and runs a handler over every matching file in a worker pool.
+    
+    Args:
+        directory_path (str): Path to the directory to ingest.
+        handler (callable): Function called with each file path.
+        suffixes (tuple): Optional file name suffixes to keep.
+        recursive (bool): Whether to descend into subdirectories.
+        workers (int): Number of pool workers, or None for the pool default.
+        executor (str): Either 'thread' or 'process'.
+        queue_size (int): Maximum number of scanned paths buffered ahead of the pool.
+        max_in_flight (int): Maximum number of submitted but unfinished tasks.
+    
+    Yields:
+        IngestionResult: The path, the handler's return value and any exception raised.
+    """
+    paths = scan_files(directory_path, suffixes=suffixes, recursive=recursive)
+    yield from ingest_paths(paths, handler, workers=workers, executor=executor,
+                            queue_size=queue_size, max_in_flight=max_in_flight)
+
+# Example usage
+if __name__ == "__main__":
+    directory_path = '/path/to/your/directory'  # Update this to your directory path
+    for result in ingest_directory(directory_path, os.path.getsize, workers=8):
+        print(f"{result.path}: {result.value}")
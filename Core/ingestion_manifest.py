@@ -0,0 +1,247 @@
+
+"""
+Ingestion Manifest
+------------------
+This script provides a persistent file-fingerprint manifest that lets the
+preprocessors ingest a directory incrementally. The manifest is a small SQLite
+database recording the path, size, modification time and, optionally, a content
+hash of every file that was processed successfully. On a rerun only new or changed
+files are handed to the preprocessors, and files that disappeared since the last
+run are reported and dropped from the manifest.
+
+Features included:
+- SQLite-backed manifest shared by all preprocessors, namespaced by scope.
+- Cheap size/mtime change detection with optional content hashing.
+- Deleted-file reporting.
+- Generator helper that records a file only after it was processed successfully.
+
+Paths and Files (Commented Out):
+# Manifest Path: /path/to/ingestion_manifest.sqlite
+"""
+
+import os
+import hashlib
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    scope TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    digest TEXT,
+    PRIMARY KEY (scope, path)
+)
+"""
+
+def hash_file(file_path, chunk_size=1024 * 1024):
+    """
+    Computes the BLAKE2b content hash of a file.
+    
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int): Number of bytes read per iteration.
+    
+    Returns:
+        str: Hex digest of the file contents.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FileManifest:
+    """
+    Persistent record of the files a preprocessor has already ingested.
+    
+    A manifest instance is safe to share between the scanning thread and the thread
+    consuming results. Writes are batched and committed every `commit_interval`
+    records and when the manifest is closed.
+    """
+    
+    def __init__(self, manifest_path, scope='default', use_hash=False, commit_interval=1000):
+        """
+        Opens (or creates) a manifest.
+        
+        Args:
+            manifest_path (str): Path to the SQLite manifest file.
+            scope (str): Namespace of the preprocessor using the manifest, so several
+                preprocessors can share one file without seeing each other's entries.
+            use_hash (bool): Whether to compare content hashes when size or mtime changed.
+                Files whose contents are unchanged are then not reprocessed.
+            commit_interval (int): Number of recorded files between commits.
+        """
+        self.manifest_path = manifest_path
+        self.scope = scope
+        self.use_hash = use_hash
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._pending_writes = 0
+        self._seen = set()
+        self._connection = sqlite3.connect(manifest_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(_SCHEMA)
+        self._connection.commit()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def _lookup(self, file_path):
+        with self._lock:
+            return self._connection.execute(
+                'SELECT size, mtime_ns, digest FROM files WHERE scope = ? AND path = ?',
+                (self.scope, file_path)
+            ).fetchone()
+    
+    def _write(self, statement, parameters):
+        with self._lock:
+            self._connection.execute(statement, parameters)
+            self._pending_writes += 1
+            if self._pending_writes >= self.commit_interval:
+                self._connection.commit()
+                self._pending_writes = 0
+    
+    def check(self, file_path):
+        """
+        Checks whether a file is new or changed since it was last recorded.
+        
+        Args:
+            file_path (str): Path to the file.
+        
+        Returns:
+            tuple: The file's current (size, mtime_ns, digest) fingerprint if it needs
+            processing, or None if it is unchanged.
+        """
+        self._seen.add(file_path)
+        stat = os.stat(file_path)
+        stored = self._lookup(file_path)
+        if stored is not None and stored[0] == stat.st_size and stored[1] == stat.st_mtime_ns:
+            return None
+        
+        digest = hash_file(file_path) if self.use_hash else None
+        if stored is not None and digest is not None and digest == stored[2]:
+            # Touched but not modified; remember the new stat so it is not hashed again.
+            self.record(file_path, (stat.st_size, stat.st_mtime_ns, digest))
+            return None
+        return (stat.st_size, stat.st_mtime_ns, digest)
+    
+    def record(self, file_path, fingerprint):
+        """
+        Records a file as successfully processed.
+        
+        Args:
+            file_path (str): Path to the file.
+            fingerprint (tuple): The (size, mtime_ns, digest) returned by check().
+        """
+        size, mtime_ns, digest = fingerprint
+        self._write(
+            'INSERT OR REPLACE INTO files (scope, path, size, mtime_ns, digest) VALUES (?, ?, ?, ?, ?)',
+            (self.scope, file_path, size, mtime_ns, digest)
+        )
+    
+    def select_changed(self, file_paths):
+        """
+        Filters a stream of file paths down to the new or changed ones.
+        
+        Args:
+            file_paths (iterable): Candidate file paths.
+        
+        Yields:
+            tuple: (file_path, fingerprint) for each file that needs processing.
+        """
+        for file_path in file_paths:
+            try:
+                fingerprint = self.check(file_path)
+            except OSError as e:
+                logger.warning(f"Skipping {file_path}: {e}")
+                continue
+            if fingerprint is not None:
+                yield file_path, fingerprint
+    
+    def sweep_deleted(self, directory_path, recursive=True):
+        """
+        Removes and returns the recorded files below a directory that were not seen
+        by check() during this run.
+        
+        Args:
+            directory_path (str): Directory that was scanned.
+            recursive (bool): Whether the scan descended into subdirectories. When it
+                did not, only files directly inside the directory are considered.
+        
+        Returns:
+            list: Paths of the files deleted since the previous run.
+        """
+        prefix = os.path.join(directory_path, '')
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT path FROM files WHERE scope = ?', (self.scope,)
+            ).fetchall()
+            deleted = [
+                path for (path,) in rows
+                if path.startswith(prefix) and path not in self._seen
+                and (recursive or os.sep not in path[len(prefix):])
+            ]
+            self._connection.executemany(
+                'DELETE FROM files WHERE scope = ? AND path = ?',
+                [(self.scope, path) for path in deleted]
+            )
+            self._connection.commit()
+            self._pending_writes = 0
+        return deleted
+    
+    def close(self):
+        """
+        Commits pending writes and closes the manifest.
+        """
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+def incremental_paths(file_paths, manifest_path, scope, directory_path, use_hash=False, recursive=False):
+    """
+    Yields only the new or changed files and records each one once the caller has
+    finished processing it.
+    
+    A file is recorded when the consuming loop asks for the next path, so a file
+    whose processing raises is not recorded and is retried on the next run. Files
+    that were deleted since the previous run are logged once the stream is exhausted.
+    When no manifest path is given every file is yielded.
+    
+    Args:
+        file_paths (iterable): Candidate file paths.
+        manifest_path (str): Path to the SQLite manifest file, or None to disable.
+        scope (str): Namespace of the calling preprocessor.
+        directory_path (str): Directory the candidates were listed from.
+        use_hash (bool): Whether to compare content hashes when size or mtime changed.
+        recursive (bool): Whether the candidates include files from subdirectories.
+    
+    Yields:
+        str: Path of each file that needs processing.
+    """
+    if manifest_path is None:
+        yield from file_paths
+        return
+    
+    with FileManifest(manifest_path, scope=scope, use_hash=use_hash) as manifest:
+        for file_path, fingerprint in manifest.select_changed(file_paths):
+            yield file_path
+            manifest.record(file_path, fingerprint)
+        for deleted_path in manifest.sweep_deleted(directory_path, recursive=recursive):
+            logger.info(f"File deleted since last ingestion: {deleted_path}")
+
+# Example usage
+if __name__ == "__main__":
+    manifest_path = '/path/to/ingestion_manifest.sqlite'  # Update this to your manifest path
+    directory_path = '/path/to/your/directory'  # Update this to your directory path
+    file_paths = [os.path.join(directory_path, name) for name in os.listdir(directory_path)]
+    for file_path in incremental_paths(file_paths, manifest_path, 'example', directory_path):
+        print(f"Changed: {file_path}")
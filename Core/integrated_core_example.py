@@ -15,20 +15,22 @@ Paths and Files (Commented Out):
 # ML Models Directory: /path/to/ml_models/
 """
 
-import json
+from config_cache import load_json
 
 def load_api_keys(config_path):
     """
     Load API keys from a configuration file.
     
+    The file is parsed once and served from the shared config cache, which reloads it in the background when it
+    changes on disk. The returned dict is shared and must not be modified.
+    
     Args:
         config_path (str): Path to the configuration file.
     
     Returns:
         dict: Dictionary containing API keys.
     """
-    with open(config_path, 'r') as file:
-        return json.load(file)
+    return load_json(config_path)
 
 def perform_static_analysis(code_path):
     """
@@ -0,0 +1,384 @@
+
+"""
+Interaction Log
+---------------
+This script provides the append-only interaction log behind
+resource_interaction_allocator.manage_interactions. Interactions are written as JSON
+Lines to size-rotated segment files instead of rewriting one JSON document per
+interaction, so an append costs O(record) regardless of the log size.
+
+Appends from any number of threads are handed to a single writer thread, which
+writes everything queued since its previous commit (plus an optional commit window)
+with one write call and one fsync (group commit); an append returns once its batch
+is durable. A log file is meant to have one InteractionLog per process.
+
+Segments are named after the log path: /path/to/interaction_log.json is stored as
+/path/to/interaction_log.00000001.jsonl, /path/to/interaction_log.00000002.jsonl, ...
+
+Features included:
+- JSON Lines records with a 'timestamp' added by the writer when missing, so the
+  log's own timestamps follow commit order.
+- Group commit: batched writes with one fsync per commit window.
+- Segment rotation by size.
+- Streaming reader filtering by time range, skipping segments outside the range.
+- Benchmark of appends per second under concurrent writers.
+
+Paths and Files (Commented Out):
+# Interaction Log Path: /path/to/interaction_log.json
+"""
+
+import os
+import re
+import json
+import time
+import atexit
+import logging
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+logger = logging.getLogger(__name__)
+
+def _segment_prefix(log_path):
+    return os.path.splitext(log_path)[0]
+
+def list_segments(log_path):
+    """
+    Lists the segment files of a log, oldest first.
+    
+    Args:
+        log_path (str): Log path.
+    
+    Returns:
+        list: (sequence number, segment path) tuples.
+    """
+    prefix = _segment_prefix(log_path)
+    directory = os.path.dirname(prefix) or '.'
+    pattern = re.compile(re.escape(os.path.basename(prefix)) + r'\.(\d{8})\.jsonl$')
+    segments = []
+    if not os.path.isdir(directory):
+        return segments
+    for name in os.listdir(directory):
+        match = pattern.match(name)
+        if match:
+            segments.append((int(match.group(1)), os.path.join(directory, name)))
+    return sorted(segments)
+
+def coerce_timestamp(value):
+    """
+    Converts a record timestamp to seconds since the epoch.
+    
+    Args:
+        value (int, float, datetime or str): Timestamp; strings are ISO 8601, and
+            timestamps without a time zone are taken as UTC.
+    
+    Returns:
+        float: Seconds since the epoch.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            raise ValueError(f"Invalid interaction timestamp: {value!r}") from None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    raise ValueError(f"Invalid interaction timestamp: {value!r}")
+
+def _stamp(body, timestamp):
+    # Adds the commit time to a serialized record that has no timestamp.
+    stamp = b'"timestamp":' + json.dumps(timestamp).encode('utf-8') + b'}\n'
+    return b'{' + stamp if body == b'{}' else body[:-1] + b',' + stamp
+
+class _Batch:
+    """
+    Records waiting for the same commit.
+    """
+    
+    def __init__(self):
+        # Serialized records: complete lines, or (record without timestamp,) tuples
+        # that the writer stamps with the commit time.
+        self.lines = []
+        self.committed = threading.Event()
+        self.error = None
+
+class InteractionLog:
+    """
+    Append-only, group-committed JSON Lines log with segment rotation.
+    """
+    
+    def __init__(self, log_path, segment_size=64 * 1024 * 1024, commit_window=0.0, fsync=True):
+        """
+        Args:
+            log_path (str): Log path; segments are created next to it.
+            segment_size (int): Size in bytes after which a new segment is started.
+            commit_window (float): Extra seconds the writer waits after the first queued
+                record to collect more records into the same commit. With 0, a commit
+                contains whatever was queued while the previous commit was written and
+                fsynced, which already batches concurrent writers; a small window helps
+                on disks with slow fsync.
+            fsync (bool): Whether every commit is flushed to stable storage.
+        """
+        self.log_path = log_path
+        self.segment_size = segment_size
+        self.commit_window = commit_window
+        self.fsync = fsync
+        self.appends = 0
+        self.commits = 0
+        self.bytes_written = 0
+        
+        directory = os.path.dirname(os.path.abspath(log_path))
+        os.makedirs(directory, exist_ok=True)
+        self._directory = directory
+        segments = list_segments(log_path)
+        self._sequence = segments[-1][0] if segments else 1
+        self._fd = None
+        self._size = 0
+        self._open_segment()
+        
+        self._condition = threading.Condition()
+        self._batch = _Batch()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='interaction-log-writer', daemon=True)
+        self._writer.start()
+    
+    def _segment_path(self, sequence):
+        return f"{_segment_prefix(self.log_path)}.{sequence:08d}.jsonl"
+    
+    def _open_segment(self):
+        path = self._segment_path(self._sequence)
+        created = not os.path.exists(path)
+        self._fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = os.fstat(self._fd).st_size
+        if created and self.fsync:
+            # Make the new directory entry durable as well.
+            directory_fd = os.open(self._directory, os.O_RDONLY)
+            try:
+                os.fsync(directory_fd)
+            finally:
+                os.close(directory_fd)
+    
+    def append(self, record, wait=True):
+        """
+        Appends a record.
+        
+        Args:
+            record (dict): JSON-serializable record. A given 'timestamp' is stored as
+                seconds since the epoch, see coerce_timestamp; when missing, the writer
+                adds the commit time. The caller's dictionary is not modified.
+            wait (bool): Whether to wait until the record is committed.
+        
+        Raises:
+            ValueError: If the record's timestamp cannot be converted.
+        """
+        if 'timestamp' in record:
+            record = dict(record, timestamp=coerce_timestamp(record['timestamp']))
+            line = (json.dumps(record, separators=(',', ':'), default=str) + '\n').encode('utf-8')
+        else:
+            line = (json.dumps(record, separators=(',', ':'), default=str).encode('utf-8'),)
+        with self._condition:
+            if self._closed:
+                raise ValueError("Cannot append to a closed interaction log")
+            batch = self._batch
+            batch.lines.append(line)
+            self.appends += 1
+            if len(batch.lines) == 1:
+                self._condition.notify()
+        if wait:
+            batch.committed.wait()
+            if batch.error is not None:
+                raise batch.error
+    
+    def _write_loop(self):
+        while True:
+            with self._condition:
+                while not self._batch.lines and not self._closed:
+                    self._condition.wait()
+                if not self._batch.lines:
+                    return
+            if self.commit_window and not self._closed:
+                time.sleep(self.commit_window)
+            with self._condition:
+                batch, self._batch = self._batch, _Batch()
+            now = time.time()
+            try:
+                self._commit(b''.join(_stamp(line[0], now) if isinstance(line, tuple) else line
+                                      for line in batch.lines))
+            except OSError as e:
+                logger.error(f"Failed to commit {len(batch.lines)} interactions: {e}")
+                batch.error = e
+            batch.committed.set()
+    
+    def _commit(self, data):
+        if self._size and self._size + len(data) > self.segment_size:
+            os.close(self._fd)
+            self._sequence += 1
+            self._open_segment()
+        view = memoryview(data)
+        while view:
+            written = os.write(self._fd, view)
+            view = view[written:]
+        if self.fsync:
+            os.fsync(self._fd)
+        self._size += len(data)
+        self.bytes_written += len(data)
+        self.commits += 1
+    
+    def close(self):
+        """
+        Commits the queued records and closes the log.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._writer.join()
+        os.close(self._fd)
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def stats(self):
+        """
+        Returns the log counters.
+        
+        Returns:
+            dict: Appends, commits, average records per commit and bytes written.
+        """
+        return {'appends': self.appends, 'commits': self.commits,
+                'records_per_commit': self.appends / self.commits if self.commits else None,
+                'bytes_written': self.bytes_written, 'segment': self._sequence}
+
+def _first_timestamp(segment_path):
+    with open(segment_path, 'rb') as file:
+        line = file.readline()
+    try:
+        return json.loads(line)['timestamp']
+    except (ValueError, KeyError, TypeError):
+        return None
+
+def read_interactions(log_path, start=None, end=None, predicate=None):
+    """
+    Streams the records of a log, optionally restricted to a time range.
+    
+    Records are read segment by segment and line by line, so memory use does not
+    depend on the log size. Timestamps added by the writer follow commit order, so
+    segments that end before `start` are skipped using the first timestamp of the
+    following segment, and reading stops at the first segment starting after `end`;
+    records appended with their own, out-of-order timestamps may be missed by this
+    skipping. A partially written last line (e.g. after a crash) is ignored.
+    
+    Args:
+        log_path (str): Log path.
+        start (float): Earliest timestamp to return, inclusive, or None.
+        end (float): Latest timestamp to return, exclusive, or None.
+        predicate (callable): Optional filter applied to every record in range.
+    
+    Yields:
+        dict: Matching records in log order.
+    """
+    segments = [path for _, path in list_segments(log_path)]
+    first_timestamps = [_first_timestamp(path) for path in segments]
+    for index, path in enumerate(segments):
+        following = first_timestamps[index + 1] if index + 1 < len(segments) else None
+        if start is not None and following is not None and following < start:
+            continue
+        if end is not None and first_timestamps[index] is not None and first_timestamps[index] >= end:
+            break
+        with open(path, 'rb') as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                timestamp = record.get('timestamp')
+                if start is not None and (timestamp is None or timestamp < start):
+                    continue
+                if end is not None and (timestamp is None or timestamp >= end):
+                    continue
+                if predicate is None or predicate(record):
+                    yield record
+
+_logs = {}
+_logs_lock = threading.Lock()
+
+def get_interaction_log(log_path, **options):
+    """
+    Returns the process-wide InteractionLog of a log path, opening it on first use.
+    
+    Args:
+        log_path (str): Log path.
+        **options: InteractionLog options used when the log is opened.
+    
+    Returns:
+        InteractionLog: The shared log.
+    """
+    key = os.path.abspath(log_path)
+    with _logs_lock:
+        log = _logs.get(key)
+        if log is None:
+            log = _logs[key] = InteractionLog(log_path, **options)
+        return log
+
+@atexit.register
+def _close_logs():
+    with _logs_lock:
+        for log in _logs.values():
+            log.close()
+        _logs.clear()
+
+def benchmark_appends(writer_counts=(1, 4, 16), records_per_writer=2000, commit_window=0.0, fsync=True):
+    """
+    Measures appends per second with concurrent writer threads, each waiting for its
+    appends to be committed.
+    
+    Args:
+        writer_counts (tuple): Numbers of concurrent writers to measure.
+        records_per_writer (int): Records appended by each writer.
+        commit_window (float): Commit window of the log.
+        fsync (bool): Whether commits are fsynced.
+    
+    Returns:
+        list: Per writer count: appends per second and average records per commit.
+    """
+    results = []
+    for writers in writer_counts:
+        with tempfile.TemporaryDirectory() as directory:
+            log = InteractionLog(os.path.join(directory, 'interaction_log.json'), commit_window=commit_window,
+                                 fsync=fsync)
+            
+            def write(writer):
+                for index in range(records_per_writer):
+                    log.append({'interaction_type': 'data_query', 'outcome': 'successful',
+                                'writer': writer, 'index': index})
+            
+            threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.perf_counter() - start
+            log.close()
+            count = sum(1 for _ in read_interactions(log.log_path))
+            if count != writers * records_per_writer:
+                raise RuntimeError(f"Expected {writers * records_per_writer} records, read back {count}")
+            result = {'writers': writers, 'appends_per_second': count / elapsed,
+                      'records_per_commit': log.stats()['records_per_commit']}
+            logger.info(f"{writers} writers: {result['appends_per_second']:,.0f} appends/s, "
+                        f"{result['records_per_commit']:.1f} records per commit")
+            results.append(result)
+    return results
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for result in benchmark_appends():
+        print(result)
@@ -0,0 +1,363 @@
+
+"""
+Job Runner
+----------
+This script provides an event-driven job runner for the continuous learning loop.
+Jobs run on named worker pools instead of the scheduler thread, so a long retrain
+never blocks ingestion. Jobs can be triggered by wall-clock intervals, by named
+events (such as new-file notifications or data-volume thresholds), or by the
+completion of the jobs they depend on.
+
+Features included:
+- Named thread pools, one per kind of work.
+- Interval and event triggers.
+- Dependencies: a job only runs once every upstream job has produced new output
+  since the job's previous run; triggers that arrive earlier are held until then.
+- Overlap protection: a trigger for a job that is already queued or running is skipped.
+- Per-job duration and queue-wait statistics.
+- A polling directory watcher emitting new-file and data-volume events.
+"""
+
+import os
+import time
+import heapq
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ingestion_engine import scan_files
+
+logger = logging.getLogger(__name__)
+
+class JobStats:
+    """
+    Running statistics of one job.
+    """
+    
+    def __init__(self):
+        self.runs = 0
+        self.failures = 0
+        self.skipped_overlaps = 0
+        self.last_duration = None
+        self.last_queue_wait = None
+        self.total_duration = 0.0
+        self.total_queue_wait = 0.0
+    
+    def as_dict(self):
+        """
+        Returns the statistics as a plain dictionary.
+        
+        Returns:
+            dict: Run counts and last/average duration and queue wait in seconds.
+        """
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'skipped_overlaps': self.skipped_overlaps,
+            'last_duration': self.last_duration,
+            'last_queue_wait': self.last_queue_wait,
+            'average_duration': self.total_duration / self.runs if self.runs else None,
+            'average_queue_wait': self.total_queue_wait / self.runs if self.runs else None,
+        }
+
+class Job:
+    """
+    A unit of work registered with the JobRunner, see JobRunner.add_job for the arguments.
+    """
+    
+    def __init__(self, name, func, pool, depends_on, every, on_events, run_after_dependencies):
+        self.name = name
+        self.func = func
+        self.pool = pool
+        self.depends_on = tuple(depends_on)
+        self.every = every
+        self.on_events = frozenset(on_events)
+        self.run_after_dependencies = run_after_dependencies
+        self.generation = 0
+        self.seen_generations = {dependency: 0 for dependency in self.depends_on}
+        self.active = False
+        self.pending = False
+        self.stats = JobStats()
+
+class JobRunner:
+    """
+    Runs jobs on worker pools in response to intervals, events and dependencies.
+    
+    A job's return value signals whether it produced new output: a truthy value bumps
+    the job's generation, which releases dependent jobs waiting for new input.
+    """
+    
+    def __init__(self, pools=None):
+        """
+        Args:
+            pools (dict): Mapping of pool name to number of worker threads. A 'default'
+                pool with one worker is always available.
+        """
+        pools = dict(pools or {})
+        pools.setdefault('default', 1)
+        self._executors = {
+            name: ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"jobs-{name}")
+            for name, size in pools.items()
+        }
+        self._jobs = {}
+        self._timers = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopped = threading.Event()
+        self._scheduler = None
+    
+    def add_job(self, name, func, pool='default', depends_on=(), every=None, on_events=(),
+                run_after_dependencies=False):
+        """
+        Registers a job.
+        
+        Args:
+            name (str): Unique job name.
+            func (callable): Function run without arguments. A truthy return value means
+                the job produced new output for its dependents.
+            pool (str): Name of the worker pool the job runs on.
+            depends_on (list): Names of jobs that must have produced new output since
+                this job last ran.
+            every (float): Optional interval in seconds between time-based triggers.
+            on_events (list): Event names that trigger the job.
+            run_after_dependencies (bool): Whether the job is triggered automatically as
+                soon as all its dependencies have produced new output.
+        """
+        if pool not in self._executors:
+            raise ValueError(f"Unknown pool {pool!r} for job {name!r}")
+        missing = [dependency for dependency in depends_on if dependency not in self._jobs]
+        if missing:
+            raise ValueError(f"Job {name!r} depends on unknown jobs: {missing}")
+        with self._lock:
+            self._jobs[name] = Job(name, func, pool, depends_on, every, on_events, run_after_dependencies)
+            if every:
+                heapq.heappush(self._timers, (time.monotonic() + every, name))
+                self._wakeup.notify()
+    
+    def _dependencies_ready(self, job):
+        return all(self._jobs[dependency].generation > seen for dependency, seen in job.seen_generations.items())
+    
+    def _submit(self, job, reason):
+        """
+        Queues a job on its pool. Must be called with the lock held.
+        
+        Args:
+            job (Job): Job to run.
+            reason (str): Description of the trigger, for logging.
+        """
+        job.active = True
+        job.pending = False
+        # Consume the upstream output this run is going to use.
+        for dependency in job.depends_on:
+            job.seen_generations[dependency] = self._jobs[dependency].generation
+        queued_at = time.monotonic()
+        logger.info(f"Queued job {job.name} ({reason})")
+        self._executors[job.pool].submit(self._run, job, queued_at)
+    
+    def trigger(self, name, reason='manual'):
+        """
+        Triggers a job, unless it is already queued or running.
+        
+        A job whose dependencies have not produced new output yet is held and runs as
+        soon as they have.
+        
+        Args:
+            name (str): Job name.
+            reason (str): Description of the trigger, for logging.
+        
+        Returns:
+            bool: True if the job was queued now.
+        """
+        with self._lock:
+            job = self._jobs[name]
+            if job.active:
+                job.stats.skipped_overlaps += 1
+                logger.info(f"Skipped job {name} ({reason}): previous run still in progress")
+                return False
+            if not self._dependencies_ready(job):
+                job.pending = True
+                logger.info(f"Holding job {name} ({reason}) until its dependencies produce new output")
+                return False
+            self._submit(job, reason)
+            return True
+    
+    def notify(self, event, payload=None):
+        """
+        Publishes an event, triggering every job subscribed to it.
+        
+        Args:
+            event (str): Event name, e.g. 'new_files' or 'data_volume'.
+            payload (object): Optional event details, used for logging only.
+        """
+        logger.info(f"Event {event}: {payload}")
+        with self._lock:
+            names = [job.name for job in self._jobs.values() if event in job.on_events]
+        for name in names:
+            self.trigger(name, reason=f"event {event}")
+    
+    def _run(self, job, queued_at):
+        started_at = time.monotonic()
+        queue_wait = started_at - queued_at
+        produced = False
+        try:
+            produced = bool(job.func())
+        except Exception as e:
+            job.stats.failures += 1
+            logger.exception(f"Job {job.name} failed: {e}")
+        duration = time.monotonic() - started_at
+        
+        with self._lock:
+            job.active = False
+            job.stats.runs += 1
+            job.stats.last_duration = duration
+            job.stats.last_queue_wait = queue_wait
+            job.stats.total_duration += duration
+            job.stats.total_queue_wait += queue_wait
+            logger.info(f"Finished job {job.name} in {duration:.2f}s after waiting {queue_wait:.2f}s in queue"
+                        f"{' (produced new output)' if produced else ''}")
+            if produced:
+                job.generation += 1
+                for dependent in self._jobs.values():
+                    if job.name not in dependent.depends_on or dependent.active:
+                        continue
+                    if (dependent.pending or dependent.run_after_dependencies) and self._dependencies_ready(dependent):
+                        self._submit(dependent, f"dependency {job.name} produced new output")
+    
+    def _schedule_loop(self):
+        with self._lock:
+            while not self._stopped.is_set():
+                now = time.monotonic()
+                due = []
+                while self._timers and self._timers[0][0] <= now:
+                    _, name = heapq.heappop(self._timers)
+                    due.append(name)
+                    heapq.heappush(self._timers, (now + self._jobs[name].every, name))
+                if due:
+                    self._lock.release()
+                    try:
+                        for name in due:
+                            self.trigger(name, reason='interval')
+                    finally:
+                        self._lock.acquire()
+                    continue
+                timeout = self._timers[0][0] - now if self._timers else None
+                self._wakeup.wait(timeout)
+    
+    def start(self):
+        """
+        Starts the interval scheduler thread.
+        """
+        self._scheduler = threading.Thread(target=self._schedule_loop, name='jobs-scheduler', daemon=True)
+        self._scheduler.start()
+    
+    def stop(self, wait=True):
+        """
+        Stops the scheduler and shuts down the worker pools.
+        
+        Args:
+            wait (bool): Whether to wait for running jobs to finish.
+        """
+        self._stopped.set()
+        with self._lock:
+            self._wakeup.notify()
+        if self._scheduler is not None:
+            self._scheduler.join()
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+    
+    def stats(self):
+        """
+        Returns the statistics of every job.
+        
+        Returns:
+            dict: Mapping of job name to its statistics.
+        """
+        with self._lock:
+            return {name: job.stats.as_dict() for name, job in self._jobs.items()}
+
+class DirectoryWatcher:
+    """
+    Polls a directory and publishes events on a JobRunner when files appear.
+    
+    A 'new_files' event is published for every poll that finds new files, and a
+    'data_volume' event whenever the new files accumulated since the last such event
+    reach the volume threshold.
+    
+    New files are found by comparing full scans, so the watcher keeps the path of
+    every file under the directory in memory, and holds two such sets while a poll
+    runs (about 140 bytes per 45-character path). For trees with millions of files,
+    publish the events from an ingestion_manifest.FileManifest check instead.
+    """
+    
+    def __init__(self, runner, directory_path, poll_interval=30.0, volume_threshold=None,
+                 new_files_event='new_files', volume_event='data_volume'):
+        """
+        Args:
+            runner (JobRunner): Runner receiving the events.
+            directory_path (str): Directory to watch, recursively.
+            poll_interval (float): Seconds between scans.
+            volume_threshold (int): Bytes of new data that trigger a volume event, or None.
+            new_files_event (str): Name of the new-file event.
+            volume_event (str): Name of the data-volume event.
+        """
+        self.runner = runner
+        self.directory_path = directory_path
+        self.poll_interval = poll_interval
+        self.volume_threshold = volume_threshold
+        self.new_files_event = new_files_event
+        self.volume_event = volume_event
+        self._known = None
+        self._accumulated = 0
+        self._stopped = threading.Event()
+        self._thread = None
+    
+    def poll(self):
+        """
+        Scans the directory once and publishes events for new files.
+        
+        Returns:
+            list: Paths of the files that appeared since the previous scan.
+        """
+        current = set(scan_files(self.directory_path))
+        if self._known is None:
+            # The first scan only establishes the baseline.
+            self._known = current
+            return []
+        new_files = sorted(current - self._known)
+        self._known = current
+        if not new_files:
+            return new_files
+        
+        self.runner.notify(self.new_files_event, {'count': len(new_files)})
+        if self.volume_threshold:
+            for path in new_files:
+                try:
+                    self._accumulated += os.path.getsize(path)
+                except OSError:
+                    continue
+            if self._accumulated >= self.volume_threshold:
+                self.runner.notify(self.volume_event, {'bytes': self._accumulated})
+                self._accumulated = 0
+        return new_files
+    
+    def _watch(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.poll()
+            except Exception as e:
+                logger.exception(f"Polling {self.directory_path} failed: {e}")
+    
+    def start(self):
+        """
+        Starts polling on a background thread.
+        """
+        self.poll()
+        self._thread = threading.Thread(target=self._watch, name='directory-watcher', daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        """
+        Stops polling.
+        """
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
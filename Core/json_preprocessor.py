@@ -12,6 +12,7 @@ It demonstrates basic JSON parsing and data extraction techniques.
 import os
 import json
 import pandas as pd
+from ingestion_manifest import incremental_paths
 
 def preprocess_json_data(json_data):
     """
@@ -45,24 +46,31 @@ def read_and_process_json_file(file_path):
     preprocessed_data = preprocess_json_data(json_data)
     return preprocessed_data
 
-def process_directory(directory_path):
+def process_directory(directory_path, manifest_path=None):
     """
     Searches for JSON files in the specified directory, reading and preprocessing
     each file's contents.
     
+    When a manifest path is given, only files that are new or changed since the
+    previous run are processed, and deleted files are reported.
+    
     Args:
         directory_path (str): Path to the directory containing JSON files.
+        manifest_path (str): Optional path to the shared ingestion manifest.
     
     Returns:
-        list: A list of preprocessed data from all JSON files in the directory.
+        list: A list of preprocessed data from all (new or changed) JSON files in the directory.
     """
     preprocessed_data_list = []
+    file_paths = [
+        os.path.join(directory_path, filename)
+        for filename in os.listdir(directory_path)
+        if filename.endswith('.json')
+    ]
     
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.json'):
-            file_path = os.path.join(directory_path, filename)
-            preprocessed_data = read_and_process_json_file(file_path)
-            preprocessed_data_list.append(preprocessed_data)
+    for file_path in incremental_paths(file_paths, manifest_path, 'json', directory_path):
+        preprocessed_data = read_and_process_json_file(file_path)
+        preprocessed_data_list.append(preprocessed_data)
     
     return preprocessed_data_list
 
@@ -0,0 +1,313 @@
+
+"""
+Knowledge Store
+---------------
+This script provides the storage engine behind
+self_correction_knowledge_builder.integrate_new_knowledge. Knowledge items are kept in
+a SQLite database keyed by concept instead of one JSON document, so integrating an
+item is a single upsert and lookups use indexes rather than linear scans. The details
+of every item are indexed for full-text search with FTS5 when the SQLite build
+supports it, with a LIKE-based fallback otherwise.
+
+Features included:
+- Upsert of knowledge items by concept.
+- Full-text search over details (FTS5 with bm25 ranking, LIKE fallback).
+- Bulk ingestion of many items in one transaction.
+- Migration from the existing JSON knowledge base file.
+
+Paths and Files (Commented Out):
+# Knowledge Base Path: /path/to/knowledge_base.json
+# Knowledge Store Path: /path/to/knowledge_base.sqlite
+"""
+
+import os
+import json
+import time
+import logging
+import sqlite3
+import threading
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS knowledge (
+    concept TEXT PRIMARY KEY,
+    details TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+_META_SCHEMA = "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+
+_FTS_SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+        concept, details, content='knowledge', content_rowid='rowid'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS knowledge_fts_insert AFTER INSERT ON knowledge BEGIN
+        INSERT INTO knowledge_fts (rowid, concept, details) VALUES (new.rowid, new.concept, new.details);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS knowledge_fts_delete AFTER DELETE ON knowledge BEGIN
+        INSERT INTO knowledge_fts (knowledge_fts, rowid, concept, details)
+        VALUES ('delete', old.rowid, old.concept, old.details);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS knowledge_fts_update AFTER UPDATE ON knowledge BEGIN
+        INSERT INTO knowledge_fts (knowledge_fts, rowid, concept, details)
+        VALUES ('delete', old.rowid, old.concept, old.details);
+        INSERT INTO knowledge_fts (rowid, concept, details) VALUES (new.rowid, new.concept, new.details);
+    END
+    """,
+]
+
+_UPSERT = """
+INSERT INTO knowledge (concept, details, data, updated_at) VALUES (?, ?, ?, ?)
+ON CONFLICT (concept) DO UPDATE SET
+    details = excluded.details, data = excluded.data, updated_at = excluded.updated_at
+"""
+
+def _row(item, updated_at):
+    if 'concept' not in item:
+        raise ValueError(f"Knowledge item without a concept: {item!r}")
+    details = item.get('details')
+    if details is not None and not isinstance(details, str):
+        details = json.dumps(details)
+    return (str(item['concept']), details, json.dumps(item), updated_at)
+
+class KnowledgeStore:
+    """
+    SQLite-backed knowledge base keyed by concept.
+    
+    An instance is safe to share between threads.
+    """
+    
+    def __init__(self, store_path):
+        """
+        Opens (or creates) a knowledge store.
+        
+        Args:
+            store_path (str): Path to the SQLite database file.
+        """
+        self.store_path = store_path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(store_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(_SCHEMA)
+        self._connection.execute(_META_SCHEMA)
+        try:
+            for statement in _FTS_SCHEMA:
+                self._connection.execute(statement)
+            self.full_text = True
+        except sqlite3.OperationalError as e:
+            # SQLite built without FTS5.
+            logger.warning(f"Full-text search unavailable, falling back to LIKE queries: {e}")
+            self.full_text = False
+        self._connection.commit()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def upsert(self, item):
+        """
+        Inserts a knowledge item, or replaces the item with the same concept.
+        
+        Args:
+            item (dict): Knowledge item with a 'concept' and usually 'details'.
+        """
+        self.upsert_many([item])
+    
+    def upsert_many(self, items):
+        """
+        Upserts many knowledge items in one transaction.
+        
+        Args:
+            items (iterable): Knowledge items.
+        
+        Returns:
+            int: Number of items written.
+        """
+        updated_at = time.time()
+        rows = [_row(item, updated_at) for item in items]
+        with self._lock, self._connection:
+            self._connection.executemany(_UPSERT, rows)
+        return len(rows)
+    
+    def get(self, concept):
+        """
+        Looks up a knowledge item by concept.
+        
+        Args:
+            concept (str): Concept.
+        
+        Returns:
+            dict: The item, or None if the concept is unknown.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT data FROM knowledge WHERE concept = ?', (concept,)).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    def delete(self, concept):
+        """
+        Deletes a knowledge item.
+        
+        Args:
+            concept (str): Concept.
+        
+        Returns:
+            bool: True if the concept existed.
+        """
+        with self._lock, self._connection:
+            cursor = self._connection.execute('DELETE FROM knowledge WHERE concept = ?', (concept,))
+        return cursor.rowcount > 0
+    
+    def search(self, query, limit=10):
+        """
+        Searches the details of the knowledge items.
+        
+        With FTS5 every word of the query is matched literally (punctuation such as
+        "isn't" or "C++" is not parsed as query syntax), all words must occur, and
+        results are ranked by bm25; without FTS5, items whose details contain the query
+        as a substring are returned.
+        
+        Args:
+            query (str): Search query.
+            limit (int): Maximum number of results.
+        
+        Returns:
+            list: Matching knowledge items, best match first.
+        """
+        with self._lock:
+            if self.full_text:
+                terms = ' '.join('"' + term.replace('"', '""') + '"' for term in query.split())
+                if not terms:
+                    return []
+                rows = self._connection.execute(
+                    'SELECT knowledge.data FROM knowledge_fts JOIN knowledge ON knowledge.rowid = knowledge_fts.rowid '
+                    'WHERE knowledge_fts.details MATCH ? ORDER BY bm25(knowledge_fts) LIMIT ?',
+                    (terms, limit)
+                ).fetchall()
+            else:
+                escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                rows = self._connection.execute(
+                    "SELECT data FROM knowledge WHERE details LIKE ? ESCAPE '\\' LIMIT ?",
+                    (f"%{escaped}%", limit)
+                ).fetchall()
+        return [json.loads(data) for (data,) in rows]
+    
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM knowledge').fetchone()[0]
+    
+    def migrated_from(self):
+        """
+        Returns the path of the JSON knowledge base imported by migrate_json, or None.
+        """
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM meta WHERE key = 'migrated_from'").fetchone()
+        return row[0] if row else None
+    
+    def migrate_json(self, json_path):
+        """
+        Imports a JSON knowledge base file in one transaction, which also records the
+        migration (see migrated_from); if any item is invalid nothing is imported.
+        
+        Accepted layouts are a list of items, an object with a 'knowledge' list, or an
+        object mapping concepts to their details (or to item objects).
+        
+        Args:
+            json_path (str): Path to the JSON knowledge base.
+        
+        Returns:
+            int: Number of items imported.
+        """
+        with open(json_path, 'r') as file:
+            document = json.load(file)
+        if isinstance(document, dict) and isinstance(document.get('knowledge'), list):
+            document = document['knowledge']
+        if isinstance(document, dict):
+            document = [
+                dict(value, concept=concept) if isinstance(value, dict) else {'concept': concept, 'details': value}
+                for concept, value in document.items()
+            ]
+        updated_at = time.time()
+        rows = [_row(item, updated_at) for item in document]
+        with self._lock, self._connection:
+            self._connection.executemany(_UPSERT, rows)
+            self._connection.execute("INSERT OR REPLACE INTO meta VALUES ('migrated_from', ?)",
+                                     (os.path.abspath(json_path),))
+        count = len(rows)
+        logger.info(f"Migrated {count} knowledge items from {json_path} to {self.store_path}")
+        return count
+    
+    def close(self):
+        """
+        Closes the store.
+        """
+        with self._lock:
+            self._connection.close()
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def store_path_for(knowledge_base_path):
+    """
+    Derives the store path from a knowledge base path: knowledge_base.json is stored
+    in knowledge_base.sqlite.
+    
+    Args:
+        knowledge_base_path (str): Knowledge base path.
+    
+    Returns:
+        str: SQLite store path.
+    """
+    base, extension = os.path.splitext(knowledge_base_path)
+    return f"{base}.sqlite" if extension.lower() == '.json' else knowledge_base_path
+
+def get_knowledge_store(knowledge_base_path):
+    """
+    Returns the process-wide store of a knowledge base, opening it on first use.
+    
+    When a JSON knowledge base exists at the given path and has not been migrated into
+    the store yet, it is migrated; the JSON file itself is left untouched. A failed
+    migration leaves the store unmigrated and raises, so the next call retries it.
+    
+    Args:
+        knowledge_base_path (str): Knowledge base path (the JSON file or the store itself).
+    
+    Returns:
+        KnowledgeStore: The shared store.
+    """
+    store_path = store_path_for(knowledge_base_path)
+    key = os.path.abspath(store_path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = KnowledgeStore(store_path)
+            try:
+                # Stores from before migrations were recorded count as migrated once they hold items.
+                pending = store.migrated_from() is None and not len(store)
+                if pending and store_path != knowledge_base_path and os.path.exists(knowledge_base_path):
+                    store.migrate_json(knowledge_base_path)
+            except Exception:
+                store.close()
+                raise
+            _stores[key] = store
+        return store
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    knowledge_base_path = "/path/to/knowledge_base.json"  # Example path
+    store = get_knowledge_store(knowledge_base_path)
+    store.upsert({"concept": "Quantum Computing", "details": "Basics of quantum computing."})
+    print(store.search("quantum"))
@@ -0,0 +1,357 @@
+
+"""
+Model Evaluation
+----------------
+This script provides champion/challenger evaluation and model promotion for the
+continuous learning loop. The deployed (champion) model's holdout predictions are
+computed once per holdout snapshot and cached, so a new (challenger) model is the
+only one scored on each evaluation. The challenger is scored in batches over a
+random order of the holdout set and scoring stops as soon as a confidence interval
+on the paired accuracy difference decides the comparison.
+
+Models live in versioned directories. The deployed model is the target of a
+'current' symbolic link that is replaced atomically on promotion, so a reader
+resolving the link always sees a completely written model.
+
+Features included:
+- Versioned model registry with atomic 'current' and 'challenger' pointer swaps.
+- Champion predictions and metrics cached per model version and holdout snapshot.
+- Batched challenger scoring with early stopping on a paired confidence interval.
+
+Paths and Files (Commented Out):
+# Models Directory: /path/to/models/
+# Holdout Path: /path/to/holdout.csv
+"""
+
+import os
+import math
+import time
+import uuid
+import shutil
+import logging
+import statistics
+from collections import namedtuple
+import numpy as np
+from csv_loader import load_csv
+from ingestion_manifest import hash_file
+from inference_server import load_inference_artifacts
+from incremental_training import MODEL_FILENAME, SCALER_FILENAME
+
+logger = logging.getLogger(__name__)
+
+HoldoutSnapshot = namedtuple('HoldoutSnapshot', ['features', 'labels', 'snapshot_id'])
+EvaluationResult = namedtuple(
+    'EvaluationResult',
+    ['promote', 'examples_scored', 'holdout_size', 'champion_accuracy', 'challenger_accuracy',
+     'difference', 'interval']
+)
+
+class ModelRegistry:
+    """
+    Directory of model versions with atomically swapped 'current' and 'challenger' pointers.
+    
+    Layout:
+        models_dir/versions/<version>/  model and scaler of one version
+        models_dir/current              symbolic link to the deployed version
+        models_dir/challenger           symbolic link to the version awaiting evaluation
+    """
+    
+    def __init__(self, models_dir, keep_versions=3):
+        """
+        Args:
+            models_dir (str): Root directory of the registry.
+            keep_versions (int): Number of most recent promoted versions kept for rollback.
+        """
+        self.models_dir = models_dir
+        self.versions_dir = os.path.join(models_dir, 'versions')
+        self.current_link = os.path.join(models_dir, 'current')
+        self.challenger_link = os.path.join(models_dir, 'challenger')
+        self.keep_versions = keep_versions
+    
+    def new_version_dir(self):
+        """
+        Creates an empty directory for a new model version.
+        
+        Returns:
+            str: Path of the new version directory.
+        """
+        version = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.versions_dir, version)
+        os.makedirs(path)
+        return path
+    
+    def _point(self, link, target):
+        # A symlink is created next to the pointer and renamed over it; rename is
+        # atomic, so readers see either the old or the new target.
+        temporary_link = f"{link}.tmp-{os.getpid()}"
+        os.symlink(os.path.relpath(target, self.models_dir), temporary_link)
+        os.replace(temporary_link, link)
+    
+    def _resolve(self, link):
+        if not os.path.islink(link):
+            return None
+        return os.path.realpath(link)
+    
+    def current(self):
+        """
+        Resolves the deployed version.
+        
+        Returns:
+            str: Directory of the deployed version, or None if nothing is deployed.
+        """
+        return self._resolve(self.current_link)
+    
+    def challenger(self):
+        """
+        Resolves the version awaiting evaluation.
+        
+        Returns:
+            str: Directory of the challenger, or None if there is none.
+        """
+        return self._resolve(self.challenger_link)
+    
+    def stage(self, version_dir):
+        """
+        Marks a completely written version as the challenger.
+        
+        Args:
+            version_dir (str): Version directory.
+        """
+        self._point(self.challenger_link, version_dir)
+    
+    def promote(self, version_dir):
+        """
+        Deploys a version by swapping the 'current' pointer, then prunes old versions.
+        
+        Args:
+            version_dir (str): Version directory.
+        """
+        self._point(self.current_link, version_dir)
+        if self.challenger() == os.path.realpath(version_dir):
+            os.unlink(self.challenger_link)
+        self._prune()
+        logger.info(f"Promoted model version {os.path.basename(version_dir)}")
+    
+    def discard_challenger(self):
+        """
+        Removes the challenger pointer and its version directory.
+        """
+        challenger = self.challenger()
+        if challenger is None:
+            return
+        os.unlink(self.challenger_link)
+        if challenger != self.current():
+            shutil.rmtree(challenger, ignore_errors=True)
+        logger.info(f"Discarded model version {os.path.basename(challenger)}")
+    
+    def _prune(self):
+        # Version names start with a timestamp, so they sort chronologically.
+        protected = {self.current(), self.challenger()}
+        versions = sorted(os.listdir(self.versions_dir))
+        for version in versions[:-self.keep_versions]:
+            path = os.path.realpath(os.path.join(self.versions_dir, version))
+            if path not in protected:
+                shutil.rmtree(path, ignore_errors=True)
+    
+    def load(self, version_dir):
+        """
+        Loads the model and scaler of a version.
+        
+        Args:
+            version_dir (str): Version directory, e.g. as returned by current().
+        
+        Returns:
+            tuple: (model, scaler).
+        """
+        return load_inference_artifacts(os.path.join(version_dir, MODEL_FILENAME),
+                                        os.path.join(version_dir, SCALER_FILENAME))
+
+def load_holdout(holdout_path, label='label'):
+    """
+    Loads a holdout snapshot and identifies it by its content hash.
+    
+    Args:
+        holdout_path (str): Path to the labelled holdout CSV file.
+        label (str): Name of the label column.
+    
+    Returns:
+        HoldoutSnapshot: Raw features, labels and snapshot id.
+    """
+    data = load_csv(holdout_path)
+    features = data.drop(columns=label).to_numpy(dtype=np.float32)
+    labels = data[label].to_numpy(dtype=np.float32)
+    return HoldoutSnapshot(features, labels, hash_file(holdout_path))
+
+def _predict(model, scaler, features, batch_size):
+    predictions = np.empty(len(features), dtype=np.float32)
+    for start in range(0, len(features), batch_size):
+        batch = scaler.transform(features[start:start + batch_size]).astype(np.float32, copy=False)
+        predictions[start:start + batch_size] = np.asarray(model(batch, training=False)).reshape(-1)
+    return predictions
+
+_baseline_cache = {}
+
+def champion_baseline(registry, holdout, cache=True, batch_size=4096):
+    """
+    Returns the deployed model's holdout predictions and accuracy, scoring it only once
+    per model version and holdout snapshot.
+    
+    Baselines are kept in memory and in the version directory, so they survive restarts
+    and are dropped together with the version.
+    
+    Args:
+        registry (ModelRegistry): Model registry.
+        holdout (HoldoutSnapshot): Holdout snapshot.
+        cache (bool): Whether to read and write the cached baseline.
+        batch_size (int): Number of examples scored per batch.
+    
+    Returns:
+        dict: 'predictions' (positive-class probabilities) and 'accuracy', or None if no
+        model is deployed.
+    """
+    version_dir = registry.current()
+    if version_dir is None:
+        return None
+    key = (version_dir, holdout.snapshot_id)
+    cache_path = os.path.join(version_dir, f"baseline-{holdout.snapshot_id}.npy")
+    if cache and key in _baseline_cache:
+        return _baseline_cache[key]
+    
+    if cache and os.path.exists(cache_path):
+        predictions = np.load(cache_path)
+    else:
+        model, scaler = registry.load(version_dir)
+        predictions = _predict(model, scaler, holdout.features, batch_size)
+        if cache:
+            temporary_path = f"{cache_path}.tmp.npy"
+            np.save(temporary_path, predictions)
+            os.replace(temporary_path, cache_path)
+    
+    baseline = {'predictions': predictions,
+                'accuracy': float(np.mean((predictions >= 0.5) == (holdout.labels >= 0.5)))}
+    if cache:
+        # Only the deployed version's baselines are worth keeping in memory.
+        for stale_key in [k for k in _baseline_cache if k[0] != version_dir]:
+            del _baseline_cache[stale_key]
+        _baseline_cache[key] = baseline
+    return baseline
+
+def compare_to_champion(registry, challenger_dir, holdout, confidence=0.99, margin=0.0, batch_size=2048,
+                        min_examples=1000, seed=0):
+    """
+    Scores a challenger against the cached champion baseline with early stopping.
+    
+    The challenger is scored in batches over a random order of the holdout set. After
+    every batch a normal confidence interval (with finite-population correction) is
+    computed for the mean paired difference in correctness, challenger minus champion.
+    Scoring stops as soon as the interval lies entirely above or below -margin; if the
+    whole holdout set is scored the interval has zero width and the observed difference
+    decides. The challenger is promoted when it is not worse than the champion by more
+    than the margin.
+    
+    Because the interval is checked repeatedly, the error rate 1 - confidence is spent
+    across the checks with an O'Brien-Fleming-type spending function of the fraction
+    scored: each check uses only its increment of the spent error, so early checks have
+    wide intervals and, by the union bound, the chance of stopping on noise at any
+    check stays below 1 - confidence. The variance is estimated with one pseudo-win
+    and one pseudo-loss added, so models that have agreed on every example scored so
+    far are not declared equal from that alone.
+    
+    Args:
+        registry (ModelRegistry): Model registry with the deployed champion.
+        challenger_dir (str): Version directory of the challenger.
+        holdout (HoldoutSnapshot): Holdout snapshot.
+        confidence (float): Confidence level of the interval.
+        margin (float): Accuracy the challenger may lose and still be promoted.
+        batch_size (int): Number of examples scored per batch.
+        min_examples (int): Number of examples scored before early stopping is allowed.
+        seed (int): Seed of the scoring order.
+    
+    Returns:
+        EvaluationResult: The decision and the evidence it was based on.
+    """
+    baseline = champion_baseline(registry, holdout)
+    total = len(holdout.labels)
+    actual = holdout.labels >= 0.5
+    model, scaler = registry.load(challenger_dir)
+    
+    if baseline is None:
+        predictions = _predict(model, scaler, holdout.features, batch_size)
+        accuracy = float(np.mean((predictions >= 0.5) == actual))
+        return EvaluationResult(True, total, total, None, accuracy, None, None)
+    
+    champion_correct = (baseline['predictions'] >= 0.5) == actual
+    order = np.random.default_rng(seed).permutation(total)
+    normal = statistics.NormalDist()
+    z_total = normal.inv_cdf(0.5 + confidence / 2)
+    
+    def alpha_spent(fraction):
+        return 2 * (1 - normal.cdf(z_total / math.sqrt(fraction)))
+    
+    differences = np.empty(total, dtype=np.float32)
+    scored = 0
+    spent = 0.0
+    interval = (-1.0, 1.0)
+    while scored < total:
+        indices = order[scored:scored + batch_size]
+        batch = scaler.transform(holdout.features[indices]).astype(np.float32, copy=False)
+        challenger_correct = (np.asarray(model(batch, training=False)).reshape(-1) >= 0.5) == actual[indices]
+        differences[scored:scored + len(indices)] = challenger_correct.astype(np.float32) - champion_correct[indices]
+        scored += len(indices)
+        
+        if scored < min_examples and scored < total:
+            continue
+        
+        observed = differences[:scored]
+        mean = float(observed.mean())
+        # One pseudo-win and one pseudo-loss floor the variance: if the models have
+        # agreed on every example so far, the sample variance is zero and the interval
+        # would collapse onto the observed difference after a single batch.
+        discordant = float(np.abs(observed).sum()) + 2
+        pseudo_mean = float(observed.sum()) / (scored + 2)
+        variance = (discordant - (scored + 2) * pseudo_mean ** 2) / (scored + 1)
+        cumulative = alpha_spent(scored / total)
+        alpha = max(cumulative - spent, 1e-12)
+        spent = cumulative
+        half_width = normal.inv_cdf(1 - alpha / 2) * math.sqrt(variance / scored * (1 - scored / total))
+        interval = (mean - half_width, mean + half_width)
+        if interval[0] >= -margin or interval[1] < -margin:
+            break
+    
+    difference = float(differences[:scored].mean())
+    champion_accuracy = baseline['accuracy']
+    challenger_accuracy = float(champion_correct[order[:scored]].mean()) + difference
+    promote = interval[0] >= -margin if scored < total else difference >= -margin
+    logger.info(f"Scored challenger on {scored}/{total} holdout examples: accuracy difference "
+                f"{difference:+.4f} (interval {interval[0]:+.4f}, {interval[1]:+.4f}), "
+                f"{'promote' if promote else 'reject'}")
+    return EvaluationResult(promote, scored, total, champion_accuracy, challenger_accuracy, difference, interval)
+
+def evaluate_challenger(registry, holdout, **options):
+    """
+    Evaluates the staged challenger and promotes or discards it.
+    
+    Args:
+        registry (ModelRegistry): Model registry.
+        holdout (HoldoutSnapshot): Holdout snapshot.
+        **options: Keyword arguments passed to compare_to_champion.
+    
+    Returns:
+        EvaluationResult: The decision, or None if no challenger was staged.
+    """
+    challenger_dir = registry.challenger()
+    if challenger_dir is None:
+        return None
+    result = compare_to_champion(registry, challenger_dir, holdout, **options)
+    if result.promote:
+        registry.promote(challenger_dir)
+    else:
+        registry.discard_challenger()
+    return result
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    registry = ModelRegistry("/path/to/models/")  # Example path
+    holdout = load_holdout("/path/to/holdout.csv")  # Example path
+    print(evaluate_challenger(registry, holdout))
@@ -10,6 +10,7 @@ It demonstrates basic file reading and string manipulation techniques.
 
 import os
 import re
+from ingestion_manifest import incremental_paths
 
 def extract_comments_and_docstrings(file_content):
     """
@@ -44,17 +45,26 @@ def preprocess_python_file(file_path):
         new_file.write(processed_content)
     print(f"Processed file saved to: {new_file_path}")
 
-def process_directory(directory_path):
+def process_directory(directory_path, manifest_path=None):
     """
     Searches for Python files in the specified directory and preprocesses each file.
     
+    When a manifest path is given, only files that are new or changed since the
+    previous run are processed, and deleted files are reported. Previously written
+    `_processed.py` outputs are never treated as inputs.
+    
     Args:
         directory_path (str): Path to the directory containing Python files.
+        manifest_path (str): Optional path to the shared ingestion manifest.
     """
-    for filename in os.listdir(directory_path):
-        if filename.endswith('.py'):
-            file_path = os.path.join(directory_path, filename)
-            preprocess_python_file(file_path)
+    file_paths = [
+        os.path.join(directory_path, filename)
+        for filename in os.listdir(directory_path)
+        if filename.endswith('.py') and not filename.endswith('_processed.py')
+    ]
+    
+    for file_path in incremental_paths(file_paths, manifest_path, 'python', directory_path):
+        preprocess_python_file(file_path)
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,375 @@
+
+"""
+Resource Allocator
+------------------
+This script provides the cluster allocator behind
+resource_interaction_allocator.allocate_resources. Jobs with multi-dimensional
+requirements (e.g. {"cpu": 2, "memory": "4GB"}) are placed onto nodes with
+best-fit bin packing, and batches are placed first-fit-decreasing by dominant share.
+
+Resources format:
+    {"nodes": {"node-1": {"cpu": 32, "memory": "128GB"}, "node-2": {...}}}
+A dictionary without "nodes" is treated as a single node named "default".
+
+Features included:
+- Parsing of quantities with decimal (k, M, G, T), binary (Ki, Mi, Gi, Ti) and milli (m) units.
+- CPU held in millicores, so fractional CPU demands pack exactly.
+- Capacity index keeping nodes sorted by free capacity in every dimension.
+- Best-fit placement on the job's scarcest dimension, checked against all dimensions.
+- Batch allocation in first-fit-decreasing order, and batch release.
+- Benchmark of placements per second as the cluster grows.
+"""
+
+import re
+import math
+import time
+import random
+import bisect
+import logging
+import itertools
+from fractions import Fraction
+
+logger = logging.getLogger(__name__)
+
+_UNITS = {
+    '': 1, 'm': Fraction(1, 1000),
+    'k': 10 ** 3, 'K': 10 ** 3, 'M': 10 ** 6, 'G': 10 ** 9, 'T': 10 ** 12, 'P': 10 ** 15,
+    'Ki': 2 ** 10, 'Mi': 2 ** 20, 'Gi': 2 ** 30, 'Ti': 2 ** 40, 'Pi': 2 ** 50,
+}
+
+# Base unit of a dimension in thousandths, so fractional amounts stay exact integers.
+MILLI_DIMENSIONS = {'cpu'}
+
+_QUANTITY_PATTERN = re.compile(r'^\s*([0-9]*\.?[0-9]+)\s*([kKMGTP]i?|m)?(B?)\s*$')
+
+def parse_quantity(value, scale=1):
+    """
+    Parses a resource quantity into an integer number of base units.
+    
+    Strings may carry a unit, e.g. "4GB" (4 * 10**9), "512Mi" (512 * 2**20), "2k" or
+    "500m" (0.5). Units are case-sensitive: "m" is milli and "M" is mega. The result
+    is rounded up, so a requirement is never understated.
+    
+    Args:
+        value (int, float or str): Quantity.
+        scale (int): Base units per unit, e.g. 1000 for a quantity held in thousandths.
+    
+    Returns:
+        int: Quantity in base units.
+    """
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid resource quantity: {value!r}")
+    if isinstance(value, int):
+        return value * scale
+    if isinstance(value, float):
+        # repr gives the shortest decimal of the float, so 0.1 is exactly 1/10.
+        return math.ceil(Fraction(repr(value)) * scale)
+    match = _QUANTITY_PATTERN.match(str(value))
+    if match is None or (match.group(2) == 'm' and match.group(3)):
+        raise ValueError(f"Invalid resource quantity: {value!r}")
+    number, unit, _ = match.groups()
+    return math.ceil(Fraction(number) * _UNITS[unit or ''] * scale)
+
+def parse_requirements(requirements):
+    """
+    Parses every quantity of a requirements or capacity dictionary.
+    
+    Dimensions in MILLI_DIMENSIONS are held in thousandths (CPU in millicores), so two
+    jobs of 0.5 CPU fit on one core.
+    
+    Args:
+        requirements (dict): Mapping of dimension to quantity.
+    
+    Returns:
+        dict: Mapping of dimension to integer quantity.
+    """
+    return {dimension: parse_quantity(quantity, 1000 if dimension in MILLI_DIMENSIONS else 1)
+            for dimension, quantity in requirements.items()}
+
+class Cluster:
+    """
+    Nodes and their free capacity, indexed for fast placement.
+    
+    For every dimension the index keeps a sorted list of (free capacity, node) pairs, so
+    the nodes with enough of a dimension are found by bisection. A placement scans the
+    dimension in which the fewest nodes can meet the job's demand and takes the first
+    node, in increasing order of free capacity, that also fits the other dimensions: a
+    best fit on the scarcest dimension.
+    """
+    
+    def __init__(self, nodes):
+        """
+        Args:
+            nodes (dict): Mapping of node name to capacity dictionary.
+        """
+        self.capacity = {name: parse_requirements(capacity) for name, capacity in nodes.items()}
+        self.dimensions = sorted({dimension for capacity in self.capacity.values() for dimension in capacity})
+        self.free = {name: {dimension: capacity.get(dimension, 0) for dimension in self.dimensions}
+                     for name, capacity in self.capacity.items()}
+        self.totals = {dimension: sum(free[dimension] for free in self.free.values()) or 1
+                       for dimension in self.dimensions}
+        self._index = {dimension: sorted((free[dimension], name) for name, free in self.free.items())
+                       for dimension in self.dimensions}
+        self.allocations = {}
+        self._ids = itertools.count(1)
+    
+    @classmethod
+    def from_resources(cls, resources):
+        """
+        Builds a cluster from a resource configuration.
+        
+        Args:
+            resources (dict): Resource configuration, see the module docstring.
+        
+        Returns:
+            Cluster: The cluster.
+        """
+        if 'nodes' in resources:
+            return cls(resources['nodes'])
+        return cls({'default': resources})
+    
+    def parse_demand(self, requirements):
+        """
+        Parses job requirements against the cluster's dimensions.
+        
+        Zero amounts are dropped, so {"cpu": 1, "gpu": 0} can be placed on a cluster
+        without GPUs.
+        
+        Args:
+            requirements (dict): Requirements, e.g. {"cpu": 2, "memory": "4GB"}.
+        
+        Returns:
+            dict: Mapping of dimension to positive integer quantity.
+        
+        Raises:
+            ValueError: If a positive amount is requested of a dimension the cluster lacks.
+        """
+        demand = {dimension: amount for dimension, amount in parse_requirements(requirements).items() if amount}
+        unknown = sorted(dimension for dimension in demand if dimension not in self._index)
+        if unknown:
+            raise ValueError(f"Unknown resource dimensions {unknown}; the cluster has {self.dimensions}")
+        return demand
+    
+    def _update(self, node, delta):
+        free = self.free[node]
+        for dimension, amount in delta.items():
+            if amount == 0:
+                continue
+            entries = self._index[dimension]
+            del entries[bisect.bisect_left(entries, (free[dimension], node))]
+            free[dimension] += amount
+            bisect.insort(entries, (free[dimension], node))
+    
+    def dominant_share(self, demand):
+        """
+        Returns the largest share of the cluster's total capacity a demand asks for.
+        
+        Args:
+            demand (dict): Requirements parsed by parse_demand.
+        
+        Returns:
+            float: Dominant share.
+        """
+        return max((amount / self.totals[dimension] for dimension, amount in demand.items()), default=0.0)
+    
+    def find_node(self, demand):
+        """
+        Finds the best-fitting node for a demand without reserving it.
+        
+        Args:
+            demand (dict): Requirements parsed by parse_demand.
+        
+        Returns:
+            str: Node name, or None if no node fits.
+        """
+        if any(dimension not in self._index for dimension, amount in demand.items() if amount > 0):
+            return None
+        if not demand:
+            return next(iter(self.free), None)
+        # Scan the dimension with the fewest nodes that have enough of it; a demand that
+        # no node can meet in some dimension is rejected without scanning.
+        scan_dimension, start = None, None
+        for dimension, amount in demand.items():
+            entries = self._index[dimension]
+            position = bisect.bisect_left(entries, (amount, ''))
+            if scan_dimension is None or len(entries) - position < len(self._index[scan_dimension]) - start:
+                scan_dimension, start = dimension, position
+        entries = self._index[scan_dimension]
+        for position in range(start, len(entries)):
+            node = entries[position][1]
+            free = self.free[node]
+            if all(free[dimension] >= amount for dimension, amount in demand.items()):
+                return node
+        return None
+    
+    def allocate(self, requirements):
+        """
+        Places one job.
+        
+        Args:
+            requirements (dict): Requirements, e.g. {"cpu": 2, "memory": "4GB"}.
+        
+        Returns:
+            tuple: (allocation id, node name), or None if the job does not fit.
+        
+        Raises:
+            ValueError: If the job requests a dimension the cluster lacks, see parse_demand.
+        """
+        demand = self.parse_demand(requirements)
+        node = self.find_node(demand)
+        if node is None:
+            return None
+        self._update(node, {dimension: -amount for dimension, amount in demand.items()})
+        allocation_id = next(self._ids)
+        self.allocations[allocation_id] = (node, demand)
+        return allocation_id, node
+    
+    def allocate_batch(self, requirements_list):
+        """
+        Places a batch of jobs, largest dominant share first.
+        
+        Args:
+            requirements_list (list): Requirements of every job.
+        
+        Returns:
+            list: (allocation id, node name) or None for every job, in input order.
+        
+        Raises:
+            ValueError: If a job requests a dimension the cluster lacks; no job is placed.
+        """
+        demands = [self.parse_demand(requirements) for requirements in requirements_list]
+        order = sorted(range(len(demands)), key=lambda index: self.dominant_share(demands[index]), reverse=True)
+        placements = [None] * len(demands)
+        for index in order:
+            demand = demands[index]
+            node = self.find_node(demand)
+            if node is None:
+                continue
+            self._update(node, {dimension: -amount for dimension, amount in demand.items()})
+            allocation_id = next(self._ids)
+            self.allocations[allocation_id] = (node, demand)
+            placements[index] = (allocation_id, node)
+        return placements
+    
+    def release(self, allocation_id):
+        """
+        Returns the resources of an allocation to its node.
+        
+        Args:
+            allocation_id (int): Allocation id returned by allocate.
+        
+        Returns:
+            bool: True if the allocation existed.
+        """
+        allocation = self.allocations.pop(allocation_id, None)
+        if allocation is None:
+            return False
+        node, demand = allocation
+        self._update(node, demand)
+        return True
+    
+    def release_batch(self, allocation_ids):
+        """
+        Releases several allocations.
+        
+        Args:
+            allocation_ids (list): Allocation ids.
+        
+        Returns:
+            int: Number of allocations released.
+        """
+        return sum(1 for allocation_id in allocation_ids if self.release(allocation_id))
+    
+    def utilization(self):
+        """
+        Returns the allocated share of every dimension.
+        
+        Returns:
+            dict: Mapping of dimension to utilization between 0 and 1.
+        """
+        return {dimension: 1 - sum(free[dimension] for free in self.free.values()) / self.totals[dimension]
+                for dimension in self.dimensions}
+
+def generate_cluster(n_nodes, seed=0):
+    """
+    Generates a synthetic heterogeneous cluster for benchmarking.
+    
+    Args:
+        n_nodes (int): Number of nodes.
+        seed (int): Random seed.
+    
+    Returns:
+        dict: Resource configuration.
+    """
+    rng = random.Random(seed)
+    shapes = [(16, '64GB', 0), (32, '128GB', 0), (64, '256GB', 0), (32, '256GB', 4)]
+    nodes = {}
+    for index in range(n_nodes):
+        cpu, memory, gpu = rng.choice(shapes)
+        nodes[f"node-{index}"] = {'cpu': cpu, 'memory': memory, 'gpu': gpu}
+    return {'nodes': nodes}
+
+def generate_jobs(n_jobs, seed=1):
+    """
+    Generates synthetic job requirements for benchmarking.
+    
+    Args:
+        n_jobs (int): Number of jobs.
+        seed (int): Random seed.
+    
+    Returns:
+        list: Requirements dictionaries.
+    """
+    rng = random.Random(seed)
+    jobs = []
+    for _ in range(n_jobs):
+        job = {'cpu': rng.choice([1, 2, 4, 8]), 'memory': f"{rng.choice([1, 2, 4, 8, 16])}GB"}
+        if rng.random() < 0.05:
+            job['gpu'] = 1
+        jobs.append(job)
+    return jobs
+
+def benchmark_allocator(node_counts=(100, 500, 2000), jobs_per_node=10):
+    """
+    Measures placements per second for growing clusters.
+    
+    Each measurement places a batch of jobs, then releases them.
+    
+    Args:
+        node_counts (tuple): Cluster sizes to measure.
+        jobs_per_node (int): Jobs per node in each batch.
+    
+    Returns:
+        list: Per cluster size: nodes, jobs, placed jobs, placements/s, releases/s and
+        utilization.
+    """
+    results = []
+    for n_nodes in node_counts:
+        cluster = Cluster.from_resources(generate_cluster(n_nodes))
+        jobs = generate_jobs(n_nodes * jobs_per_node)
+        start = time.perf_counter()
+        placements = cluster.allocate_batch(jobs)
+        allocate_time = time.perf_counter() - start
+        placed = [placement[0] for placement in placements if placement is not None]
+        utilization = cluster.utilization()
+        start = time.perf_counter()
+        cluster.release_batch(placed)
+        release_time = time.perf_counter() - start
+        result = {
+            'nodes': n_nodes,
+            'jobs': len(jobs),
+            'placed': len(placed),
+            'placements_per_second': len(jobs) / allocate_time,
+            'releases_per_second': len(placed) / release_time if release_time > 0 else 0.0,
+            'utilization': utilization,
+        }
+        logger.info(f"{n_nodes} nodes: placed {len(placed)}/{len(jobs)} jobs at "
+                    f"{result['placements_per_second']:,.0f} placements/s")
+        results.append(result)
+    return results
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    for result in benchmark_allocator():
+        print(result)
@@ -7,47 +7,72 @@ It outlines placeholders for algorithms capable of intelligently allocating reso
 how these functionalities could be integrated with the system's strategic capabilities.
 
 Features included:
-- Resource allocation framework.
-- Interaction management.
+- Resource allocation framework (best-fit bin packing over an indexed cluster, see resource_allocator).
+- Interaction management with an append-only, group-committed interaction log (see interaction_log).
 
 Paths and Files (Commented Out):
 # Resource Configuration Path: /path/to/resource_config.json
 # Interaction Log Path: /path/to/interaction_log.json
 """
 
-import json
+from config_cache import load_json
+from resource_allocator import Cluster
+from interaction_log import get_interaction_log
 
 def load_resource_configuration(config_path):
     """
     Load resource configuration from a JSON file.
     
+    The file is parsed once and served from the shared config cache, which reloads it in the background when it
+    changes on disk. The returned dict is shared and must not be modified.
+    
     Args:
         config_path (str): Path to the resource configuration JSON file.
     
     Returns:
         dict: Resource configuration.
     """
-    with open(config_path, 'r') as file:
-        return json.load(file)
+    return load_json(config_path)
 
 def allocate_resources(resources, requirements):
     """
     Allocate resources based on the provided requirements.
     
+    Quantities may carry units such as "4GB". A resource configuration dictionary is indexed into a new Cluster
+    on every call; long-running schedulers should build a Cluster once with Cluster.from_resources and pass it
+    in, so allocations persist and can be released.
+    
     Args:
-        resources (dict): Available resources.
-        requirements (dict): Resource requirements for the operation.
+        resources (dict or Cluster): Available resources, see resource_allocator for the format.
+        requirements (dict or list): Resource requirements for the operation, or a list of them to place a batch.
     
     Returns:
-        dict: Allocated resources.
+        dict: Allocated resources. For a single requirement, "allocated_resources" holds the node, the allocation
+        id and the parsed requirements (CPU in millicores), or None if they do not fit; for a batch it holds one
+        such entry per job.
+    
+    Raises:
+        ValueError: If a requirement asks for a resource dimension the cluster does not have.
     """
-    # Placeholder for resource allocation logic
-    return {"allocated_resources": "Example resources allocated"}
+    cluster = resources if isinstance(resources, Cluster) else Cluster.from_resources(resources)
+    batch = isinstance(requirements, list)
+    placements = cluster.allocate_batch(requirements if batch else [requirements])
+    allocated = []
+    for placement in placements:
+        if placement is None:
+            allocated.append(None)
+            continue
+        allocation_id, node = placement
+        allocated.append({"node": node, "allocation_id": allocation_id, "resources": cluster.allocations[allocation_id][1]})
+    return {"allocated_resources": allocated if batch else allocated[0]}
 
 def manage_interactions(interactions_log_path, new_interaction):
     """
     Manage interactions, updating the interaction log with new interactions.
     
+    The interaction is appended to JSON Lines segments next to the log path and the call returns once it is
+    durable; concurrent callers share one group commit. Use interaction_log.read_interactions to stream them back.
+    
     Args:
         interactions_log_path (str): Path to the interactions log JSON file.
         new_interaction (dict): New interaction to log.
@@ -55,7 +80,7 @@ def manage_interactions(interactions_log_path, new_interaction):
     Returns:
         str: Status of interaction logging.
     """
-    # Placeholder for interaction management logic
+    get_interaction_log(interactions_log_path).append(new_interaction)
     return "New interaction logged."
 
 # Example usage
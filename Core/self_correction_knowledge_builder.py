@@ -7,54 +7,103 @@ autonomous software platform. It outlines placeholders for mechanisms that allow
 identify improvement areas, and integrate new knowledge into its operational framework.
 
 Features included:
-- Self-correction framework.
-- Continuous knowledge acquisition and integration.
+- Self-correction framework evaluating streaming metric summaries (see streaming_metrics).
+- Continuous knowledge acquisition and integration, stored in an indexed SQLite knowledge store (see knowledge_store).
 
 Paths and Files (Commented Out):
 # Performance Metrics Path: /path/to/performance_metrics.json
 # Knowledge Base Path: /path/to/knowledge_base.json
+# Knowledge Store Path: /path/to/knowledge_base.sqlite
 """
 
-import json
+from config_cache import load_json
+from knowledge_store import get_knowledge_store
+from streaming_metrics import MetricsAggregator
 
 def load_performance_metrics(metrics_path):
     """
     Load performance metrics from a JSON file.
     
+    The file is parsed once and served from the shared config cache, which reloads it in the background when it
+    changes on disk. The returned dict is shared and must not be modified.
+    
     Args:
         metrics_path (str): Path to the performance metrics JSON file.
     
     Returns:
         dict: Performance metrics.
     """
-    with open(metrics_path, 'r') as file:
-        return json.load(file)
+    return load_json(metrics_path)
 
-def evaluate_performance(metrics):
+def evaluate_performance(metrics, targets=None):
     """
     Evaluate the system's performance based on provided metrics.
     
+    Metrics are the fixed-memory summaries kept by a streaming MetricsAggregator, or a snapshot of them (e.g. as
+    loaded by load_performance_metrics), so each evaluation costs O(1) per metric regardless of the number of samples.
+    Percentile targets are checked against the rolling window when it has samples, and against the all-time summary
+    otherwise.
+    
     Args:
-        metrics (dict): Performance metrics.
+        metrics (MetricsAggregator or dict): Streaming aggregator, or mapping of metric name to summary. A snapshot
+            may carry its targets under a "targets" key, and a plain number instead of a summary is checked as the
+            metric's value against every limit of the metric.
+        targets (dict): Mapping of metric name to limits, e.g. {"request_latency_ms": {"p99": 250},
+            "requests": {"min_rate": 100}}. Percentile limits ("p50", "p90", "p99", "mean", "max") are maxima;
+            "min_rate" is a minimum rate per second.
     
     Returns:
         dict: Evaluation results and areas for improvement.
     """
-    # Placeholder for performance evaluation logic
-    return {"evaluation": "Performance meets expectations", "improvements": ["Enhance data processing speed."]}
+    if isinstance(metrics, MetricsAggregator):
+        summaries = metrics.snapshot()
+    else:
+        summaries = {name: summary for name, summary in metrics.items() if name != 'targets'}
+        targets = targets if targets is not None else metrics.get('targets')
+    
+    improvements = []
+    for name, limits in (targets or {}).items():
+        summary = summaries.get(name)
+        if summary is None:
+            improvements.append(f"Collect samples for {name}: no data recorded.")
+            continue
+        if isinstance(summary, (int, float)) and not isinstance(summary, bool):
+            summary = dict.fromkeys(limits, summary)
+            summary['rate_per_second'] = summary.pop('min_rate', None)
+        elif not isinstance(summary, dict):
+            raise ValueError(f"Metric {name} must be a summary or a number, got {summary!r}")
+        window = summary.get('window') or {}
+        current = window if window.get('count') else summary
+        for statistic, limit in limits.items():
+            if statistic == 'min_rate':
+                rate = summary.get('rate_per_second')
+                if rate is not None and rate < limit:
+                    improvements.append(f"Increase {name} throughput: {rate:.2f}/s is below the {limit}/s target.")
+                continue
+            value = current.get(statistic)
+            if value is not None and value > limit:
+                improvements.append(f"Reduce {statistic} {name}: {value:.2f} exceeds the {limit} target.")
+    
+    evaluation = "Performance meets expectations" if not improvements else "Performance below expectations"
+    return {"evaluation": evaluation, "improvements": improvements, "metrics": summaries}
 
 def integrate_new_knowledge(knowledge_base_path, new_knowledge):
     """
     Integrate new knowledge into the system's knowledge base.
     
+    Knowledge is upserted by concept into the SQLite store next to the knowledge base path; an existing JSON
+    knowledge base is migrated into the store the first time it is opened.
+    
     Args:
         knowledge_base_path (str): Path to the knowledge base JSON file.
-        new_knowledge (dict): New knowledge to integrate.
+        new_knowledge (dict or list): New knowledge to integrate, or a list of items to ingest in one transaction.
     
     Returns:
         str: Status of knowledge integration.
     """
-    # Placeholder for knowledge integration logic
+    store = get_knowledge_store(knowledge_base_path)
+    items = new_knowledge if isinstance(new_knowledge, list) else [new_knowledge]
+    store.upsert_many(items)
     return "New knowledge integrated successfully."
 
 # Example usage
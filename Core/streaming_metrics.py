@@ -0,0 +1,371 @@
+
+"""
+Streaming Metrics
+-----------------
+This script aggregates latency and throughput samples as a stream into fixed-memory
+summaries, so performance can be evaluated from real percentiles without keeping or
+reloading the samples. It backs self_correction_knowledge_builder.evaluate_performance.
+
+Percentiles come from log-bucketed histograms (as in HDR histograms and DDSketch):
+a value is counted in the bucket of its logarithm, so every percentile is accurate to
+a fixed relative error and memory depends only on the range of values, never on the
+number of samples. Rates are exponentially weighted moving averages.
+
+Features included:
+- Log-bucketed histograms with a bounded relative error and a bucket cap.
+- EWMA rates in events per second.
+- Rolling windows built from a ring of per-interval histograms.
+- Per-metric summaries (count, mean, p50/p90/p99, max, rate) in O(1) per query.
+
+Paths and Files (Commented Out):
+# Performance Metrics Path: /path/to/performance_metrics.json
+"""
+
+import math
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class LogHistogram:
+    """
+    Histogram with logarithmic buckets and a bounded relative error.
+    
+    A positive value v is counted in bucket ceil(log(v) / log(gamma)) with
+    gamma = (1 + relative_error) / (1 - relative_error); any quantile is then returned
+    within `relative_error` of the true value. Values <= 0 are counted separately.
+    When more than `max_buckets` buckets are in use, the lowest buckets are merged,
+    which only affects the accuracy of the smallest values.
+    """
+    
+    def __init__(self, relative_error=0.01, max_buckets=2048):
+        """
+        Args:
+            relative_error (float): Relative accuracy of the quantiles.
+            max_buckets (int): Maximum number of buckets kept.
+        """
+        self.relative_error = relative_error
+        self.max_buckets = max_buckets
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+    
+    def record(self, value, count=1):
+        """
+        Records a value.
+        
+        Args:
+            value (float): Sample value.
+            count (int): Number of times the value occurred.
+        """
+        self.count += count
+        self.total += value * count
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 0:
+            self.zero_count += count
+            return
+        index = math.ceil(math.log(value) / self._log_gamma)
+        self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+    
+    def _collapse(self):
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+    
+    def merge(self, other):
+        """
+        Adds the counts of another histogram with the same relative error.
+        
+        Args:
+            other (LogHistogram): Histogram to merge in.
+        """
+        if other.relative_error != self.relative_error:
+            raise ValueError("Cannot merge histograms with different relative errors")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+    
+    def quantile(self, q):
+        """
+        Estimates a quantile.
+        
+        Args:
+            q (float): Quantile between 0 and 1.
+        
+        Returns:
+            float: Estimated value, or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return min(max(0.0, self.min), self.max)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if rank < seen:
+                # Midpoint of the bucket in the relative sense.
+                value = 2 * self._gamma ** index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+    
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+class EWMARate:
+    """
+    Exponentially weighted moving average of an event rate.
+    """
+    
+    def __init__(self, half_life=60.0):
+        """
+        Args:
+            half_life (float): Seconds after which the weight of past events halves.
+        """
+        self.tau = half_life / math.log(2)
+        self._rate = 0.0
+        self._last = None
+    
+    def _decay(self, now):
+        if self._last is not None and now > self._last:
+            self._rate *= math.exp(-(now - self._last) / self.tau)
+        if self._last is None or now > self._last:
+            self._last = now
+    
+    def update(self, count=1, now=None):
+        """
+        Records events.
+        
+        Args:
+            count (float): Number of events.
+            now (float): Event time in seconds, defaults to the current time.
+        """
+        self._decay(time.time() if now is None else now)
+        self._rate += count / self.tau
+    
+    def rate(self, now=None):
+        """
+        Returns the current rate.
+        
+        Args:
+            now (float): Query time in seconds, defaults to the current time.
+        
+        Returns:
+            float: Events per second.
+        """
+        self._decay(time.time() if now is None else now)
+        return self._rate
+
+class RollingHistogram:
+    """
+    Histogram over a sliding time window, kept as a ring of per-interval histograms.
+    """
+    
+    def __init__(self, window=300.0, slots=10, relative_error=0.01):
+        """
+        Args:
+            window (float): Window length in seconds.
+            slots (int): Number of intervals the window is divided into; the window
+                slides in steps of window / slots.
+            relative_error (float): Relative accuracy of the quantiles.
+        """
+        self.slot_length = window / slots
+        self.relative_error = relative_error
+        self._slots = [(None, LogHistogram(relative_error)) for _ in range(slots)]
+    
+    def record(self, value, now=None):
+        """
+        Records a value.
+        
+        Args:
+            value (float): Sample value.
+            now (float): Sample time in seconds, defaults to the current time.
+        """
+        interval = int((time.time() if now is None else now) // self.slot_length)
+        position = interval % len(self._slots)
+        slot_interval, histogram = self._slots[position]
+        if slot_interval != interval:
+            if slot_interval is not None and slot_interval > interval:
+                return  # Older than the window.
+            histogram = LogHistogram(self.relative_error)
+            self._slots[position] = (interval, histogram)
+        histogram.record(value)
+    
+    def merged(self, now=None):
+        """
+        Merges the intervals inside the window.
+        
+        Args:
+            now (float): Query time in seconds, defaults to the current time.
+        
+        Returns:
+            LogHistogram: Histogram of the samples in the window.
+        """
+        current = int((time.time() if now is None else now) // self.slot_length)
+        merged = LogHistogram(self.relative_error)
+        for interval, histogram in self._slots:
+            if interval is not None and current - len(self._slots) < interval <= current:
+                merged.merge(histogram)
+        return merged
+
+def _summarize(histogram):
+    return {
+        'count': histogram.count,
+        'mean': histogram.mean(),
+        'p50': histogram.quantile(0.5),
+        'p90': histogram.quantile(0.9),
+        'p99': histogram.quantile(0.99),
+        'max': histogram.max if histogram.count else None,
+    }
+
+class MetricsAggregator:
+    """
+    Streaming aggregation of named metrics into fixed-memory summaries.
+    
+    Every metric keeps an all-time histogram, a rolling-window histogram and an EWMA
+    rate of samples. Summaries are computed from these structures only, so a query
+    costs the same regardless of how many samples were recorded.
+    """
+    
+    def __init__(self, window=300.0, slots=10, relative_error=0.01, rate_half_life=60.0):
+        """
+        Args:
+            window (float): Rolling window length in seconds.
+            slots (int): Number of intervals of the rolling window.
+            relative_error (float): Relative accuracy of the percentiles.
+            rate_half_life (float): Half-life of the EWMA rates in seconds.
+        """
+        self.window = window
+        self.slots = slots
+        self.relative_error = relative_error
+        self.rate_half_life = rate_half_life
+        self._metrics = {}
+        self._lock = threading.Lock()
+    
+    def _metric(self, name):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = {
+                'all_time': LogHistogram(self.relative_error),
+                'window': RollingHistogram(self.window, self.slots, self.relative_error),
+                'rate': EWMARate(self.rate_half_life),
+            }
+        return metric
+    
+    def record(self, name, value, timestamp=None):
+        """
+        Records one sample.
+        
+        Args:
+            name (str): Metric name, e.g. 'request_latency_ms'.
+            value (float): Sample value.
+            timestamp (float): Sample time in seconds, defaults to the current time.
+        """
+        now = time.time() if timestamp is None else timestamp
+        with self._lock:
+            metric = self._metric(name)
+            metric['all_time'].record(value)
+            metric['window'].record(value, now)
+            metric['rate'].update(1, now)
+    
+    def record_many(self, samples):
+        """
+        Records a stream of samples.
+        
+        Args:
+            samples (iterable): (name, value) or (name, value, timestamp) tuples.
+        
+        Returns:
+            int: Number of samples recorded.
+        """
+        count = 0
+        for sample in samples:
+            self.record(*sample)
+            count += 1
+        return count
+    
+    def summary(self, name, now=None):
+        """
+        Summarizes one metric.
+        
+        Args:
+            name (str): Metric name.
+            now (float): Query time in seconds, defaults to the current time.
+        
+        Returns:
+            dict: All-time count, mean, p50/p90/p99 and max, the same statistics over the
+            rolling window under 'window', and the EWMA sample rate per second.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                return None
+            summary = _summarize(metric['all_time'])
+            summary['window'] = _summarize(metric['window'].merged(now))
+            summary['rate_per_second'] = metric['rate'].rate(now)
+        return summary
+    
+    def snapshot(self, now=None):
+        """
+        Summarizes every metric.
+        
+        Args:
+            now (float): Query time in seconds, defaults to the current time.
+        
+        Returns:
+            dict: Mapping of metric name to its summary; JSON-serializable.
+        """
+        return {name: self.summary(name, now) for name in list(self._metrics)}
+
+def benchmark_aggregator(n_samples=1000000, seed=0):
+    """
+    Measures ingestion throughput and percentile accuracy against exact percentiles.
+    
+    Args:
+        n_samples (int): Number of synthetic log-normal latency samples.
+        seed (int): Random seed.
+    
+    Returns:
+        dict: Samples per second, query time and relative errors of p50 and p99.
+    """
+    import random
+    rng = random.Random(seed)
+    values = [rng.lognormvariate(3, 0.8) for _ in range(n_samples)]
+    aggregator = MetricsAggregator()
+    now = time.time()
+    start = time.perf_counter()
+    aggregator.record_many(('latency_ms', value, now) for value in values)
+    ingest_time = time.perf_counter() - start
+    start = time.perf_counter()
+    summary = aggregator.summary('latency_ms', now)
+    query_time = time.perf_counter() - start
+    values.sort()
+    exact = {q: values[int(q * (n_samples - 1))] for q in (0.5, 0.99)}
+    return {
+        'samples_per_second': n_samples / ingest_time,
+        'query_ms': query_time * 1000,
+        'p50_relative_error': abs(summary['p50'] - exact[0.5]) / exact[0.5],
+        'p99_relative_error': abs(summary['p99'] - exact[0.99]) / exact[0.99],
+    }
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(benchmark_aggregator())
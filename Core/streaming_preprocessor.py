@@ -0,0 +1,218 @@
+
+"""
+Streaming Preprocessor
+----------------------
+This script provides an out-of-core variant of preprocess_data for datasets that do
+not fit in memory several times over. Rows are assigned to the train or test split
+with a deterministic hash of their position, the StandardScaler is fitted
+incrementally with partial_fit, and the scaled features are written as float32
+arrays to memory-mapped .npy files that the training step can read lazily.
+
+Features included:
+- Deterministic, seedable hash-based train/test assignment.
+- Incremental scaler fitting over CSV chunks.
+- Scaled float32 features and labels written to memory-mapped .npy files.
+- Text labels encoded as integer codes, with the classes saved next to the arrays.
+
+Paths and Files (Commented Out):
+# Data Path: /path/to/data.csv
+# Output Directory: /path/to/preprocessed/
+"""
+
+import os
+import json
+import logging
+import numpy as np
+import pandas as pd
+from numpy.lib.format import open_memmap
+from sklearn.preprocessing import StandardScaler
+from csv_loader import infer_schema, iter_csv_chunks
+
+logger = logging.getLogger(__name__)
+
+def hash_split(row_ids, test_size=0.2, seed=42):
+    """
+    Assigns rows to the test split with a deterministic hash of their row ids.
+    
+    The hash is a vectorized SplitMix64 finalizer, so the assignment of a row does
+    not depend on chunk boundaries and is stable across runs for the same seed.
+    
+    Args:
+        row_ids (ndarray): Global row numbers.
+        test_size (float): Fraction of rows assigned to the test split.
+        seed (int): Seed mixed into the hash.
+    
+    Returns:
+        ndarray: Boolean mask, True for rows in the test split.
+    """
+    with np.errstate(over='ignore'):
+        z = row_ids.astype(np.uint64) + np.uint64((seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) / float(1 << 53) < test_size
+
+def _label_values(labels, classes=None):
+    """
+    Converts a label column to a NumPy array that can be memory-mapped.
+    
+    Args:
+        labels (Series): Label column of a chunk.
+        classes (list): Sorted text classes; when given, labels are encoded as their
+            index in this list.
+    
+    Returns:
+        ndarray: Numeric labels.
+    """
+    if classes is not None:
+        return pd.Categorical(labels, categories=classes).codes
+    # Nullable integer and boolean columns convert to object arrays by default.
+    return labels.to_numpy(dtype=getattr(labels.dtype, 'numpy_dtype', None))
+
+def _split_chunk(chunk, start, label, test_size, seed, classes=None):
+    """
+    Splits one chunk into train and test features and labels.
+    
+    Args:
+        chunk (DataFrame): Rows of the dataset.
+        start (int): Global row number of the chunk's first row.
+        label (str): Name of the label column.
+        test_size (float): Fraction of rows assigned to the test split.
+        seed (int): Seed of the hash split.
+        classes (list): Sorted text classes of the label column, if it holds text.
+    
+    Returns:
+        tuple: (X_train, X_test, y_train, y_test) as NumPy arrays.
+    """
+    is_test = hash_split(np.arange(start, start + len(chunk)), test_size, seed)
+    features = chunk.drop(columns=label).to_numpy(dtype=np.float32)
+    labels = _label_values(chunk[label], classes)
+    return features[~is_test], features[is_test], labels[~is_test], labels[is_test]
+
+def preprocess_data_out_of_core(data_path, output_dir, label='label', test_size=0.2, seed=42,
+                                chunksize=500000, schema=None):
+    """
+    Preprocesses a CSV dataset chunk by chunk into memory-mapped .npy files.
+    
+    The data is read twice: the first pass fits the scaler on the training rows and
+    counts the rows of each split, and the second pass scales every chunk and writes
+    it into preallocated memory-mapped arrays. Peak memory is bounded by the chunk
+    size rather than the dataset size. An inferred schema is widened where later rows
+    do not fit it, as in csv_loader.load_csv.
+    
+    A label column holding text is encoded as integer codes, the index of each label
+    in the sorted list of distinct labels; that list is written to label_classes.json.
+    
+    Args:
+        data_path (str): Path to the CSV file.
+        output_dir (str): Directory receiving X_train.npy, X_test.npy, y_train.npy and y_test.npy.
+        label (str): Name of the label column.
+        test_size (float): Fraction of rows assigned to the test split.
+        seed (int): Seed of the hash split.
+        chunksize (int): Number of rows per chunk.
+        schema (dict): Optional mapping of column name to dtype. Inferred when omitted.
+    
+    Returns:
+        tuple: Read-only memory-mapped (X_train, X_test, y_train, y_test) arrays and the fitted scaler.
+    
+    Raises:
+        ValueError: If no row falls in the training split, or the label column has
+            missing values or mixes numbers and text.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    inferred = schema is None
+    if inferred:
+        schema = infer_schema(data_path)
+    
+    # First pass: fit the scaler, size the outputs and collect text labels.
+    scaler = StandardScaler()
+    train_rows = test_rows = 0
+    start = 0
+    label_dtype = None
+    text_labels = set()
+    for chunk in iter_csv_chunks(data_path, chunksize=chunksize, schema=schema, widen=inferred):
+        labels = chunk[label]
+        if pd.api.types.is_numeric_dtype(labels.dtype):
+            dtype = _label_values(labels).dtype
+            label_dtype = dtype if label_dtype is None else np.result_type(label_dtype, dtype)
+        elif labels.isna().any():
+            raise ValueError(f"Label column {label!r} of {data_path} has missing values")
+        else:
+            text_labels.update(labels.unique())
+        is_test = hash_split(np.arange(start, start + len(chunk)), test_size, seed)
+        X_train = chunk.loc[~is_test].drop(columns=label).to_numpy(dtype=np.float32)
+        if len(X_train):
+            scaler.partial_fit(X_train)
+        train_rows += len(X_train)
+        test_rows += int(is_test.sum())
+        start += len(chunk)
+    
+    if train_rows == 0:
+        raise ValueError(f"No training rows in {data_path}: {start} rows with test_size={test_size}")
+    classes = None
+    if text_labels:
+        if label_dtype is not None:
+            raise ValueError(f"Label column {label!r} of {data_path} mixes numbers and text")
+        classes = sorted(text_labels)
+        label_dtype = pd.Categorical([], categories=classes).codes.dtype
+        with open(os.path.join(output_dir, 'label_classes.json'), 'w') as f:
+            json.dump(classes, f)
+    n_features = scaler.n_features_in_
+    paths = {name: os.path.join(output_dir, f"{name}.npy") for name in ('X_train', 'X_test', 'y_train', 'y_test')}
+    outputs = {
+        'X_train': open_memmap(paths['X_train'], mode='w+', dtype=np.float32, shape=(train_rows, n_features)),
+        'X_test': open_memmap(paths['X_test'], mode='w+', dtype=np.float32, shape=(test_rows, n_features)),
+        'y_train': open_memmap(paths['y_train'], mode='w+', dtype=label_dtype, shape=(train_rows,)),
+        'y_test': open_memmap(paths['y_test'], mode='w+', dtype=label_dtype, shape=(test_rows,)),
+    }
+    
+    # Second pass: scale and write each chunk in place.
+    train_offset = test_offset = 0
+    start = 0
+    for chunk in iter_csv_chunks(data_path, chunksize=chunksize, schema=schema, widen=inferred):
+        X_train, X_test, y_train, y_test = _split_chunk(chunk, start, label, test_size, seed, classes)
+        # A small chunk may have no rows in one of the splits; the scaler rejects empty input.
+        if len(X_train):
+            outputs['X_train'][train_offset:train_offset + len(X_train)] = scaler.transform(X_train)
+            outputs['y_train'][train_offset:train_offset + len(y_train)] = y_train
+        if len(X_test):
+            outputs['X_test'][test_offset:test_offset + len(X_test)] = scaler.transform(X_test)
+            outputs['y_test'][test_offset:test_offset + len(y_test)] = y_test
+        train_offset += len(X_train)
+        test_offset += len(X_test)
+        start += len(chunk)
+    
+    for array in outputs.values():
+        array.flush()
+    del outputs
+    logger.info(f"Wrote {train_rows} training and {test_rows} test rows to {output_dir}")
+    
+    return (
+        np.load(paths['X_train'], mmap_mode='r'),
+        np.load(paths['X_test'], mmap_mode='r'),
+        np.load(paths['y_train'], mmap_mode='r'),
+        np.load(paths['y_test'], mmap_mode='r'),
+        scaler,
+    )
+
+def load_preprocessed_arrays(output_dir):
+    """
+    Opens the arrays written by preprocess_data_out_of_core without loading them.
+    
+    Args:
+        output_dir (str): Directory containing the .npy files.
+    
+    Returns:
+        tuple: Read-only memory-mapped (X_train, X_test, y_train, y_test) arrays.
+    """
+    return tuple(
+        np.load(os.path.join(output_dir, f"{name}.npy"), mmap_mode='r')
+        for name in ('X_train', 'X_test', 'y_train', 'y_test')
+    )
+
+# Example usage
+if __name__ == "__main__":
+    data_path = "/path/to/data.csv"  # Example path
+    output_dir = "/path/to/preprocessed/"  # Example path
+    X_train, X_test, y_train, y_test, scaler = preprocess_data_out_of_core(data_path, output_dir)
+    print(f"Train: {X_train.shape}, Test: {X_test.shape}")
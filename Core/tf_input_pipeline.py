@@ -0,0 +1,186 @@
+
+"""
+TensorFlow Input Pipeline
+-------------------------
+This script builds tf.data input pipelines for the classifier in
+enhanced_ml_dl_system_integration. Features are gathered batch by batch from NumPy
+arrays, memory-mapped .npy files or sets of .npy shards, so the dataset does not need
+to fit in RAM, and batches are prepared in parallel and prefetched while the model
+trains on the previous ones.
+
+Features included:
+- Index-based pipelines that read memory-mapped arrays lazily.
+- Parallel map, shuffle buffer, batching, optional caching and prefetch(AUTOTUNE).
+- Sharded datasets mixed proportionally to shard size.
+- A Keras callback reporting examples per second for every epoch.
+
+Paths and Files (Commented Out):
+# Preprocessed Arrays Directory: /path/to/preprocessed/
+"""
+
+import time
+import logging
+import numpy as np
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+def _gather_batch(features, labels):
+    """
+    Builds a function that reads the rows of a batch of indices from two arrays.
+    
+    Contiguous index ranges are read as slices; shuffled indices are sorted first so
+    reads from a memory-mapped file move forward through the file.
+    
+    Args:
+        features (ndarray): Feature array, possibly memory-mapped.
+        labels (ndarray): Label array, possibly memory-mapped.
+    
+    Returns:
+        callable: Function mapping an index batch to (features, labels) arrays.
+    """
+    def gather(indices):
+        if len(indices) and np.all(np.diff(indices) == 1):
+            rows = slice(indices[0], indices[-1] + 1)
+        else:
+            rows = np.sort(indices)
+        return (np.asarray(features[rows], dtype=np.float32),
+                np.asarray(labels[rows], dtype=np.float32))
+    return gather
+
+def make_array_dataset(features, labels, batch_size=256, shuffle_buffer=None, cache=False,
+                       seed=None, num_parallel_calls=AUTOTUNE, prefetch=True):
+    """
+    Builds a batched tf.data.Dataset over in-memory or memory-mapped arrays.
+    
+    Only row indices flow through the shuffle buffer, and each batch is gathered from
+    the arrays in a parallel map, so memory use is independent of the dataset size.
+    When caching is enabled the gathered batches are cached in order and shuffled at
+    batch level afterwards, so later epochs skip the gather entirely.
+    
+    Args:
+        features (ndarray): Feature matrix of shape (rows, features).
+        labels (ndarray): Label vector of shape (rows,).
+        batch_size (int): Number of examples per batch.
+        shuffle_buffer (int): Shuffle buffer size, or None to keep the original order.
+        cache (bool or str): False to disable caching, True to cache in memory, or a file
+            path prefix to cache on local disk.
+        seed (int): Optional shuffle seed.
+        num_parallel_calls (int): Parallelism of the gather map.
+        prefetch (bool): Whether to prefetch batches with AUTOTUNE.
+    
+    Returns:
+        tf.data.Dataset: Dataset yielding (features, labels) batches.
+    """
+    n_rows, n_features = features.shape
+    gather = _gather_batch(features, labels)
+    
+    def load(indices):
+        X, y = tf.numpy_function(gather, [indices], [tf.float32, tf.float32])
+        X.set_shape([None, n_features])
+        y.set_shape([None])
+        return X, y
+    
+    dataset = tf.data.Dataset.range(n_rows)
+    if shuffle_buffer and not cache:
+        dataset = dataset.shuffle(shuffle_buffer, seed=seed, reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(load, num_parallel_calls=num_parallel_calls)
+    if cache:
+        dataset = dataset.cache('' if cache is True else cache)
+        if shuffle_buffer:
+            dataset = dataset.shuffle(max(1, shuffle_buffer // batch_size), seed=seed,
+                                      reshuffle_each_iteration=True)
+    if prefetch:
+        dataset = dataset.prefetch(AUTOTUNE)
+    return dataset
+
+def make_sharded_dataset(shard_paths, batch_size=256, shuffle_buffer=None, cache=False, seed=None,
+                         num_parallel_calls=AUTOTUNE):
+    """
+    Builds a batched tf.data.Dataset over a set of memory-mapped .npy shards.
+    
+    Without shuffling the shards are read one after the other. With shuffling, batches
+    are drawn from all shards at random in proportion to their sizes.
+    
+    Args:
+        shard_paths (list): (features_path, labels_path) pairs of .npy files.
+        batch_size (int): Number of examples per batch.
+        shuffle_buffer (int): Per-shard shuffle buffer size, or None to keep the original order.
+        cache (bool or str): Caching mode, see make_array_dataset. File caches get a
+            per-shard suffix.
+        seed (int): Optional shuffle seed.
+        num_parallel_calls (int): Parallelism of the gather map.
+    
+    Returns:
+        tf.data.Dataset: Dataset yielding (features, labels) batches.
+    """
+    datasets = []
+    sizes = []
+    for index, (features_path, labels_path) in enumerate(shard_paths):
+        features = np.load(features_path, mmap_mode='r')
+        labels = np.load(labels_path, mmap_mode='r')
+        shard_cache = f"{cache}-{index}" if isinstance(cache, str) else cache
+        datasets.append(make_array_dataset(features, labels, batch_size=batch_size,
+                                           shuffle_buffer=shuffle_buffer, cache=shard_cache, seed=seed,
+                                           num_parallel_calls=num_parallel_calls, prefetch=False))
+        sizes.append(len(labels))
+    
+    if shuffle_buffer:
+        weights = [size / sum(sizes) for size in sizes]
+        dataset = tf.data.Dataset.sample_from_datasets(datasets, weights=weights, seed=seed,
+                                                       stop_on_empty_dataset=False)
+    else:
+        dataset = datasets[0]
+        for shard in datasets[1:]:
+            dataset = dataset.concatenate(shard)
+    return dataset.prefetch(AUTOTUNE)
+
+class ThroughputCallback(tf.keras.callbacks.Callback):
+    """
+    Keras callback that measures training throughput in examples per second.
+    
+    Only the training part of an epoch is timed; validation at the end of the epoch is
+    excluded. The throughput of every epoch is logged, added to the epoch logs (and
+    therefore to the History object) as 'examples_per_second', and kept in
+    `epoch_throughput`.
+    """
+    
+    def __init__(self, examples_per_epoch):
+        """
+        Args:
+            examples_per_epoch (int): Number of training examples seen per epoch.
+        """
+        super().__init__()
+        self.examples_per_epoch = examples_per_epoch
+        self.epoch_throughput = []
+        self._epoch_start = None
+        self._train_end = None
+    
+    def on_epoch_begin(self, epoch, logs=None):
+        self._epoch_start = time.perf_counter()
+        self._train_end = None
+    
+    def on_test_begin(self, logs=None):
+        if self._epoch_start is not None and self._train_end is None:
+            self._train_end = time.perf_counter()
+    
+    def on_epoch_end(self, epoch, logs=None):
+        elapsed = (self._train_end or time.perf_counter()) - self._epoch_start
+        throughput = self.examples_per_epoch / elapsed if elapsed > 0 else 0.0
+        self.epoch_throughput.append(throughput)
+        self._epoch_start = None
+        if logs is not None:
+            logs['examples_per_second'] = throughput
+        logger.info(f"Epoch {epoch + 1}: {throughput:.0f} examples/s ({elapsed:.2f}s)")
+
+# Example usage
+if __name__ == "__main__":
+    from streaming_preprocessor import load_preprocessed_arrays
+    
+    output_dir = "/path/to/preprocessed/"  # Example path
+    X_train, X_test, y_train, y_test = load_preprocessed_arrays(output_dir)
+    train_dataset = make_array_dataset(X_train, y_train, batch_size=512, shuffle_buffer=100000)
+    for X_batch, y_batch in train_dataset.take(1):
+        print(X_batch.shape, y_batch.shape)
@@ -0,0 +1,166 @@
+
+"""
+Training Benchmark and Tuning Harness
+-------------------------------------
+This script benchmarks the classifier from enhanced_ml_dl_system_integration under
+different training configurations and picks the fastest one that is still accurate
+enough. Every configuration runs in a fresh process, because TensorFlow's thread
+pools can only be configured before the runtime initializes, and so that peak memory
+is measured per configuration.
+
+Features included:
+- Sweeps over batch size, intra/inter-op thread counts, XLA jit compilation and
+  bfloat16 mixed precision on CPU.
+- Median step time, examples per second, accuracy and peak RSS for each configuration.
+- Selection of the fastest configuration meeting an accuracy floor.
+
+Paths and Files (Commented Out):
+# Preprocessed Arrays Directory: /path/to/preprocessed/
+"""
+
+import json
+import time
+import logging
+import resource
+import itertools
+import statistics
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+TrainingConfig = namedtuple(
+    'TrainingConfig',
+    ['batch_size', 'intra_op_threads', 'inter_op_threads', 'jit_compile', 'mixed_precision']
+)
+
+def _peak_rss_mb():
+    """
+    Returns the peak resident set size of the current process in megabytes.
+    
+    Returns:
+        float: Peak RSS in MB.
+    """
+    # ru_maxrss is reported in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _run_config(config, data_dir, epochs, warmup_steps):
+    """
+    Trains and evaluates the model with one configuration. Runs in a child process.
+    
+    Args:
+        config (TrainingConfig): Configuration to benchmark.
+        data_dir (str): Directory with the arrays written by streaming_preprocessor.
+        epochs (int): Number of training epochs.
+        warmup_steps (int): Number of initial steps excluded from the step time (tracing,
+            XLA compilation and cache warm-up).
+    
+    Returns:
+        dict: The configuration and its measurements.
+    """
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(config.intra_op_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(config.inter_op_threads)
+    
+    from enhanced_ml_dl_system_integration import build_model
+    from streaming_preprocessor import load_preprocessed_arrays
+    from tf_input_pipeline import make_array_dataset
+    
+    class StepTimer(tf.keras.callbacks.Callback):
+        def __init__(self):
+            super().__init__()
+            self.step_times = []
+            self._step_start = None
+        
+        def on_train_batch_begin(self, batch, logs=None):
+            self._step_start = time.perf_counter()
+        
+        def on_train_batch_end(self, batch, logs=None):
+            self.step_times.append(time.perf_counter() - self._step_start)
+    
+    X_train, X_test, y_train, y_test = load_preprocessed_arrays(data_dir)
+    train_dataset = make_array_dataset(X_train, y_train, batch_size=config.batch_size, shuffle_buffer=len(y_train))
+    test_dataset = make_array_dataset(X_test, y_test, batch_size=max(config.batch_size, 1024))
+    
+    model = build_model(X_train.shape[1], jit_compile=config.jit_compile, mixed_precision=config.mixed_precision)
+    timer = StepTimer()
+    start = time.perf_counter()
+    model.fit(train_dataset, epochs=epochs, callbacks=[timer], verbose=0)
+    training_time = time.perf_counter() - start
+    loss, accuracy = model.evaluate(test_dataset, verbose=0)
+    
+    steady_steps = timer.step_times[warmup_steps:] or timer.step_times
+    step_time = statistics.median(steady_steps)
+    return {
+        'config': config._asdict(),
+        'step_time_ms': step_time * 1000,
+        'examples_per_second': config.batch_size / step_time if step_time > 0 else 0.0,
+        'training_time_s': training_time,
+        'loss': float(loss),
+        'accuracy': float(accuracy),
+        'peak_rss_mb': _peak_rss_mb(),
+    }
+
+def benchmark_config(config, data_dir, epochs=2, warmup_steps=10):
+    """
+    Benchmarks one configuration in a fresh process.
+    
+    Args:
+        config (TrainingConfig): Configuration to benchmark.
+        data_dir (str): Directory with the arrays written by streaming_preprocessor.
+        epochs (int): Number of training epochs.
+        warmup_steps (int): Number of initial steps excluded from the step time.
+    
+    Returns:
+        dict: The configuration and its measurements, or the error if the run failed.
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        try:
+            return executor.submit(_run_config, config, data_dir, epochs, warmup_steps).result()
+        except Exception as e:
+            logger.error(f"Configuration {config} failed: {e}")
+            return {'config': config._asdict(), 'error': str(e)}
+
+def tune_training(data_dir, batch_sizes=(32, 128, 512), thread_settings=((0, 0),), jit_options=(False, True),
+                  mixed_precision_options=(False, True), accuracy_floor=0.0, epochs=2, warmup_steps=10):
+    """
+    Sweeps training configurations and returns the fastest one meeting an accuracy floor.
+    
+    Configurations run one at a time so they do not compete for cores.
+    
+    Args:
+        data_dir (str): Directory with the arrays written by streaming_preprocessor.
+        batch_sizes (tuple): Batch sizes to try.
+        thread_settings (tuple): (intra_op, inter_op) thread counts to try; 0 lets TensorFlow decide.
+        jit_options (tuple): XLA jit compilation settings to try.
+        mixed_precision_options (tuple): Mixed precision settings to try.
+        accuracy_floor (float): Minimum test accuracy for a configuration to be selected.
+        epochs (int): Number of training epochs per configuration.
+        warmup_steps (int): Number of initial steps excluded from the step time.
+    
+    Returns:
+        dict: All results and the best configuration ('best' is None if none met the floor).
+    """
+    results = []
+    for batch_size, (intra, inter), jit_compile, mixed_precision in itertools.product(
+            batch_sizes, thread_settings, jit_options, mixed_precision_options):
+        config = TrainingConfig(batch_size, intra, inter, jit_compile, mixed_precision)
+        result = benchmark_config(config, data_dir, epochs=epochs, warmup_steps=warmup_steps)
+        if 'error' not in result:
+            logger.info(f"{config}: {result['examples_per_second']:.0f} examples/s, "
+                        f"{result['step_time_ms']:.2f} ms/step, accuracy {result['accuracy']:.4f}, "
+                        f"peak RSS {result['peak_rss_mb']:.0f} MB")
+        results.append(result)
+    
+    eligible = [r for r in results if 'error' not in r and r['accuracy'] >= accuracy_floor]
+    best = max(eligible, key=lambda r: r['examples_per_second']) if eligible else None
+    return {'results': results, 'best': best}
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    data_dir = "/path/to/preprocessed/"  # Example path
+    report = tune_training(data_dir, thread_settings=((0, 0), (4, 2), (8, 1)), accuracy_floor=0.85)
+    print(json.dumps(report['best'], indent=4))
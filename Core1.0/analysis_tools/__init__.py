@@ -3,12 +3,16 @@ analysis_tools Module
 ---------------------
 This module provides various tools for code analysis, including metrics calculation,
 file operations, and security checks. Designed to support the development and maintenance
-of high-quality, secure code.
+of high-quality, secure code. analysis_driver runs all registered analyses in a single
+pass with one parse per file, and incremental_report updates summary reports from
+the files changed since a git revision.
 """
 
 # Import submodules to make them accessible via analysis_tools.<module_name>
+from . import analysis_driver
 from . import code_metrics
 from . import file_operations
+from . import incremental_report
 from . import security_checks
 
 # Optionally, define any shared resources or configurations here
@@ -18,20 +22,22 @@ logger = logging.getLogger('analysis_tools')
 logger.setLevel(logging.INFO)
 
 # Example of a higher-level function that abstracts individual tools for a common task
-def perform_security_audit(code_path):
+def perform_security_audit(code_path, output_path=None, output_format='sarif', workers=None):
     """
     Performs a comprehensive security audit on the specified code directory.
-    This is a high-level function that utilizes individual tools from the module.
+    This is a high-level function that utilizes individual tools from the module:
+    the files are scanned in parallel (reusing cached results of unchanged files) and
+    the findings are written to one SARIF or JSON Lines report.
     """
     logger.info("Starting security audit...")
     
-    # Assuming these functions are defined in the respective submodules
-    files = file_operations.list_all_files(code_path)
-    for file in files:
-        report = security_checks.analyze_security(file)
-        logger.info(f"Security analysis for {file}: {report}")
+    files = file_operations.list_all_files(code_path, "*.py")
+    findings = security_checks.scan_security([str(file) for file in files], workers=workers)
+    if output_path:
+        security_checks.write_findings(findings, output_path, output_format, base_path=code_path)
 
-    logger.info("Security audit complete.")
+    logger.info(f"Security audit complete: {len(findings)} findings in {len(files)} files.")
+    return findings
 
 # Making key functionalities directly accessible via the module
-__all__ = ['code_metrics', 'file_operations', 'security_checks', 'perform_security_audit']
+__all__ = ['analysis_driver', 'code_metrics', 'file_operations', 'incremental_report', 'security_checks', 'perform_security_audit']
@@ -0,0 +1,176 @@
+"""
+analysis_driver Module
+----------------------
+Single-pass driver for the analysis tools. The tree is walked once, each file is read
+and parsed to an AST once, and every registered analysis (Radon metrics and
+complexity, lint, security rules, ...) runs on that shared parse; the results of a
+file are merged into one record. With N analyses the cost is one read and one parse
+per file, not N, and each analysis result is cached per content hash.
+
+Analyses that inspect individual AST nodes are written as rules: a rule declares the
+node types it handles and the driver dispatches nodes to all rules of an analysis
+during a single ast.walk of the tree.
+"""
+
+import ast
+import logging
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .metrics_engine import (METRICS_ANALYSIS, Analysis, ParsedSource, ResultStore, iter_content_results,
+                             iter_file_results, walk_files)
+from .lint_checks import LINT_ANALYSIS
+
+logger = logging.getLogger(__name__)
+
+_ANALYSES = {}
+
+def register_analysis(name: str, analysis: Analysis):
+    """
+    Registers a per-file analysis under a name; registered analyses run in
+    registration order.
+
+    :param name: Result name, e.g. 'security'.
+    :param analysis: Analysis whose function receives the shared ParsedSource.
+    """
+    _ANALYSES[name] = analysis
+
+def registered_analyses() -> List[str]:
+    """
+    Returns the names of the registered analyses.
+    """
+    return list(_ANALYSES)
+
+class NodeRule:
+    """
+    Base class of AST rules run by the driver.
+
+    Subclasses set `rule_id`, the AST node classes in `node_types` and implement
+    `check`, or override `check_source` for checks on the whole file. Increment
+    `version` when a rule changes, so that cached results are recomputed.
+    """
+    rule_id = ''
+    node_types = ()
+    version = 1
+
+    def check(self, node: ast.AST, source: ParsedSource) -> Iterable[Dict]:
+        """
+        Checks one node of a type listed in `node_types`.
+
+        :return: Findings, see finding().
+        """
+        return ()
+
+    def check_source(self, source: ParsedSource) -> Iterable[Dict]:
+        """
+        Checks the whole file once; called even when the file cannot be parsed.
+
+        :return: Findings, see finding().
+        """
+        return ()
+
+    def finding(self, line_number: int, column_number: int, message: str, severity: str = 'warning') -> Dict:
+        """
+        Builds a finding record of this rule.
+        """
+        return {'rule_id': self.rule_id, 'line_number': line_number, 'column_number': column_number,
+                'message': message, 'severity': severity}
+
+def run_rules(source: ParsedSource, rules: Sequence[NodeRule]) -> List[Dict]:
+    """
+    Runs rules over a file with a single walk of its AST.
+
+    :param source: Parsed file.
+    :param rules: Rules to run.
+    :return: Findings of all rules, sorted by position.
+    """
+    findings = []
+    for rule in rules:
+        findings.extend(rule.check_source(source))
+    if source.tree is not None:
+        handlers = {}
+        for rule in rules:
+            for node_type in rule.node_types:
+                handlers.setdefault(node_type, []).append(rule)
+        for node in ast.walk(source.tree):
+            for rule in handlers.get(type(node), ()):
+                findings.extend(rule.check(node, source))
+    findings.sort(key=lambda finding: (finding['line_number'], finding['column_number'], finding['rule_id']))
+    return findings
+
+def rules_analysis(name: str, rules: Sequence[NodeRule]) -> Analysis:
+    """
+    Builds an analysis running a set of rules in one AST walk; its cache kind changes
+    whenever a rule is added, removed or has its version bumped.
+
+    :param name: Analysis name, used in the cache kind.
+    :param rules: Rule instances; they must be picklable to run in worker processes.
+    """
+    signature = ','.join(f"{rule.rule_id}.{rule.version}" for rule in rules)
+    return Analysis(f"rules/{name}/{signature}", partial(run_rules, rules=tuple(rules)))
+
+class AnalysisDriver:
+    """
+    Runs a set of registered analyses over files in one pass.
+    """
+
+    def __init__(self, analyses: Optional[Iterable[str]] = None, cache_path: Optional[str] = None,
+                 use_cache: bool = True, workers: Optional[int] = None):
+        """
+        :param analyses: Names of the analyses to run; defaults to all registered analyses.
+        :param cache_path: Results store path; defaults to metrics_engine.default_cache_path().
+        :param use_cache: Whether results are cached by content hash.
+        :param workers: Number of worker processes; defaults to the CPU count.
+        """
+        names = registered_analyses() if analyses is None else list(analyses)
+        unknown = [name for name in names if name not in _ANALYSES]
+        if unknown:
+            raise ValueError(f"Unknown analyses {unknown}; registered: {registered_analyses()}")
+        self.analyses = {name: _ANALYSES[name] for name in names}
+        self.cache_path = cache_path
+        self.use_cache = use_cache
+        self.workers = workers
+
+    def iter_results(self, paths: Iterable[str], file_pattern: str = "*.py") -> Iterator[Dict]:
+        """
+        Yields the merged results of every file as soon as they are available.
+
+        :param paths: Directories and/or files.
+        :param file_pattern: Pattern of the files to analyze in directories.
+        :return: Iterator of {'file_path': ..., <analysis name>: <result>, ...} dictionaries.
+        """
+        store = ResultStore(self.cache_path) if self.use_cache else None
+        try:
+            yield from iter_file_results(walk_files(paths, file_pattern), self.analyses, store, self.workers)
+        finally:
+            if store:
+                store.close()
+
+    def iter_content_results(self, items: Iterable[Tuple[str, bytes]]) -> Iterator[Dict]:
+        """
+        Like iter_results, for (file path, source bytes) pairs that are not read from
+        disk, e.g. the files of another git revision.
+        """
+        store = ResultStore(self.cache_path) if self.use_cache else None
+        try:
+            yield from iter_content_results(items, self.analyses, store, self.workers)
+        finally:
+            if store:
+                store.close()
+
+    def run(self, paths: Iterable[str], file_pattern: str = "*.py") -> Dict[str, Dict]:
+        """
+        Analyzes files and returns the merged results by file path.
+        """
+        results = {result.pop('file_path'): result for result in self.iter_results(paths, file_pattern)}
+        return dict(sorted(results.items()))
+
+register_analysis('metrics', METRICS_ANALYSIS)
+register_analysis('lint', LINT_ANALYSIS)
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    driver = AnalysisDriver()
+    for file_path, results in driver.run('./path/to/your/code_directory').items():
+        print(file_path, {name: len(result) for name, result in results.items()})
@@ -2,91 +2,93 @@
 Enhanced code_metrics Module
 ----------------------------
 Extensively analyzes Python projects for quality, complexity, and potential issues. 
-It integrates Radon for in-depth metrics and complexity analysis, and leverages flake8
-for code quality checks, providing a comprehensive quality report.
+It integrates Radon for in-depth metrics and complexity analysis, and runs flake8's
+pyflakes and pycodestyle checks in process for code quality, providing a comprehensive
+quality report. Directory analysis runs on a process pool, reads and parses every file
+once for all checks, and reuses cached results of unchanged files (see metrics_engine).
+As part of the analysis_tools package, the module is run from Core1.0 with
+`python -m analysis_tools.code_metrics`.
 """
 
-import os
 import json
-import subprocess
-from glob import iglob
-from radon.raw import analyze as radon_analyze
-from radon.complexity import cc_visit, cc_rank
-from radon.metrics import mi_visit
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
+from .metrics_engine import compute_metrics, decode_source, with_file_path
+from .lint_checks import with_filename
+from .analysis_driver import AnalysisDriver
+from .incremental_report import REPORT_ANALYSES, ReportAggregate, file_contribution, incremental_summary_report
 
 def analyze_file_with_radon(file_path: str) -> Dict:
     """
     Analyzes a single file with Radon, extracting metrics, cyclomatic complexity,
     and maintainability index.
     """
-    with open(file_path, 'r') as file:
-        content = file.read()
+    with open(file_path, 'rb') as file:
+        content = decode_source(file.read())
 
-    analysis_results = radon_analyze(content)
-    complexity_results = cc_visit(content)
-    maintainability_index = mi_visit(content, analysis_results.multi)
+    return with_file_path(file_path, compute_metrics(content))
 
-    complexity_scores = [
-        (fn.name, fn.complexity, cc_rank(fn.complexity))
-        for fn in complexity_results
-    ]
+def iter_directory_metrics(directory_path: str, file_pattern: str = "*.py", workers: Optional[int] = None,
+                           cache_path: Optional[str] = None, use_cache: bool = True):
+    """
+    Yields Radon metrics for the Python files in a directory as they finish.
 
-    return {
-        'file_path': file_path,
-        'total_lines': analysis_results.loc,
-        'code_lines': analysis_results.lloc,
-        'comment_lines': analysis_results.comments,
-        'comment_density': analysis_results.comments / analysis_results.lloc if analysis_results.lloc else 0,
-        'complexity_scores': complexity_scores,
-        'maintainability_index': maintainability_index
-    }
+    :param directory_path: Directory to analyze recursively.
+    :param file_pattern: Pattern of the files to analyze.
+    :param workers: Number of worker processes; defaults to the CPU count.
+    :param cache_path: Results store path; defaults to metrics_engine.default_cache_path().
+    :param use_cache: Whether results are cached by content hash.
+    """
+    driver = AnalysisDriver(['metrics'], cache_path, use_cache, workers)
+    for results in driver.iter_results(directory_path, file_pattern):
+        yield with_file_path(results['file_path'], results['metrics'])
 
-def analyze_directory_with_radon(directory_path: str, file_pattern: str = "*.py") -> List[Dict]:
+def analyze_directory_with_radon(directory_path: str, file_pattern: str = "*.py", workers: Optional[int] = None,
+                                 cache_path: Optional[str] = None, use_cache: bool = True) -> List[Dict]:
     """
     Aggregates Radon metrics and analysis across all Python files in a directory.
+    Files that cannot be parsed are skipped.
     """
-    files = iglob(os.path.join(directory_path, "**", file_pattern), recursive=True)
-    return [analyze_file_with_radon(file_path) for file_path in files]
+    metrics = iter_directory_metrics(directory_path, file_pattern, workers, cache_path, use_cache)
+    return sorted((m for m in metrics if 'error' not in m), key=lambda m: m['file_path'])
 
-def run_flake8_analysis(directory_path: str) -> Dict:
+def run_flake8_analysis(directory_path: str, workers: Optional[int] = None, cache_path: Optional[str] = None,
+                        use_cache: bool = True) -> Dict:
     """
-    Runs flake8 analysis on a directory, capturing output for report inclusion.
+    Runs flake8's checks (pyflakes, and pycodestyle when installed) on a directory in
+    process, capturing violations for report inclusion in the layout of flake8's JSON
+    output: file path mapped to violation records.
     """
-    try:
-        result = subprocess.run(['flake8', directory_path, '--format=json'], capture_output=True, text=True)
-        if result.stdout.strip():
-            return json.loads(result.stdout)
-        else:
-            print("flake8 did not return any output.")
-            return {}
-    except subprocess.CalledProcessError as e:
-        print(f"Error running flake8: {e}")
-    except json.JSONDecodeError as e:
-        print(f"Failed to decode flake8 output as JSON: {e}")
-    return {}
+    driver = AnalysisDriver(['lint'], cache_path, use_cache, workers)
+    return {file_path: with_filename(file_path, results['lint'])
+            for file_path, results in driver.run(directory_path).items() if results['lint']}
 
-def generate_summary_report(directory_path: str) -> Dict:
+def generate_summary_report(directory_path: str, on_file_metrics: Optional[Callable[[Dict], None]] = None,
+                            workers: Optional[int] = None, cache_path: Optional[str] = None,
+                            use_cache: bool = True, base_revision: Optional[str] = None) -> Dict:
     """
     Generates a comprehensive summary report based on Radon metrics and flake8 analysis.
+    Both run in one pass over the files; per-file metrics are aggregated as they stream
+    in and passed to on_file_metrics, if given, as soon as each file is done.
+
+    With base_revision (a git revision such as 'origin/main'), only the files changed
+    since that revision are analyzed and merged into the cached report of the revision
+    (see incremental_report); the report then also has 'base_revision' and
+    'changed_files' entries, and files ignored by git are left out.
     """
-    metrics_list = analyze_directory_with_radon(directory_path)
-    flake8_violations = run_flake8_analysis(directory_path)
+    if base_revision is not None:
+        return incremental_summary_report(directory_path, base_revision, on_file_metrics, workers, cache_path,
+                                          use_cache)
 
-    report = {
-        'total_files_analyzed': len(metrics_list),
-        'total_code_lines': sum(m['code_lines'] for m in metrics_list),
-        'average_comment_density': sum(m['comment_density'] for m in metrics_list) / len(metrics_list) if metrics_list else 0,
-        'functions_with_high_complexity': [
-            (m['file_path'], fn[0], fn[1], fn[2]) for m in metrics_list for fn in m['complexity_scores'] if fn[1] > 10
-        ],
-        'maintainability_index_average': sum(m['maintainability_index'] for m in metrics_list) / len(metrics_list) if metrics_list else 0,
-        'flake8_violations': flake8_violations
-    }
+    aggregate = ReportAggregate()
+    driver = AnalysisDriver(REPORT_ANALYSES, cache_path, use_cache, workers)
+    for results in driver.iter_results(directory_path):
+        if on_file_metrics:
+            on_file_metrics(with_file_path(results['file_path'], results['metrics']))
+        aggregate.add(results['file_path'], file_contribution(results))
 
-    return report
+    return aggregate.report()
 
-# Example usage
+# Example usage (from Core1.0: python -m analysis_tools.code_metrics)
 if __name__ == "__main__":
     directory_path = './path/to/your/code_directory'
     summary_report = generate_summary_report(directory_path)
@@ -11,9 +11,11 @@ import shutil
 import re
 import logging
 from pathlib import Path
+from typing import List
 from cryptography.fernet import Fernet
 import boto3
 import pickle
+from .metrics_engine import walk_files
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -75,6 +77,17 @@ def decrypt_file(file_path: Path, key: bytes):
         decrypted_file.write(decrypted)
     logging.info(f"Decrypted {file_path}")
 
+def list_all_files(directory: Path, pattern: str = "*") -> List[Path]:
+    """
+    Lists the files under a directory matching a pattern, recursively, in sorted order.
+    Hidden files and directories are skipped.
+    
+    :param directory: Directory to list.
+    :param pattern: Glob pattern of the file names, e.g. "*.py".
+    :return: Paths of the matching files.
+    """
+    return [Path(path) for path in walk_files(str(directory), pattern)]
+
 # Ensure AWS credentials are configured
 # Example usage for cloud upload
 if __name__ == "__main__":
@@ -0,0 +1,238 @@
+"""
+incremental_report Module
+-------------------------
+Incremental summary reports driven by git. Instead of analyzing a whole directory,
+a report against a base revision starts from the cached baseline of that revision
+and re-analyzes only the Python files that `git diff --name-only` (plus untracked
+files) reports as changed; the aggregates are updated by removing the old
+contribution of each changed file and adding the new one.
+
+The baseline of a revision is built from the blobs of that revision (no checkout
+needed) the first time it is requested, using the per-file result cache, and is then
+stored in the results store under the revision's commit hash. Baselines are keyed by
+paths relative to the analyzed directory, so the same baseline serves every spelling
+of the directory path; the caller's spelling is only applied to the final report.
+"""
+
+import os
+import math
+import fnmatch
+import logging
+import subprocess
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .metrics_engine import DEFAULT_EXCLUDED_DIRS, ResultStore, with_file_path
+from .lint_checks import with_filename
+from .analysis_driver import AnalysisDriver
+
+logger = logging.getLogger(__name__)
+
+REPORT_ANALYSES = ['metrics', 'lint']
+
+def file_contribution(results: Dict) -> Dict:
+    """
+    Extracts what a file contributes to a summary report from its driver results.
+
+    :param results: Merged 'metrics' and 'lint' results of a file.
+    """
+    file_path = results['file_path']
+    metrics = results['metrics']
+    violations = with_filename(file_path, results['lint']) if results['lint'] else []
+    if 'error' in metrics:
+        return {'error': metrics['error'], 'flake8_violations': violations}
+    return {
+        'code_lines': metrics['code_lines'],
+        'comment_density': metrics['comment_density'],
+        'maintainability_index': metrics['maintainability_index'],
+        'high_complexity': [score for score in metrics['complexity_scores'] if score[1] > 10],
+        'flake8_violations': violations,
+    }
+
+class ReportAggregate:
+    """
+    Summary report aggregates that can be updated file by file.
+
+    Contributions are kept per file, so replacing or removing a file only touches
+    its own entry; the averages are summed with math.fsum when the report is built,
+    which keeps them independent of the order in which files were added.
+    """
+
+    def __init__(self, files: Optional[Dict[str, Dict]] = None):
+        """
+        :param files: Contributions by file path, see file_contribution.
+        """
+        self.files = dict(files or {})
+
+    def add(self, file_path: str, contribution: Dict):
+        """
+        Adds a file, replacing its previous contribution if there is one.
+        """
+        self.files[file_path] = contribution
+
+    def remove(self, file_path: str):
+        """
+        Removes a file's contribution, if any.
+        """
+        self.files.pop(file_path, None)
+
+    def report(self) -> Dict:
+        """
+        Returns the summary report, in the layout of code_metrics.generate_summary_report.
+        """
+        files = sorted(self.files.items())
+        analyzed = [contribution for _, contribution in files if 'error' not in contribution]
+        total_files = len(analyzed)
+        return {
+            'total_files_analyzed': total_files,
+            'total_code_lines': sum(contribution['code_lines'] for contribution in analyzed),
+            'average_comment_density':
+                math.fsum(c['comment_density'] for c in analyzed) / total_files if total_files else 0,
+            'functions_with_high_complexity': sorted(
+                (file_path, fn[0], fn[1], fn[2]) for file_path, contribution in files
+                for fn in contribution.get('high_complexity', [])
+            ),
+            'maintainability_index_average':
+                math.fsum(c['maintainability_index'] for c in analyzed) / total_files if total_files else 0,
+            'flake8_violations': {file_path: contribution['flake8_violations'] for file_path, contribution in files
+                                  if contribution['flake8_violations']},
+            'files_with_errors': [(file_path, contribution['error']) for file_path, contribution in files
+                                  if 'error' in contribution]
+        }
+
+def _git(directory_path: str, arguments: List[str], stdin: Optional[bytes] = None) -> bytes:
+    try:
+        result = subprocess.run(['git'] + arguments, cwd=directory_path, input=stdin, capture_output=True,
+                                check=True)
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"git {' '.join(arguments)} failed: {e.stderr.decode(errors='replace').strip()}")
+    return result.stdout
+
+def resolve_revision(directory_path: str, revision: str) -> str:
+    """
+    Resolves a revision (branch, tag, HEAD~1, ...) to its commit hash.
+    """
+    return _git(directory_path, ['rev-parse', '--verify', f"{revision}^{{commit}}"]).decode().strip()
+
+def _included(relative_path: str, file_pattern: str) -> bool:
+    # Same selection as walk_files: matching names, no hidden or excluded directories.
+    parts = relative_path.split('/')
+    if any(part.startswith('.') or part in DEFAULT_EXCLUDED_DIRS for part in parts[:-1]):
+        return False
+    return not parts[-1].startswith('.') and fnmatch.fnmatch(parts[-1], file_pattern)
+
+def changed_files(directory_path: str, base_revision: str, file_pattern: str = "*.py") -> List[str]:
+    """
+    Lists the files under a directory that differ from a base revision: files changed
+    in commits since the base and in the working tree, and untracked files.
+
+    :return: Paths relative to the directory.
+    """
+    # Without rename detection a renamed file is listed under its old and new paths,
+    # so the old path is removed from the baseline.
+    changed = _git(directory_path, ['diff', '--name-only', '--no-renames', '--relative', '-z', base_revision,
+                                    '--', '.'])
+    untracked = _git(directory_path, ['ls-files', '--others', '--exclude-standard', '-z', '--', '.'])
+    paths = {path for path in (changed + untracked).decode('utf-8', errors='surrogateescape').split('\0') if path}
+    return sorted(path for path in paths if _included(path, file_pattern))
+
+def revision_files(directory_path: str, revision: str, file_pattern: str = "*.py") -> Iterable[Tuple[str, bytes]]:
+    """
+    Reads the files under a directory as of a revision, without checking it out.
+
+    :return: (path relative to the directory, content) pairs.
+    """
+    listing = _git(directory_path, ['ls-tree', '-r', '-z', revision, '--', '.'])
+    blobs = []
+    for entry in listing.decode('utf-8', errors='surrogateescape').split('\0'):
+        if not entry:
+            continue
+        info, path = entry.split('\t', 1)
+        _, object_type, object_hash = info.split()
+        if object_type == 'blob' and _included(path, file_pattern):
+            blobs.append((path, object_hash))
+    if not blobs:
+        return []
+    # One git process streams all blobs.
+    output = _git(directory_path, ['cat-file', '--batch'], stdin=''.join(f"{h}\n" for _, h in blobs).encode())
+    files = []
+    position = 0
+    for path, _ in blobs:
+        header_end = output.index(b'\n', position)
+        size = int(output[position:header_end].split()[2])
+        files.append((path, output[header_end + 1:header_end + 1 + size]))
+        position = header_end + 1 + size + 1
+    return files
+
+def _relocate(file_path: str, contribution: Dict) -> Dict:
+    # Baseline lint records carry relative file names.
+    violations = contribution['flake8_violations']
+    return dict(contribution, flake8_violations=[dict(record, filename=file_path) for record in violations])
+
+def baseline_aggregate(directory_path: str, base_commit: str, driver: AnalysisDriver,
+                       store: Optional[ResultStore]) -> ReportAggregate:
+    """
+    Returns the report aggregate of a directory as of a commit, from the store if it
+    was built before. Files are keyed by their path relative to the directory.
+    """
+    kinds = ','.join(analysis.cache_kind for analysis in driver.analyses.values())
+    key = f"summary-relative/{os.path.realpath(directory_path)}@{base_commit}/{kinds}"
+    stored = store.get_report(key) if store else None
+    if stored is not None:
+        return ReportAggregate(stored)
+    items = list(revision_files(directory_path, base_commit))
+    aggregate = ReportAggregate({results['file_path']: file_contribution(results)
+                                 for results in driver.iter_content_results(items)})
+    if store:
+        store.put_report(key, aggregate.files)
+    logger.info(f"Built baseline of {directory_path} at {base_commit[:12]} from {len(items)} files")
+    return aggregate
+
+def incremental_summary_report(directory_path: str, base_revision: str,
+                               on_file_metrics: Optional[Callable[[Dict], None]] = None,
+                               workers: Optional[int] = None, cache_path: Optional[str] = None,
+                               use_cache: bool = True) -> Dict:
+    """
+    Generates the summary report of a directory by updating the baseline report of a
+    base revision with the files changed since then. Files ignored by git are not part
+    of the report.
+
+    :param directory_path: Directory inside a git work tree.
+    :param base_revision: Base revision, e.g. 'origin/main'.
+    :param on_file_metrics: Called with the metrics of every re-analyzed file.
+    :param workers: Number of worker processes; defaults to the CPU count.
+    :param cache_path: Results store path; defaults to metrics_engine.default_cache_path().
+    :param use_cache: Whether results and baselines are cached; without it the
+        baseline is rebuilt on every call.
+    :return: Summary report, plus 'base_revision' (commit hash) and 'changed_files'.
+    """
+    base_commit = resolve_revision(directory_path, base_revision)
+    driver = AnalysisDriver(REPORT_ANALYSES, cache_path, use_cache, workers)
+    store = ResultStore(cache_path) if use_cache else None
+    try:
+        aggregate = baseline_aggregate(directory_path, base_commit, driver, store)
+    finally:
+        if store:
+            store.close()
+
+    changed = changed_files(directory_path, base_commit)
+    existing = {}
+    for path in changed:
+        file_path = os.path.join(directory_path, path)
+        if os.path.isfile(file_path):
+            existing[file_path] = path
+        else:
+            aggregate.remove(path)
+    for results in driver.iter_results(list(existing)):
+        if on_file_metrics:
+            on_file_metrics(with_file_path(results['file_path'], results['metrics']))
+        aggregate.add(existing[results['file_path']], file_contribution(results))
+    logger.info(f"Re-analyzed {len(existing)} files changed since {base_commit[:12]}; "
+                f"the report covers {len(aggregate.files)} files")
+
+    report = ReportAggregate({
+        os.path.join(directory_path, path): _relocate(os.path.join(directory_path, path), contribution)
+        for path, contribution in aggregate.files.items()
+    }).report()
+    report['base_revision'] = base_commit
+    report['changed_files'] = [os.path.join(directory_path, path) for path in changed]
+    return report
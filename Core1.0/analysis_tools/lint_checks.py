@@ -0,0 +1,207 @@
+"""
+lint_checks Module
+------------------
+In-process lint checks for code_metrics.run_flake8_analysis. pyflakes runs on the AST
+shared with the Radon metrics pass and pycodestyle, when installed, on the already
+read lines, so linting needs no subprocess, no JSON formatter plugin and no second
+parse. Violations are returned as flake8-style records and cached per content hash
+by the metrics_engine result store.
+"""
+
+import os
+import re
+import time
+import logging
+import subprocess
+from typing import Dict, List, Optional
+
+import pyflakes
+from pyflakes.checker import Checker as PyflakesChecker
+
+try:
+    import pycodestyle
+except ImportError:
+    pycodestyle = None
+
+from .metrics_engine import Analysis, ParsedSource, ResultStore, iter_file_results, walk_files
+
+logger = logging.getLogger(__name__)
+
+# flake8's codes for pyflakes messages. Messages without a code are reported as 'F'.
+PYFLAKES_CODES = {
+    'UnusedImport': 'F401',
+    'ImportShadowedByLoopVar': 'F402',
+    'ImportStarUsed': 'F403',
+    'LateFutureImport': 'F404',
+    'ImportStarUsage': 'F405',
+    'ImportStarNotPermitted': 'F406',
+    'FutureFeatureNotDefined': 'F407',
+    'PercentFormatInvalidFormat': 'F501',
+    'PercentFormatExpectedMapping': 'F502',
+    'PercentFormatExpectedSequence': 'F503',
+    'PercentFormatExtraNamedArguments': 'F504',
+    'PercentFormatMissingArgument': 'F505',
+    'PercentFormatMixedPositionalAndNamed': 'F506',
+    'PercentFormatPositionalCountMismatch': 'F507',
+    'PercentFormatStarRequiresSequence': 'F508',
+    'PercentFormatUnsupportedFormatCharacter': 'F509',
+    'StringDotFormatInvalidFormat': 'F521',
+    'StringDotFormatExtraNamedArguments': 'F522',
+    'StringDotFormatExtraPositionalArguments': 'F523',
+    'StringDotFormatMissingArgument': 'F524',
+    'StringDotFormatMixingAutomatic': 'F525',
+    'FStringMissingPlaceholders': 'F541',
+    'TStringMissingPlaceholders': 'F542',
+    'MultiValueRepeatedKeyLiteral': 'F601',
+    'MultiValueRepeatedKeyVariable': 'F602',
+    'TooManyExpressionsInStarredAssignment': 'F621',
+    'TwoStarredExpressions': 'F622',
+    'AssertTuple': 'F631',
+    'IsLiteral': 'F632',
+    'InvalidPrintSyntax': 'F633',
+    'IfTuple': 'F634',
+    'BreakOutsideLoop': 'F701',
+    'ContinueOutsideLoop': 'F702',
+    'YieldOutsideFunction': 'F704',
+    'ReturnOutsideFunction': 'F706',
+    'DefaultExceptNotLast': 'F707',
+    'DoctestSyntaxError': 'F721',
+    'ForwardAnnotationSyntaxError': 'F722',
+    'RedefinedWhileUnused': 'F811',
+    'UndefinedName': 'F821',
+    'UndefinedExport': 'F822',
+    'UndefinedLocal': 'F823',
+    'UnusedIndirectAssignment': 'F824',
+    'DuplicateArgument': 'F831',
+    'UnusedVariable': 'F841',
+    'UnusedAnnotation': 'F842',
+    'RaiseNotImplemented': 'F901',
+}
+
+LINT_KIND = f"lint/pyflakes-{pyflakes.__version__}/pycodestyle-{pycodestyle.__version__ if pycodestyle else 'none'}"
+
+# flake8's inline suppression comment: "# noqa" or "# noqa: E501,F401".
+_NOQA = re.compile(r'#\s*noqa(?::[\s]?(?P<codes>[A-Z][0-9]+(?:[,\s]+[A-Z][0-9]+)*))?', re.IGNORECASE)
+
+def _suppressed(record: Dict) -> bool:
+    match = _NOQA.search(record['physical_line'] or '')
+    if match is None:
+        return False
+    codes = match.group('codes')
+    return codes is None or any(record['code'].startswith(code) for code in re.split(r'[,\s]+', codes.upper()))
+
+def _record(code: str, line_number: int, column_number: int, text: str, lines: List[str]) -> Dict:
+    physical_line = lines[line_number - 1] if 0 < line_number <= len(lines) else None
+    return {'code': code, 'line_number': line_number, 'column_number': column_number, 'text': text,
+            'physical_line': physical_line}
+
+if pycodestyle is not None:
+    class _CollectingReport(pycodestyle.BaseReport):
+        """
+        pycodestyle report that keeps the errors instead of printing them.
+        """
+
+        def __init__(self, options):
+            super().__init__(options)
+            self.errors = []
+
+        def error(self, line_number, offset, text, check):
+            code = super().error(line_number, offset, text, check)
+            if code:
+                self.errors.append((code, line_number, offset + 1, text[5:]))
+            return code
+
+    # flake8's defaults: max line length 79 and pycodestyle's default ignore list.
+    _STYLE_OPTIONS = pycodestyle.StyleGuide(quiet=True, max_line_length=79).options
+
+def lint_source(source: ParsedSource) -> List[Dict]:
+    """
+    Lints a parsed file with pyflakes and pycodestyle.
+
+    :param source: File read and parsed by metrics_engine.
+    :return: Records with code, line_number, column_number (1-based), text and
+        physical_line, sorted by position; a file that cannot be parsed gives E999.
+    """
+    if source.tree is None:
+        error = source.syntax_error
+        line_number = getattr(error, 'lineno', None) or 1
+        column_number = getattr(error, 'offset', None) or 1
+        message = getattr(error, 'msg', None) or str(error)
+        return [_record('E999', line_number, column_number, f"{type(error).__name__}: {message}", source.lines)]
+
+    records = []
+    checker = PyflakesChecker(source.tree, filename=source.file_path)
+    for message in checker.messages:
+        code = PYFLAKES_CODES.get(type(message).__name__, 'F')
+        records.append(_record(code, message.lineno, message.col + 1, message.message % message.message_args,
+                               source.lines))
+    if pycodestyle is not None:
+        report = _CollectingReport(_STYLE_OPTIONS)
+        pycodestyle.Checker(source.file_path, lines=source.lines, options=_STYLE_OPTIONS, report=report).check_all()
+        records.extend(_record(code, line_number, column_number, text, source.lines)
+                       for code, line_number, column_number, text in report.errors)
+    records = [record for record in records if not _suppressed(record)]
+    records.sort(key=lambda record: (record['line_number'], record['column_number'], record['code']))
+    return records
+
+LINT_ANALYSIS = Analysis(LINT_KIND, lint_source)
+
+def with_filename(file_path: str, records: List[Dict]) -> List[Dict]:
+    """
+    Adds the file name to cached lint records, as in flake8's JSON output.
+    """
+    return [dict(record, filename=file_path) for record in records]
+
+def lint_directory(directory_path: str, workers: Optional[int] = None, cache_path: Optional[str] = None,
+                   use_cache: bool = True) -> Dict[str, List[Dict]]:
+    """
+    Lints every Python file in a directory in process, in parallel, with caching.
+
+    :param directory_path: Directory to lint recursively.
+    :param workers: Number of worker processes; defaults to the CPU count.
+    :param cache_path: Results store path; defaults to metrics_engine.default_cache_path().
+    :param use_cache: Whether results are cached by content hash.
+    :return: Mapping of file path to its violations, for files with violations
+        (the layout of flake8 --format=json).
+    """
+    store = ResultStore(cache_path) if use_cache else None
+    violations = {}
+    try:
+        for results in iter_file_results(walk_files(directory_path), {'lint': LINT_ANALYSIS}, store, workers):
+            if results['lint']:
+                violations[results['file_path']] = with_filename(results['file_path'], results['lint'])
+    finally:
+        if store:
+            store.close()
+    return dict(sorted(violations.items()))
+
+def benchmark_lint(directory_path: str, workers: Optional[int] = None, cache_path: Optional[str] = None) -> Dict:
+    """
+    Compares the runtime of a flake8 subprocess with cold and warm in-process runs.
+
+    :param directory_path: Directory to lint.
+    :param workers: Number of worker processes of the in-process runs.
+    :param cache_path: Results store for the warm run; a temporary store is used if None.
+    :return: Seconds per approach and the number of violations found in process.
+    """
+    import tempfile
+    results = {}
+    try:
+        start = time.perf_counter()
+        subprocess.run(['flake8', directory_path], capture_output=True, text=True)
+        results['flake8_subprocess_seconds'] = time.perf_counter() - start
+    except FileNotFoundError:
+        logger.warning("flake8 is not installed; skipping the subprocess measurement")
+
+    with tempfile.TemporaryDirectory() as directory:
+        store_path = cache_path or os.path.join(directory, 'results.sqlite')
+        start = time.perf_counter()
+        violations = lint_directory(directory_path, workers, use_cache=False)
+        results['in_process_cold_seconds'] = time.perf_counter() - start
+        lint_directory(directory_path, workers, store_path)
+        start = time.perf_counter()
+        lint_directory(directory_path, workers, store_path)
+        results['in_process_warm_seconds'] = time.perf_counter() - start
+    results['violations'] = sum(len(records) for records in violations.values())
+    logger.info(f"Lint benchmark for {directory_path}: {results}")
+    return results
@@ -0,0 +1,429 @@
+"""
+metrics_engine Module
+---------------------
+Parallel, cached engine behind code_metrics.analyze_directory_with_radon. Each file is
+read once and parsed once: the same source string feeds Radon's raw metrics and the
+same AST feeds the complexity and Halstead visitors, from which the maintainability
+index is computed directly. Other per-file analyses (e.g. lint_checks) run on the same
+read and AST in the same pass. Files are analyzed in a process pool and results are
+cached in a SQLite store keyed on the content hash, so after a small commit only the
+changed files are analyzed again.
+"""
+
+import io
+import os
+import ast
+import json
+import fnmatch
+import sqlite3
+import hashlib
+import logging
+import itertools
+import threading
+import tokenize
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+
+import radon
+from radon.raw import analyze as radon_analyze
+from radon.complexity import cc_rank
+from radon.metrics import h_visit_ast, mi_compute
+from radon.visitors import ComplexityVisitor
+
+logger = logging.getLogger(__name__)
+
+# Directories never descended into when walking a tree, besides hidden ones (.git, .venv, ...).
+DEFAULT_EXCLUDED_DIRS = {'__pycache__', 'node_modules'}
+
+# Cache kind of the metrics: results computed by another Radon version are not reused.
+METRICS_KIND = f"metrics/radon-{radon.__version__}"
+
+def default_cache_path() -> str:
+    """
+    Returns the default location of the results store, in the user's cache directory.
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'analysis_tools', 'results.sqlite')
+
+def decode_source(data: bytes) -> str:
+    """
+    Decodes Python source bytes using the encoding declared in the file (PEP 263).
+    """
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError:
+        encoding = 'utf-8'
+    return data.decode(encoding, errors='replace')
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def compute_metrics(content: str, tree: Optional[ast.AST] = None) -> Dict:
+    """
+    Computes the Radon metrics of a source string with a single parse.
+
+    Produces the same values as radon_analyze, cc_visit and mi_visit called on the
+    source, which parse it three times and tokenize it twice.
+
+    :param content: Python source.
+    :param tree: AST of the source, if already parsed.
+    :return: Metrics without the file path; see with_file_path().
+    """
+    if tree is None:
+        tree = ast.parse(content)
+    raw = radon_analyze(content)
+    visitor = ComplexityVisitor.from_ast(tree)
+    comment_percent = (raw.comments + raw.multi) / float(raw.sloc) * 100 if raw.sloc != 0 else 0
+    maintainability_index = mi_compute(h_visit_ast(tree).total.volume, visitor.total_complexity, raw.lloc,
+                                       comment_percent)
+    return {
+        'total_lines': raw.loc,
+        'code_lines': raw.lloc,
+        'comment_lines': raw.comments,
+        'comment_density': raw.comments / raw.lloc if raw.lloc else 0,
+        # Lists rather than tuples, so that fresh and cached (JSON) results are equal.
+        'complexity_scores': [[fn.name, fn.complexity, cc_rank(fn.complexity)] for fn in visitor.blocks],
+        'maintainability_index': maintainability_index
+    }
+
+class ParsedSource(NamedTuple):
+    """
+    A file as seen by the analyses: decoded once, split into lines once, parsed once.
+    """
+    file_path: str
+    content: str
+    lines: List[str]
+    tree: Optional[ast.AST]
+    syntax_error: Optional[Exception]
+
+def parse_source(file_path: str, data: bytes) -> ParsedSource:
+    content = decode_source(data)
+    try:
+        tree, syntax_error = ast.parse(content, filename=file_path), None
+    except (SyntaxError, ValueError, RecursionError) as e:
+        tree, syntax_error = None, e
+    return ParsedSource(file_path, content, content.splitlines(True), tree, syntax_error)
+
+class Analysis(NamedTuple):
+    """
+    A per-file analysis: `analyze` maps a ParsedSource to a JSON-serializable result,
+    which is cached under `cache_kind`. `analyze` must be a module-level function so
+    that it can be sent to worker processes.
+    """
+    cache_kind: str
+    analyze: Callable[[ParsedSource], Any]
+
+def _metrics_analysis(source: ParsedSource) -> Dict:
+    if source.tree is None:
+        error = source.syntax_error
+        return {'error': f"{type(error).__name__}: {error}"}
+    return compute_metrics(source.content, source.tree)
+
+METRICS_ANALYSIS = Analysis(METRICS_KIND, _metrics_analysis)
+
+def _analyze_batch(batch: List[Tuple[str, str, bytes, List[str]]],
+                   analyses: Dict[str, Analysis]) -> List[Tuple[str, str, Dict]]:
+    """
+    Worker task: runs the requested analyses on (file path, content hash, source bytes,
+    analysis names) entries.
+    """
+    results = []
+    for file_path, digest, data, names in batch:
+        source = parse_source(file_path, data)
+        file_results = {}
+        for name in names:
+            try:
+                file_results[name] = analyses[name].analyze(source)
+            except (ValueError, RecursionError) as e:
+                file_results[name] = {'error': f"{type(e).__name__}: {e}"}
+        results.append((file_path, digest, file_results))
+    return results
+
+class ResultStore:
+    """
+    Persistent store of per-file analysis results keyed on content hash.
+
+    Results are stored per analysis kind (e.g. 'metrics'), so several analyses can
+    share one store. The store also remembers the size, modification time and hash of
+    every path seen, so unchanged files are recognized without being read.
+    """
+
+    def __init__(self, store_path: Optional[str] = None):
+        """
+        :param store_path: SQLite file; defaults to default_cache_path().
+        """
+        self.store_path = store_path or default_cache_path()
+        directory = os.path.dirname(os.path.abspath(self.store_path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.store_path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS results (kind TEXT, content_hash TEXT, result TEXT, '
+            'PRIMARY KEY (kind, content_hash))'
+        )
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, content_hash TEXT)'
+        )
+        self._connection.execute('CREATE TABLE IF NOT EXISTS reports (key TEXT PRIMARY KEY, report TEXT)')
+        self._connection.commit()
+
+    def known_hash(self, path: str, stat: os.stat_result) -> Optional[str]:
+        """
+        Returns the content hash recorded for a path if its size and mtime are unchanged.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT size, mtime_ns, content_hash FROM files WHERE path = ?',
+                                           (path,)).fetchone()
+        if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+            return row[2]
+        return None
+
+    def remember_files(self, entries: Iterable[Tuple[str, os.stat_result, str]]):
+        rows = [(path, stat.st_size, stat.st_mtime_ns, digest) for path, stat, digest in entries]
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)', rows)
+
+    def get_many(self, kind: str, digests: List[str]) -> Dict[str, Dict]:
+        found = {}
+        with self._lock:
+            for start in range(0, len(digests), 500):
+                chunk = digests[start:start + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._connection.execute(
+                    f'SELECT content_hash, result FROM results WHERE kind = ? AND content_hash IN ({placeholders})',
+                    [kind] + chunk
+                ).fetchall()
+                found.update((digest, json.loads(result)) for digest, result in rows)
+        return found
+
+    def put_many(self, kind: str, results: Iterable[Tuple[str, Dict]]):
+        rows = [(kind, digest, json.dumps(result)) for digest, result in results]
+        with self._lock, self._connection:
+            self._connection.executemany('INSERT OR REPLACE INTO results VALUES (?, ?, ?)', rows)
+
+    def get_report(self, key: str) -> Optional[Dict]:
+        """
+        Returns a stored report (e.g. the baseline of a git revision), or None.
+        """
+        with self._lock:
+            row = self._connection.execute('SELECT report FROM reports WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_report(self, key: str, report: Dict):
+        """
+        Stores a JSON-serializable report under a key.
+        """
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO reports VALUES (?, ?)', (key, json.dumps(report)))
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
+
+def walk_files(paths: Iterable[str], file_pattern: str = "*.py",
+               excluded_dirs: Optional[set] = None) -> Iterator[str]:
+    """
+    Walks directories once, yielding the files that match a pattern in sorted order.
+    Like glob, hidden files and directories are skipped. Files given directly are
+    yielded as they are.
+
+    :param paths: Directories and/or files.
+    :param file_pattern: Pattern of the file names to yield.
+    :param excluded_dirs: Directory names not descended into; defaults to DEFAULT_EXCLUDED_DIRS.
+    """
+    excluded_dirs = DEFAULT_EXCLUDED_DIRS if excluded_dirs is None else excluded_dirs
+    if isinstance(paths, str):
+        paths = [paths]
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, subdirectories, files in os.walk(path):
+            subdirectories[:] = sorted(name for name in subdirectories
+                                       if name not in excluded_dirs and not name.startswith('.'))
+            for name in sorted(fnmatch.filter(files, file_pattern)):
+                if name.startswith('.'):
+                    continue
+                yield os.path.join(directory, name)
+
+# Files whose cached results are looked up together.
+LOOKUP_SIZE = 256
+
+def _file_entries(file_paths: Iterable[str],
+                  store: Optional[ResultStore]) -> Iterator[Tuple[str, str, Optional[bytes]]]:
+    """
+    Yields (file path, content hash, source bytes or None) for files, lazily. Files
+    whose size and mtime match the store are not read; their bytes are None.
+    """
+    files_seen = []
+    try:
+        for file_path in file_paths:
+            try:
+                stat = os.stat(file_path)
+            except OSError as e:
+                logger.warning(f"Cannot read {file_path}: {e}")
+                continue
+            digest = store.known_hash(os.path.abspath(file_path), stat) if store else None
+            data = None
+            if digest is None:
+                with open(file_path, 'rb') as file:
+                    data = file.read()
+                digest = content_hash(data)
+                files_seen.append((os.path.abspath(file_path), stat, digest))
+                if store and len(files_seen) >= LOOKUP_SIZE:
+                    store.remember_files(files_seen)
+                    files_seen = []
+            yield file_path, digest, data
+    finally:
+        if store and files_seen:
+            store.remember_files(files_seen)
+
+def iter_file_results(file_paths: Iterable[str], analyses: Dict[str, Analysis],
+                      store: Optional[ResultStore] = None, workers: Optional[int] = None,
+                      batch_size: int = 16) -> Iterator[Dict]:
+    """
+    Runs several analyses over files in one pass and yields each file's results as
+    soon as they are available.
+
+    Files are consumed lazily: they are stat-ed, read and looked up in the cache a few
+    hundred at a time, and files with missing results are analyzed in a process pool
+    in batches, with at most two batches per worker in flight. Memory use therefore
+    does not grow with the number of files. Only the analyses missing from the cache
+    are run; cached files are yielded in input order, analyzed files as their batch
+    completes.
+
+    :param file_paths: Files to analyze.
+    :param analyses: Mapping of result name to Analysis, run in this order.
+    :param store: Result store; None disables caching.
+    :param workers: Number of worker processes; defaults to the CPU count, 1 analyzes in-process.
+    :param batch_size: Files per worker task.
+    :return: Iterator of {'file_path': ..., <analysis name>: <result>, ...} dictionaries.
+    """
+    return _analyze_pending(_file_entries(file_paths, store), analyses, store, workers, batch_size)
+
+def iter_content_results(items: Iterable[Tuple[str, bytes]], analyses: Dict[str, Analysis],
+                         store: Optional[ResultStore] = None, workers: Optional[int] = None,
+                         batch_size: int = 16) -> Iterator[Dict]:
+    """
+    Like iter_file_results, for sources that are not files on disk, e.g. the blobs of
+    another git revision.
+
+    :param items: (file path, source bytes) pairs; the path is only used as a label.
+    """
+    pending = ((file_path, content_hash(data), data) for file_path, data in items)
+    return _analyze_pending(pending, analyses, store, workers, batch_size)
+
+class _BatchRunner:
+    """
+    Runs analysis batches in a process pool, keeping at most two batches per worker
+    in flight. The pool is only started once there is a second batch: a single batch
+    is analyzed in-process, which is faster than starting workers.
+    """
+
+    def __init__(self, analyses: Dict[str, Analysis], workers: Optional[int]):
+        self.analyses = analyses
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = 2 * self.workers
+        self._executor = None
+        self._held = None
+        self._in_flight = set()
+
+    def submit(self, batch: List[Tuple[str, str, bytes, List[str]]]) -> List[List[Tuple[str, str, Dict]]]:
+        """
+        Submits a batch and returns the results of the batches completed meanwhile.
+        """
+        if self.workers == 1:
+            return [_analyze_batch(batch, self.analyses)]
+        if self._executor is None:
+            if self._held is None:
+                self._held = batch
+                return []
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            self._in_flight.add(self._executor.submit(_analyze_batch, self._held, self.analyses))
+            self._held = None
+        self._in_flight.add(self._executor.submit(_analyze_batch, batch, self.analyses))
+        done = {future for future in self._in_flight if future.done()}
+        if len(self._in_flight) - len(done) >= self.max_in_flight:
+            done |= wait(self._in_flight - done, return_when=FIRST_COMPLETED).done
+        self._in_flight -= done
+        return [future.result() for future in done]
+
+    def finish(self) -> Iterator[List[Tuple[str, str, Dict]]]:
+        """
+        Yields the results of the remaining batches as they complete.
+        """
+        if self._held is not None:
+            batch, self._held = self._held, None
+            yield _analyze_batch(batch, self.analyses)
+        in_flight, self._in_flight = self._in_flight, set()
+        for future in as_completed(in_flight):
+            yield future.result()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+
+def _analyze_pending(pending: Iterable[Tuple[str, str, Optional[bytes]]], analyses: Dict[str, Analysis],
+                     store: Optional[ResultStore], workers: Optional[int], batch_size: int) -> Iterator[Dict]:
+    runner = _BatchRunner(analyses, workers)
+    # Cached results of files that are being analyzed for their other analyses.
+    partial = {}
+
+    def emit(results):
+        if store:
+            for name, analysis in analyses.items():
+                store.put_many(analysis.cache_kind, [(digest, file_results[name])
+                                                     for _, digest, file_results in results
+                                                     if name in file_results])
+        for file_path, digest, file_results in results:
+            cached = partial.pop((file_path, digest), {})
+            yield dict({'file_path': file_path},
+                       **{name: file_results[name] if name in file_results else cached[name] for name in analyses})
+
+    try:
+        batch = []
+        entries = iter(pending)
+        while True:
+            window = list(itertools.islice(entries, LOOKUP_SIZE))
+            if not window:
+                break
+            cached = {name: {} for name in analyses}
+            if store:
+                digests = sorted({digest for _, digest, _ in window})
+                for name, analysis in analyses.items():
+                    cached[name] = store.get_many(analysis.cache_kind, digests)
+            for file_path, digest, data in window:
+                missing = [name for name in analyses if digest not in cached[name]]
+                if not missing:
+                    yield dict({'file_path': file_path}, **{name: cached[name][digest] for name in analyses})
+                    continue
+                if len(missing) < len(analyses):
+                    partial[(file_path, digest)] = {name: cached[name][digest] for name in analyses
+                                                    if name not in missing}
+                if data is None:
+                    # Hash known from an earlier run, but some results are not cached.
+                    with open(file_path, 'rb') as file:
+                        data = file.read()
+                batch.append((file_path, digest, data, missing))
+                if len(batch) == batch_size:
+                    for results in runner.submit(batch):
+                        yield from emit(results)
+                    batch = []
+        if batch:
+            for results in runner.submit(batch):
+                yield from emit(results)
+        for results in runner.finish():
+            yield from emit(results)
+    finally:
+        runner.close()
+
+def with_file_path(file_path: str, metrics: Dict) -> Dict:
+    """
+    Returns a metrics result in the layout of code_metrics.analyze_file_with_radon.
+    """
+    metrics = dict({'file_path': file_path}, **metrics)
+    if 'complexity_scores' in metrics:
+        metrics['complexity_scores'] = [tuple(score) for score in metrics['complexity_scores']]
+    return metrics
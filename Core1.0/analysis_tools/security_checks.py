@@ -0,0 +1,330 @@
+"""
+security_checks Module
+----------------------
+Security scanner for Python code. AST rules flag dangerous calls and hard-coded
+credentials, and a single combined pattern detects well-known secret formats (cloud
+keys, tokens, private keys) anywhere in a file. The rules run as the 'security'
+analysis of analysis_driver: files are scanned by a worker pool, parsed once with
+the other analyses and results are cached per content hash. Findings are written as
+SARIF (for code scanning tools) or JSON Lines.
+"""
+
+import os
+import re
+import ast
+import json
+import logging
+from typing import Dict, List, Optional
+
+from .metrics_engine import ParsedSource
+from .analysis_driver import AnalysisDriver, NodeRule, register_analysis, rules_analysis
+
+logger = logging.getLogger(__name__)
+
+_aliases_cache = (None, {})
+
+def import_aliases(tree: ast.AST) -> Dict[str, str]:
+    """
+    Maps the names bound by the imports of a module to qualified names, e.g.
+    {'pk': 'pickle', 'run': 'subprocess.run'}. The result for the last tree is cached,
+    since every rule of a file needs it.
+    """
+    global _aliases_cache
+    if _aliases_cache[0] is tree:
+        return _aliases_cache[1]
+    aliases = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    aliases[alias.asname] = alias.name
+                else:
+                    top = alias.name.split('.')[0]
+                    aliases[top] = top
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            for alias in node.names:
+                aliases[alias.asname or alias.name] = f"{node.module}.{alias.name}"
+    _aliases_cache = (tree, aliases)
+    return aliases
+
+def qualified_name(node: ast.AST, source: ParsedSource) -> Optional[str]:
+    """
+    Resolves a called expression such as `pk.loads` to a qualified name ('pickle.loads')
+    through the module's imports; returns None for expressions that are not dotted names.
+    """
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(import_aliases(source.tree).get(node.id, node.id))
+    return '.'.join(reversed(parts))
+
+class CallRule(NodeRule):
+    """
+    Flags calls of a set of qualified names.
+    """
+    node_types = (ast.Call,)
+    names = frozenset()
+    message = ''
+    severity = 'warning'
+
+    def check(self, node, source):
+        name = qualified_name(node.func, source)
+        if name in self.names and self.applies(node):
+            yield self.finding(node.lineno, node.col_offset + 1, self.message.format(name=name), self.severity)
+
+    def applies(self, node: ast.Call) -> bool:
+        return True
+
+class PickleLoadRule(CallRule):
+    """
+    Deserialization with pickle and similar modules.
+    """
+    rule_id = 'B301'
+    names = frozenset({'pickle.load', 'pickle.loads', 'pickle.Unpickler', 'cPickle.load', 'cPickle.loads',
+                       '_pickle.load', '_pickle.loads', 'dill.load', 'dill.loads', 'shelve.open',
+                       'marshal.load', 'marshal.loads'})
+    message = "{name} can execute arbitrary code when loading untrusted data"
+
+class EvalRule(CallRule):
+    """
+    Dynamic code evaluation with eval or exec.
+    """
+    rule_id = 'B307'
+    names = frozenset({'eval', 'exec', 'builtins.eval', 'builtins.exec'})
+    message = "Use of {name}; consider ast.literal_eval or removing dynamic evaluation"
+
+class SubprocessShellRule(CallRule):
+    """
+    subprocess calls with shell=True.
+    """
+    rule_id = 'B602'
+    names = frozenset({'subprocess.call', 'subprocess.run', 'subprocess.Popen', 'subprocess.check_call',
+                       'subprocess.check_output'})
+    message = "{name} with shell=True is vulnerable to shell injection"
+    severity = 'error'
+
+    def applies(self, node):
+        for keyword in node.keywords:
+            if keyword.arg == 'shell':
+                value = keyword.value
+                return not (isinstance(value, ast.Constant) and not value.value)
+        return False
+
+class ShellCommandRule(CallRule):
+    """
+    Commands run through a shell by os.system and similar.
+    """
+    rule_id = 'B605'
+    names = frozenset({'os.system', 'os.popen', 'subprocess.getoutput', 'subprocess.getstatusoutput'})
+    message = "{name} runs its command through a shell"
+
+# Variable, argument and key names that hold credentials, as a whole name or as its
+# last underscore-separated part ('db_password', but not 'bypass').
+_SECRET_NAME = re.compile(r'(^|_)(pass(word|wd|phrase)?|pwd|secret|token|api_?key|access_?key|private_?key|'
+                          r'client_?secret|credentials?)$', re.IGNORECASE)
+
+# Values that are placeholders ('your_api_key_here', 'changeme'), numbers (a limit
+# such as MAX_TOKEN = "1024") or regular expressions describing a secret format
+# rather than a secret.
+_PLACEHOLDER = re.compile(r'^(your[_-].*|.*[_-]here|changeme|placeholder|x+|\*+)$', re.IGNORECASE)
+_NUMBER = re.compile(r'^[0-9]+(\.[0-9]+)?$')
+_REGEX_SYNTAX = re.compile(r'\[[^\]]+\][*+?{]|\(\?|\\[dDsSwWbB]|\{\d+(?:,\d*)?\}')
+
+def _is_secret_literal(node: ast.AST) -> bool:
+    # Empty strings and obvious placeholders are not secrets.
+    if not (isinstance(node, ast.Constant) and isinstance(node.value, str) and len(node.value) >= 4):
+        return False
+    value = node.value
+    return (not value.startswith(('<', '${', '{{', '%(')) and not _PLACEHOLDER.match(value)
+            and not _NUMBER.match(value) and not _REGEX_SYNTAX.search(value))
+
+def _target_name(node: ast.AST) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    if isinstance(node, ast.Subscript) and isinstance(node.slice, ast.Constant) and isinstance(node.slice.value, str):
+        return node.slice.value
+    return None
+
+class HardcodedSecretRule(NodeRule):
+    """
+    Flags string literals assigned to, passed as, used as default of or stored under
+    credential names.
+    """
+    rule_id = 'B105'
+    node_types = (ast.Assign, ast.AnnAssign, ast.keyword, ast.Dict, ast.Compare, ast.arguments)
+    message = "Possible hard-coded credential in '{name}'"
+    version = 2
+
+    def check(self, node, source):
+        pairs = []
+        if isinstance(node, ast.arguments):
+            # Defaults belong to the last positional parameters; kw_defaults has None
+            # for keyword-only parameters without a default.
+            positional = node.posonlyargs + node.args
+            pairs = [(argument.arg, default) for argument, default
+                     in zip(positional[len(positional) - len(node.defaults):], node.defaults)]
+            pairs += [(argument.arg, default) for argument, default in zip(node.kwonlyargs, node.kw_defaults)
+                      if default is not None]
+        elif isinstance(node, ast.Assign):
+            pairs = [(_target_name(target), node.value) for target in node.targets]
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            pairs = [(_target_name(node.target), node.value)]
+        elif isinstance(node, ast.keyword):
+            pairs = [(node.arg, node.value)]
+        elif isinstance(node, ast.Dict):
+            pairs = [(key.value, value) for key, value in zip(node.keys, node.values)
+                     if isinstance(key, ast.Constant) and isinstance(key.value, str)]
+        elif isinstance(node, ast.Compare) and len(node.comparators) == 1 and isinstance(node.ops[0], ast.Eq):
+            pairs = [(_target_name(node.left), node.comparators[0])]
+        for name, value in pairs:
+            if name and _SECRET_NAME.search(name) and _is_secret_literal(value):
+                yield self.finding(value.lineno, value.col_offset + 1, self.message.format(name=name))
+
+# Well-known secret formats, combined into one pattern so that a file is scanned once
+# regardless of the number of formats. Each format is a named group.
+SECRET_PATTERNS = {
+    'aws_access_key_id': r'(?:A3T[A-Z0-9]|AKIA|ASIA|ABIA|ACCA)[A-Z0-9]{16}',
+    'github_token': r'gh[pousr]_[A-Za-z0-9]{36,255}',
+    'github_fine_grained_token': r'github_pat_[A-Za-z0-9_]{82}',
+    'gitlab_token': r'glpat-[A-Za-z0-9_-]{20}',
+    'slack_token': r'xox[baprs]-[A-Za-z0-9-]{10,72}',
+    'slack_webhook': r'https://hooks\.slack\.com/services/T[A-Za-z0-9_]+/B[A-Za-z0-9_]+/[A-Za-z0-9_]+',
+    'stripe_secret_key': r'(?:sk|rk)_live_[A-Za-z0-9]{24,99}',
+    'google_api_key': r'AIza[0-9A-Za-z_-]{35}',
+    'openai_api_key': r'sk-(?:proj-)?[A-Za-z0-9_-]{20,}T3BlbkFJ[A-Za-z0-9_-]{20,}',
+    'private_key': r'-----BEGIN (?:RSA |EC |DSA |OPENSSH |PGP |ENCRYPTED )?PRIVATE KEY(?: BLOCK)?-----',
+    'json_web_token': r'eyJ[A-Za-z0-9_-]{10,}\.eyJ[A-Za-z0-9_-]{10,}\.[A-Za-z0-9_-]{10,}',
+}
+
+_SECRETS = re.compile('|'.join(f"(?P<{name}>{pattern})" for name, pattern in SECRET_PATTERNS.items()))
+
+def _redact(secret: str) -> str:
+    return f"{secret[:4]}...{secret[-2:]}" if len(secret) > 10 else '...'
+
+class SecretPatternRule(NodeRule):
+    """
+    Detects well-known secret formats anywhere in a file, including comments and
+    files that cannot be parsed.
+    """
+    rule_id = 'S100'
+
+    def check_source(self, source):
+        content = source.content
+        for match in _SECRETS.finditer(content):
+            start = match.start()
+            line_number = content.count('\n', 0, start) + 1
+            column_number = start - (content.rfind('\n', 0, start) + 1) + 1
+            yield self.finding(line_number, column_number,
+                               f"Possible {match.lastgroup.replace('_', ' ')}: {_redact(match.group())}", 'error')
+
+class ParseErrorRule(NodeRule):
+    """
+    Files that cannot be parsed, so that the AST rules could not check them.
+    """
+    rule_id = 'E999'
+
+    def check_source(self, source):
+        if source.tree is None:
+            error = source.syntax_error
+            message = getattr(error, 'msg', None) or str(error)
+            yield self.finding(getattr(error, 'lineno', None) or 1, getattr(error, 'offset', None) or 1,
+                               f"Not scanned by the AST rules: {type(error).__name__}: {message}", 'error')
+
+SECURITY_RULES = [PickleLoadRule(), EvalRule(), SubprocessShellRule(), ShellCommandRule(), HardcodedSecretRule(),
+                  SecretPatternRule(), ParseErrorRule()]
+
+register_analysis('security', rules_analysis('security', SECURITY_RULES))
+
+def scan_security(paths, workers: Optional[int] = None, cache_path: Optional[str] = None,
+                  use_cache: bool = True) -> List[Dict]:
+    """
+    Scans files and directories for security issues in parallel, with caching.
+
+    :param paths: A directory or file, or a list of them.
+    :param workers: Number of worker processes; defaults to the CPU count.
+    :param cache_path: Results store path; defaults to metrics_engine.default_cache_path().
+    :param use_cache: Whether results are cached by content hash.
+    :return: Findings with file_path, rule_id, line_number, column_number, message and severity.
+    """
+    driver = AnalysisDriver(['security'], cache_path, use_cache, workers)
+    findings = []
+    for results in driver.iter_results(paths):
+        findings.extend(dict({'file_path': results['file_path']}, **finding) for finding in results['security'])
+    findings.sort(key=lambda finding: (finding['file_path'], finding['line_number'], finding['column_number']))
+    return findings
+
+def analyze_security(file_path: str, **options) -> List[Dict]:
+    """
+    Scans a file (or a directory) for security issues.
+
+    :param file_path: File or directory to scan.
+    :param options: Options of scan_security.
+    :return: Findings, see scan_security.
+    """
+    return scan_security(file_path, **options)
+
+_SARIF_LEVELS = {'error': 'error', 'warning': 'warning', 'note': 'note'}
+
+def to_sarif(findings: List[Dict], base_path: Optional[str] = None) -> Dict:
+    """
+    Converts findings to a SARIF 2.1.0 log.
+
+    :param findings: Findings from scan_security.
+    :param base_path: Directory that artifact URIs are made relative to.
+    """
+    descriptions = {type(rule).__name__: rule for rule in SECURITY_RULES}
+    rules = [{'id': rule.rule_id, 'name': name, 'shortDescription': {'text': (rule.__doc__ or name).strip()}}
+             for name, rule in descriptions.items()]
+    results = []
+    for finding in findings:
+        uri = finding['file_path']
+        if base_path:
+            uri = os.path.relpath(uri, base_path)
+        results.append({
+            'ruleId': finding['rule_id'],
+            'level': _SARIF_LEVELS.get(finding['severity'], 'warning'),
+            'message': {'text': finding['message']},
+            'locations': [{'physicalLocation': {
+                'artifactLocation': {'uri': uri.replace(os.sep, '/')},
+                'region': {'startLine': finding['line_number'], 'startColumn': finding['column_number']},
+            }}],
+        })
+    return {
+        '$schema': 'https://json.schemastore.org/sarif-2.1.0.json',
+        'version': '2.1.0',
+        'runs': [{'tool': {'driver': {'name': 'analysis_tools.security_checks', 'rules': rules}},
+                  'results': results}],
+    }
+
+def write_findings(findings: List[Dict], output_path: str, output_format: str = 'sarif',
+                   base_path: Optional[str] = None):
+    """
+    Writes findings as a SARIF log or as JSON Lines (one finding per line).
+
+    :param findings: Findings from scan_security.
+    :param output_path: Output file.
+    :param output_format: 'sarif' or 'jsonl'.
+    :param base_path: Directory that SARIF artifact URIs are made relative to.
+    """
+    if output_format not in ('sarif', 'jsonl'):
+        raise ValueError(f"Unknown output format {output_format!r}, expected 'sarif' or 'jsonl'")
+    temporary_path = f"{output_path}.tmp"
+    with open(temporary_path, 'w') as file:
+        if output_format == 'sarif':
+            json.dump(to_sarif(findings, base_path), file, indent=2)
+        else:
+            for finding in findings:
+                file.write(json.dumps(finding) + '\n')
+    os.replace(temporary_path, output_path)
+    logger.info(f"Wrote {len(findings)} security findings to {output_path}")
+
+# Example usage
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    code_path = './path/to/your/code_directory'
+    write_findings(scan_security(code_path), 'security_findings.sarif', 'sarif', base_path=code_path)
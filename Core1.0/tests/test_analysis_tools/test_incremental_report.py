@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from analysis_tools.code_metrics import generate_summary_report
+
+BRANCHY = '''
+def branchy(x):
+    """Complexity above 10, so it appears in functions_with_high_complexity."""
+    total = 0
+    for i in range(x):
+        if i % 2:
+            total += 1
+        elif i % 3:
+            total += 2
+        elif i % 5:
+            total += 3
+        elif i % 7:
+            total += 4
+        elif i % 11:
+            total += 5
+        elif i % 13:
+            total += 6
+        elif i % 17:
+            total += 7
+        elif i % 19:
+            total += 8
+        elif i % 23:
+            total += 9
+    return total
+'''
+
+
+def _git(repository, *arguments):
+    subprocess.run(['git', '-c', 'user.name=test', '-c', 'user.email=test@example.com'] + list(arguments),
+                   cwd=repository, check=True, capture_output=True)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        file.write(content)
+
+
+def _without_git_entries(report):
+    return {key: value for key, value in report.items() if key not in ('base_revision', 'changed_files')}
+
+
+def test_incremental_report_equals_full_report(tmp_path):
+    repository = str(tmp_path / 'repository')
+    package = os.path.join(repository, 'pkg')
+    _write(os.path.join(package, 'edited.py'), 'import os\n\n\ndef f():\n    return 1\n')
+    _write(os.path.join(package, 'renamed.py'), '# Moved with git mv.\nVALUE = 2\n' + BRANCHY)
+    _write(os.path.join(package, 'deleted.py'), 'def g(a, b):\n    return a + b\n')
+    _write(os.path.join(package, 'sub', 'unchanged.py'), 'x = 1  # comment\ny = x+1\n')
+    _git(tmp_path, 'init', '-q', repository)
+    _git(repository, 'add', '.')
+    _git(repository, 'commit', '-q', '-m', 'base')
+
+    _write(os.path.join(package, 'edited.py'), 'def f():\n    """Docstring."""\n    return 2\n' + BRANCHY)
+    _git(repository, 'mv', 'pkg/renamed.py', 'pkg/sub/moved.py')
+    os.remove(os.path.join(package, 'deleted.py'))
+    _write(os.path.join(package, 'untracked.py'), 'def h():\n    pass\n')
+    _write(os.path.join(package, 'broken.py'), 'def broken(:\n    pass\n')
+
+    cache_path = str(tmp_path / 'results.sqlite')
+    full = generate_summary_report(package, workers=1, use_cache=False)
+    assert full['total_files_analyzed'] == 4
+    assert len(full['functions_with_high_complexity']) == 2
+    assert [file_path for file_path, _ in full['files_with_errors']] == [os.path.join(package, 'broken.py')]
+
+    # Absolute and relative spellings of the directory share one cached baseline.
+    relative = os.path.relpath(package)
+    for directory_path, expected in ((package, full),
+                                     (relative, generate_summary_report(relative, workers=1, use_cache=False))):
+        for _ in range(2):
+            incremental = generate_summary_report(directory_path, workers=1, cache_path=cache_path,
+                                                  base_revision='HEAD')
+            assert _without_git_entries(incremental) == expected
+    assert sorted(os.path.basename(path) for path in incremental['changed_files']) == \
+        ['broken.py', 'deleted.py', 'edited.py', 'moved.py', 'renamed.py', 'untracked.py']
@@ -0,0 +1,70 @@
+import os
+import sys
+
+from radon.complexity import cc_rank, cc_visit
+from radon.metrics import mi_visit
+from radon.raw import analyze as radon_analyze
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from analysis_tools import metrics_engine
+from analysis_tools.metrics_engine import (METRICS_ANALYSIS, ResultStore, iter_file_results, walk_files,
+                                          with_file_path)
+
+CORE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core')
+
+
+def _radon_metrics(file_path):
+    # Plain Radon, as code_metrics.analyze_file_with_radon computed it before the engine.
+    with open(file_path, 'r') as file:
+        content = file.read()
+    raw = radon_analyze(content)
+    return {
+        'file_path': file_path,
+        'total_lines': raw.loc,
+        'code_lines': raw.lloc,
+        'comment_lines': raw.comments,
+        'comment_density': raw.comments / raw.lloc if raw.lloc else 0,
+        'complexity_scores': [(fn.name, fn.complexity, cc_rank(fn.complexity)) for fn in cc_visit(content)],
+        'maintainability_index': mi_visit(content, raw.multi),
+    }
+
+
+def _engine_metrics(file_paths, **options):
+    return {results['file_path']: with_file_path(results['file_path'], results['metrics'])
+            for results in iter_file_results(file_paths, {'metrics': METRICS_ANALYSIS}, **options)}
+
+
+def test_metrics_equal_plain_radon(tmp_path):
+    file_paths = list(walk_files(CORE_DIR))
+    expected = {file_path: _radon_metrics(file_path) for file_path in file_paths}
+
+    store = ResultStore(str(tmp_path / 'results.sqlite'))
+    try:
+        # Small batches and two workers keep several batches in flight.
+        assert _engine_metrics(file_paths, store=store, workers=2, batch_size=2) == expected
+        # The second run is served from the cache.
+        assert _engine_metrics(file_paths, store=store, workers=2, batch_size=2) == expected
+    finally:
+        store.close()
+    assert _engine_metrics(file_paths, workers=1) == expected
+
+
+def test_files_are_read_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics_engine, 'LOOKUP_SIZE', 2)
+    for index in range(5):
+        (tmp_path / f"module_{index}.py").write_text(f"def f{index}(x):\n    return x + {index}\n")
+    read = []
+
+    def paths():
+        for file_path in walk_files(str(tmp_path)):
+            read.append(file_path)
+            yield file_path
+
+    results = iter_file_results(paths(), {'metrics': METRICS_ANALYSIS}, workers=1, batch_size=1)
+    assert read == []
+    first = next(results)
+    assert first['metrics']['code_lines'] == 2
+    assert len(read) < 5
+    assert len(list(results)) == 4
+    assert len(read) == 5
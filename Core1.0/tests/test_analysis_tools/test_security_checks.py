@@ -0,0 +1,41 @@
+import os
+import shutil
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from analysis_tools import perform_security_audit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def _audit(tmp_path, monkeypatch, *fixture_names):
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path / 'cache'))
+    code_dir = tmp_path / 'code'
+    code_dir.mkdir()
+    for name in fixture_names:
+        # Fixtures carry a .txt suffix so that scans of the repository skip them.
+        shutil.copy(os.path.join(FIXTURES_DIR, name), code_dir / name[:-len('.txt')])
+    return perform_security_audit(str(code_dir), workers=1)
+
+
+def test_every_rule_fires_on_its_marked_line(tmp_path, monkeypatch):
+    findings = _audit(tmp_path, monkeypatch, 'insecure_module.py.txt')
+
+    with open(os.path.join(FIXTURES_DIR, 'insecure_module.py.txt')) as file:
+        lines = file.read().splitlines()
+    expected = []
+    for line_number, line in enumerate(lines, 1):
+        if '  # ' in line and not line.startswith('#'):
+            marker = line.rsplit('  # ', 1)[1]
+            count = 2 if marker.endswith('twice') else 1
+            expected += [(line_number, marker.split()[0])] * count
+    found = [(finding['line_number'], finding['rule_id']) for finding in findings]
+    assert sorted(found) == sorted(expected)
+
+
+def test_unparseable_file_is_reported(tmp_path, monkeypatch):
+    findings = _audit(tmp_path, monkeypatch, 'unparseable_module.py.txt')
+
+    assert [(finding['rule_id'], finding['severity'], finding['line_number']) for finding in findings] == \
+        [('E999', 'error', 1)]
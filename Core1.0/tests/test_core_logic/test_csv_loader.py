@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core'))
+
+from csv_loader import load_csv
+
+
+def _write_table(path, n_rows=120000):
+    # Longer than the 100k-row inference sample; the last row does not fit the sample.
+    data = pd.DataFrame({
+        'count': np.arange(n_rows).astype(object),
+        'kind': np.where(np.arange(n_rows) % 2, 'a', 'b'),
+        'value': np.linspace(0, 1, n_rows),
+    })
+    data.loc[n_rows - 1, 'count'] = 2.5
+    data.to_csv(path, index=False)
+    return n_rows
+
+
+def test_value_past_sample_widens_only_its_column(tmp_path):
+    path = str(tmp_path / 'table.csv')
+    n_rows = _write_table(path)
+
+    for chunksize in (None, 50000):
+        data = load_csv(path, chunksize=chunksize)
+
+        assert len(data) == n_rows
+        assert data['count'].dtype == np.float32
+        assert data['count'].iloc[-1] == 2.5
+        assert isinstance(data['kind'].dtype, pd.CategoricalDtype)
+        assert data['value'].dtype == np.float32
@@ -0,0 +1,63 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core'))
+
+from interaction_log import InteractionLog, benchmark_appends, read_interactions
+
+
+def test_concurrent_writers_lose_no_records(tmp_path):
+    writers, records_per_writer = 8, 250
+    log = InteractionLog(str(tmp_path / 'interaction_log.json'), segment_size=4096, fsync=False)
+
+    def write(writer):
+        for index in range(records_per_writer):
+            log.append({'writer': writer, 'index': index})
+
+    threads = [threading.Thread(target=write, args=(writer,)) for writer in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    log.close()
+
+    records = list(read_interactions(log.log_path))
+    assert sorted((record['writer'], record['index']) for record in records) == [
+        (writer, index) for writer in range(writers) for index in range(records_per_writer)
+    ]
+    timestamps = [record['timestamp'] for record in records]
+    assert timestamps == sorted(timestamps)
+
+
+def test_concurrent_append_throughput():
+    results = benchmark_appends(writer_counts=(1, 8), records_per_writer=500, fsync=False)
+
+    for result in results:
+        assert result['appends_per_second'] > 1000
+
+
+def test_time_range_read_skips_nothing_in_range(tmp_path):
+    log = InteractionLog(str(tmp_path / 'interaction_log.json'), segment_size=64, fsync=False)
+    for index in range(50):
+        log.append({'index': index})
+    middle = time.time()
+    for index in range(50, 100):
+        log.append({'index': index})
+    log.close()
+
+    assert [record['index'] for record in read_interactions(log.log_path, start=middle)] == list(range(50, 100))
+
+
+def test_timestamps_are_coerced(tmp_path):
+    with InteractionLog(str(tmp_path / 'interaction_log.json'), fsync=False) as log:
+        log.append({'timestamp': '2024-01-01T00:00:00Z'})
+        log.append({'timestamp': 1704067201})
+        with pytest.raises(ValueError):
+            log.append({'timestamp': 'yesterday'})
+
+    records = list(read_interactions(log.log_path, start=1704067200.5))
+    assert [record['timestamp'] for record in records] == [1704067201.0]
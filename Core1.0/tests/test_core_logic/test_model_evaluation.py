@@ -0,0 +1,42 @@
+import os
+import shutil
+import sys
+
+import joblib
+import numpy as np
+import tensorflow as tf
+from sklearn.preprocessing import StandardScaler
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core'))
+
+from incremental_training import MODEL_FILENAME, SCALER_FILENAME
+from model_evaluation import HoldoutSnapshot, ModelRegistry, compare_to_champion
+
+
+def _save_version(registry, model, scaler):
+    version_dir = registry.new_version_dir()
+    model.save(os.path.join(version_dir, MODEL_FILENAME))
+    joblib.dump(scaler, os.path.join(version_dir, SCALER_FILENAME))
+    return version_dir
+
+
+def test_identical_models_are_scored_on_the_whole_holdout(tmp_path):
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(10000, 4)).astype(np.float32)
+    labels = (features[:, 0] > 0).astype(np.float32)
+    holdout = HoldoutSnapshot(features, labels, 'snapshot')
+    scaler = StandardScaler().fit(features)
+    model = tf.keras.Sequential([tf.keras.Input(shape=(4,)), tf.keras.layers.Dense(1, activation='sigmoid')])
+
+    registry = ModelRegistry(str(tmp_path / 'models'))
+    champion_dir = _save_version(registry, model, scaler)
+    registry.promote(champion_dir)
+    challenger_dir = registry.new_version_dir()
+    shutil.copytree(champion_dir, challenger_dir, dirs_exist_ok=True)
+
+    result = compare_to_champion(registry, challenger_dir, holdout)
+
+    # Agreement on the first batches is not evidence about the rest of the holdout.
+    assert result.examples_scored == result.holdout_size
+    assert result.difference == 0.0
+    assert result.promote
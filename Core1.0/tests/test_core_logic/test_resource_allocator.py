@@ -0,0 +1,46 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core'))
+
+from resource_allocator import Cluster, parse_quantity, parse_requirements
+
+
+def test_parse_quantity_units_are_case_sensitive():
+    assert parse_quantity("500m", scale=1000) == 500
+    assert parse_quantity("500M") == 500 * 10 ** 6
+    assert parse_quantity("4GB") == 4 * 10 ** 9
+    assert parse_quantity("512Mi") == 512 * 2 ** 20
+    assert parse_quantity("2k") == 2000
+    assert parse_quantity(0.1, scale=1000) == 100
+    assert parse_quantity(1.0001) == 2
+
+
+@pytest.mark.parametrize('value', ["4gb", "512mB", "1.5x", "", True])
+def test_parse_quantity_rejects_invalid_values(value):
+    with pytest.raises(ValueError):
+        parse_quantity(value)
+
+
+def test_cpu_is_parsed_in_millicores():
+    assert parse_requirements({'cpu': 0.5, 'memory': "1Gi"}) == {'cpu': 500, 'memory': 2 ** 30}
+    assert parse_requirements({'cpu': "250m"}) == {'cpu': 250}
+
+
+def test_half_core_jobs_share_a_core():
+    cluster = Cluster({'node-1': {'cpu': 1, 'memory': "2GB"}})
+
+    placements = cluster.allocate_batch([{'cpu': 0.5}, {'cpu': "500m"}, {'cpu': "1m"}])
+
+    assert placements[0] is not None and placements[1] is not None
+    assert placements[2] is None
+
+
+def test_parse_demand_drops_zero_amounts_and_rejects_unknown_dimensions():
+    cluster = Cluster({'node-1': {'cpu': 4, 'memory': "8GB"}})
+
+    assert cluster.parse_demand({'cpu': 1, 'gpu': 0}) == {'cpu': 1000}
+    with pytest.raises(ValueError):
+        cluster.parse_demand({'cpu': 1, 'gpu': 1})
@@ -0,0 +1,51 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core'))
+
+from streaming_preprocessor import preprocess_data_out_of_core
+
+
+def test_value_past_schema_sample_is_widened(tmp_path):
+    # Longer than the 100k-row inference sample; the last value does not fit Int64.
+    n_rows = 120000
+    data = pd.DataFrame({
+        'count': np.arange(n_rows).astype(object),
+        'value': np.linspace(0, 1, n_rows),
+        'label': np.arange(n_rows) % 2,
+    })
+    data.loc[n_rows - 1, 'count'] = 2.5
+    path = str(tmp_path / 'data.csv')
+    data.to_csv(path, index=False)
+
+    X_train, X_test, y_train, y_test, scaler = preprocess_data_out_of_core(path, str(tmp_path / 'out'),
+                                                                          chunksize=50000)
+
+    assert len(X_train) + len(X_test) == n_rows
+    assert X_train.shape[1] == 2
+    assert np.isfinite(X_train).all() and np.isfinite(X_test).all()
+    assert set(np.unique(y_train)) == {0, 1}
+
+
+def test_text_labels_are_encoded_as_codes(tmp_path):
+    n_rows = 1000
+    labels = np.where(np.arange(n_rows) % 3, 'yes', 'no')
+    data = pd.DataFrame({'value': np.arange(n_rows, dtype=float), 'label': labels})
+    path = str(tmp_path / 'data.csv')
+    data.to_csv(path, index=False)
+    output_dir = str(tmp_path / 'out')
+
+    X_train, X_test, y_train, y_test, scaler = preprocess_data_out_of_core(path, output_dir, chunksize=300)
+
+    with open(os.path.join(output_dir, 'label_classes.json')) as f:
+        classes = json.load(f)
+    assert classes == ['no', 'yes']
+    assert np.issubdtype(y_train.dtype, np.integer)
+    # Rows are restored to their original order through the unscaled feature values.
+    rows = np.rint(scaler.inverse_transform(np.concatenate([X_train, X_test]))[:, 0]).astype(int)
+    codes = np.concatenate([y_train, y_test])
+    assert [classes[code] for code in codes] == list(labels[rows])
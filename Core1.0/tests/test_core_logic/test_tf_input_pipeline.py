@@ -0,0 +1,32 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..', 'Core'))
+
+from tf_input_pipeline import make_array_dataset
+
+
+def _epoch_rows(dataset):
+    return np.concatenate([features[:, 0] for features, _ in dataset.as_numpy_iterator()]).astype(np.int64)
+
+
+def test_shuffled_epoch_returns_every_row_once():
+    n_rows = 4096
+    features = np.arange(n_rows, dtype=np.float32).reshape(-1, 1)
+    labels = np.arange(n_rows, dtype=np.float32)
+    dataset = make_array_dataset(features, labels, batch_size=4, shuffle_buffer=8, seed=0)
+
+    rows = _epoch_rows(dataset)
+
+    assert np.array_equal(np.sort(rows), np.arange(n_rows))
+
+
+def test_batches_keep_features_and_labels_aligned():
+    features = np.arange(100, dtype=np.float32).reshape(-1, 1)
+    labels = np.arange(100, dtype=np.float32)
+    dataset = make_array_dataset(features, labels, batch_size=7, shuffle_buffer=16, seed=1)
+
+    for X, y in dataset.as_numpy_iterator():
+        assert np.array_equal(X[:, 0], y)
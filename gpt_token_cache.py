@@ -0,0 +1,214 @@
+"""
+GPT Token Cache Module
+----------------------
+Tokenizes a training corpus once and stores it as fixed-length blocks of token IDs in
+a memory-mapped uint16 array, so later training runs read tokens from disk instead of
+re-tokenizing the corpus.
+
+The corpus is tokenized in batches with the fast (Rust) tokenizer, which encodes the
+documents of a batch in parallel. Documents are separated by the end-of-text token
+and packed into blocks of `block_size` tokens without padding; the trailing partial
+block is dropped. A cache entry is keyed by a hash of the corpus content, the
+tokenizer, the block size and the cleaning option, so a changed corpus or tokenizer
+produces a new entry rather than stale tokens.
+
+Cache layout:
+    <cache_dir>/<key>.bin   token IDs as uint16, n_blocks * block_size values
+    <cache_dir>/<key>.json  metadata (block size, block count, tokenizer, sources)
+"""
+
+import os
+import json
+import time
+import hashlib
+import tempfile
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+
+try:
+    import torch
+    from torch.utils.data import Dataset
+except ImportError:
+    torch = None
+    Dataset = object
+
+from gpt_text_preprocessing import clean_texts
+
+# uint16 holds token IDs of vocabularies with up to 65536 entries (GPT-2 has 50257).
+TOKEN_DTYPE = np.uint16
+
+def _tokenizer_signature(tokenizer) -> str:
+    backend = getattr(tokenizer, 'backend_tokenizer', None)
+    if backend is not None:
+        # Serialized vocabulary, merges, normalizer and pre-tokenizer.
+        return backend.to_str()
+    return json.dumps({'name': getattr(tokenizer, 'name_or_path', type(tokenizer).__name__),
+                       'vocab_size': len(tokenizer)}, sort_keys=True)
+
+def cache_key(paths: List[str], tokenizer, block_size: int, clean: bool) -> str:
+    """
+    Hashes the corpus files, the tokenizer and the packing options into a cache key.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(json.dumps({'block_size': block_size, 'clean': clean, 'dtype': 'uint16'}).encode('utf-8'))
+    digest.update(_tokenizer_signature(tokenizer).encode('utf-8'))
+    for path in paths:
+        file_digest = hashlib.blake2b(digest_size=16)
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b''):
+                file_digest.update(chunk)
+        digest.update(file_digest.digest())
+    return digest.hexdigest()
+
+def _read_batches(paths: List[str], batch_size: int) -> Iterator[List[str]]:
+    # Every line is a document; empty lines are skipped.
+    batch = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if line.strip():
+                    batch.append(line)
+                    if len(batch) == batch_size:
+                        yield batch
+                        batch = []
+    if batch:
+        yield batch
+
+def _pack(batches: Iterable[List[str]], tokenizer, block_size: int, clean: bool, output_file) -> int:
+    """
+    Tokenizes batches of documents and writes whole blocks of tokens to a file.
+
+    Returns:
+        Number of blocks written.
+    """
+    eos_token_id = tokenizer.eos_token_id
+    pending = np.empty(0, dtype=TOKEN_DTYPE)
+    n_blocks = 0
+    for batch in batches:
+        if clean:
+            batch = clean_texts(batch)
+        encoded = tokenizer(batch, add_special_tokens=False, return_attention_mask=False)['input_ids']
+        ids = []
+        for document in encoded:
+            ids.extend(document)
+            ids.append(eos_token_id)
+        tokens = np.concatenate([pending, np.asarray(ids, dtype=TOKEN_DTYPE)])
+        usable = len(tokens) - len(tokens) % block_size
+        tokens[:usable].tofile(output_file)
+        pending = tokens[usable:]
+        n_blocks += usable // block_size
+    return n_blocks
+
+def build_token_cache(paths: List[str], tokenizer, cache_dir: str, block_size: int = 1024, clean: bool = True,
+                      batch_size: int = 1000) -> Dict:
+    """
+    Returns the metadata of the cache entry of a corpus, tokenizing it if needed.
+
+    Args:
+        paths: Text files of the corpus, one document per line.
+        tokenizer: Fast Hugging Face tokenizer, e.g. GPT2TokenizerFast.
+        cache_dir: Directory of the cache.
+        block_size: Tokens per training example.
+        clean: Whether documents are passed through gpt_text_preprocessing.clean_texts.
+        batch_size: Documents tokenized per batch.
+
+    Raises:
+        ValueError: If the corpus is shorter than one block; nothing is cached then.
+    """
+    if len(tokenizer) > np.iinfo(TOKEN_DTYPE).max + 1:
+        raise ValueError(f"Vocabulary of {len(tokenizer)} tokens does not fit in uint16 token IDs")
+    if not getattr(tokenizer, 'is_fast', False):
+        print("Warning: slow tokenizer in use; load a fast tokenizer (e.g. GPT2TokenizerFast) to tokenize in parallel.")
+    paths = sorted(paths)
+    key = cache_key(paths, tokenizer, block_size, clean)
+    data_path = os.path.join(cache_dir, f"{key}.bin")
+    meta_path = os.path.join(cache_dir, f"{key}.json")
+    if os.path.exists(meta_path) and os.path.exists(data_path):
+        with open(meta_path, 'r') as file:
+            return json.load(file)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    start = time.perf_counter()
+    descriptor, temporary_path = tempfile.mkstemp(dir=cache_dir, suffix='.bin.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as output_file:
+            n_blocks = _pack(_read_batches(paths, batch_size), tokenizer, block_size, clean, output_file)
+        if n_blocks == 0:
+            raise ValueError(f"The corpus has fewer than block_size={block_size} tokens; no block can be built")
+        os.replace(temporary_path, data_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    meta = {
+        'key': key,
+        'data_path': data_path,
+        'block_size': block_size,
+        'n_blocks': n_blocks,
+        'dtype': 'uint16',
+        'tokenizer': getattr(tokenizer, 'name_or_path', type(tokenizer).__name__),
+        'clean': clean,
+        'sources': paths,
+        'tokenize_seconds': time.perf_counter() - start,
+    }
+    # The metadata is written last, so an entry without it is never used.
+    temporary_meta = f"{meta_path}.tmp"
+    with open(temporary_meta, 'w') as file:
+        json.dump(meta, file, indent=4)
+    os.replace(temporary_meta, meta_path)
+    print(f"Tokenized {n_blocks * block_size:,} tokens into {n_blocks:,} blocks in {meta['tokenize_seconds']:.1f}s")
+    return meta
+
+class TokenBlockDataset(Dataset):
+    """
+    Training examples read from a token cache entry through a memory map.
+
+    Blocks are read lazily from the page cache, so the dataset opens instantly and
+    can be shared by dataloader workers without copying the corpus.
+    """
+
+    def __init__(self, meta: Dict):
+        self.meta = meta
+        self.block_size = meta['block_size']
+        self._tokens = None
+
+    @property
+    def tokens(self) -> np.ndarray:
+        # Opened on first access, so every dataloader worker maps the file itself.
+        if self._tokens is None:
+            self._tokens = np.memmap(self.meta['data_path'], dtype=TOKEN_DTYPE, mode='r',
+                                     shape=(self.meta['n_blocks'], self.block_size))
+        return self._tokens
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_tokens'] = None
+        return state
+
+    def __len__(self) -> int:
+        return self.meta['n_blocks']
+
+    def __getitem__(self, index: int) -> Dict:
+        input_ids = torch.from_numpy(self.tokens[index].astype(np.int64))
+        return {'input_ids': input_ids, 'labels': input_ids.clone()}
+
+def load_token_dataset(paths: List[str], tokenizer, cache_dir: str, block_size: int = 1024, clean: bool = True,
+                       batch_size: int = 1000) -> TokenBlockDataset:
+    """
+    Returns the training dataset of a corpus, tokenizing it only when it is not cached.
+
+    Packed blocks have equal lengths, so the dataset works with Trainer's default
+    data collator; GPT-2 shifts the labels internally.
+    """
+    if torch is None:
+        raise ImportError("load_token_dataset requires the 'torch' package")
+    meta = build_token_cache(paths, tokenizer, cache_dir, block_size, clean, batch_size)
+    return TokenBlockDataset(meta)
+
+# Example usage
+if __name__ == "__main__":
+    from transformers import GPT2TokenizerFast
+    corpus_paths = ["/path/to/corpus.txt"]  # Example path
+    cache_directory = "/path/to/token_cache"  # Example path
+    train_dataset = load_token_dataset(corpus_paths, GPT2TokenizerFast.from_pretrained('gpt2'), cache_directory)
+    print(f"{len(train_dataset)} blocks of {train_dataset.block_size} tokens")
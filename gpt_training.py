@@ -0,0 +1,303 @@
+"""
+GPT Training Module
+-------------------
+Training entry point for the QuantumHybridGPT notebook, tuned for CPU-only hosts.
+
+Two input modes are supported:
+- 'packed': the corpus is tokenized once into fixed-length blocks (gpt_token_cache),
+  so no step computes attention over padding.
+- 'dynamic': every document is an example, batches are padded to their longest
+  document and documents of similar length are batched together (group_by_length).
+
+The effective batch is per_device_train_batch_size * gradient_accumulation_steps,
+so larger effective batches fit in memory. Torch intra-op threads default to the
+physical core count left over by the dataloader workers, and bf16 autocast is
+enabled when the CPU has native bf16 instructions (AVX512-BF16 or AMX).
+ThroughputCallback adds tokens per second and the main process's peak memory to
+the training logs.
+"""
+
+import os
+import time
+import resource
+from typing import Dict, List, Optional
+
+import torch
+from transformers import (DataCollatorForLanguageModeling, GPT2LMHeadModel, GPT2TokenizerFast, Trainer,
+                          TrainerCallback, TrainingArguments, default_data_collator)
+
+from gpt_text_preprocessing import clean_texts
+from gpt_token_cache import load_token_dataset
+
+def physical_core_count() -> int:
+    """
+    Returns the number of physical CPU cores, falling back to the logical CPU count.
+    """
+    try:
+        cores = set()
+        with open('/proc/cpuinfo') as file:
+            physical_id = core_id = None
+            for line in file:
+                if line.startswith('physical id'):
+                    physical_id = line.split(':')[1].strip()
+                elif line.startswith('core id'):
+                    core_id = line.split(':')[1].strip()
+                elif not line.strip() and core_id is not None:
+                    cores.add((physical_id, core_id))
+                    physical_id = core_id = None
+        if cores:
+            return len(cores)
+    except OSError:
+        pass
+    return os.cpu_count() or 1
+
+def cpu_supports_bf16() -> bool:
+    """
+    Checks whether the CPU has native bf16 instructions; without them bf16 is emulated
+    and slower than fp32.
+    """
+    try:
+        with open('/proc/cpuinfo') as file:
+            for line in file:
+                if line.startswith('flags'):
+                    flags = set(line.split(':')[1].split())
+                    return bool(flags & {'avx512_bf16', 'amx_bf16'})
+    except OSError:
+        pass
+    return False
+
+def configure_torch_threads(num_threads: Optional[int] = None, dataloader_num_workers: int = 0,
+                            interop_threads: int = 1) -> int:
+    """
+    Sets the torch thread pools for training.
+
+    Args:
+        num_threads: Intra-op threads; defaults to the physical cores not used by
+            dataloader workers. Hyper-threads slow down matrix multiplications.
+        dataloader_num_workers: Number of dataloader worker processes.
+        interop_threads: Inter-op threads; must be set before torch runs any work.
+
+    Returns:
+        The number of intra-op threads.
+    """
+    if num_threads is None:
+        num_threads = max(1, physical_core_count() - dataloader_num_workers)
+    torch.set_num_threads(num_threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Already set, or torch has already started parallel work in this process.
+        pass
+    return num_threads
+
+def _peak_memory_mb() -> float:
+    # Peak resident memory of this process only: dataloader workers are live child
+    # processes, which neither RUSAGE_SELF nor RUSAGE_CHILDREN (reaped children only)
+    # covers. ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if os.uname().sysname == 'Darwin' else peak / 1024
+
+class ThroughputCallback(TrainerCallback):
+    """
+    Measures tokens per second and peak memory of every optimizer step.
+
+    Token counts come from Trainer's num_input_tokens_seen (enabled with
+    include_num_input_tokens_seen); without it they are estimated from
+    `tokens_per_step`. Per-step measurements are kept in `history` and their averages
+    since the previous log are added to the training logs.
+
+    Peak memory is that of the training process alone, as
+    'main_process_peak_memory_mb'; the memory of dataloader worker processes
+    (dataloader_num_workers) is not included.
+    """
+
+    def __init__(self, tokens_per_step: Optional[int] = None):
+        self.tokens_per_step = tokens_per_step
+        self.history = []
+        self._step_start = None
+        self._tokens_at_start = 0
+        self._logged = 0
+
+    def on_step_begin(self, args, state, control, **kwargs):
+        self._step_start = time.perf_counter()
+        self._tokens_at_start = getattr(state, 'num_input_tokens_seen', 0)
+
+    def on_step_end(self, args, state, control, **kwargs):
+        if self._step_start is None:
+            return
+        seconds = time.perf_counter() - self._step_start
+        tokens = getattr(state, 'num_input_tokens_seen', 0) - self._tokens_at_start
+        if tokens <= 0 and self.tokens_per_step:
+            tokens = self.tokens_per_step
+        self.history.append({
+            'step': state.global_step,
+            'seconds': seconds,
+            'tokens': tokens,
+            'tokens_per_second': tokens / seconds if seconds > 0 else 0.0,
+            'main_process_peak_memory_mb': _peak_memory_mb(),
+        })
+
+    def on_log(self, args, state, control, logs=None, **kwargs):
+        steps = self.history[self._logged:]
+        if logs is None or not steps:
+            return
+        self._logged = len(self.history)
+        seconds = sum(step['seconds'] for step in steps)
+        logs['tokens_per_second'] = round(sum(step['tokens'] for step in steps) / seconds, 1) if seconds else 0.0
+        logs['main_process_peak_memory_mb'] = round(steps[-1]['main_process_peak_memory_mb'], 1)
+
+    def summary(self) -> Dict:
+        """
+        Returns the overall throughput and peak memory of the run.
+        """
+        seconds = sum(step['seconds'] for step in self.history)
+        tokens = sum(step['tokens'] for step in self.history)
+        return {
+            'steps': len(self.history),
+            'tokens': tokens,
+            'tokens_per_second': tokens / seconds if seconds else 0.0,
+            'main_process_peak_memory_mb': max((step['main_process_peak_memory_mb'] for step in self.history),
+                                               default=0.0),
+        }
+
+class DocumentDataset(torch.utils.data.Dataset):
+    """
+    One tokenized document per example, for dynamic padding.
+
+    Unlike the packed mode, the corpus is tokenized again on every run (there is no
+    token cache), and all token IDs are held in memory as Python lists of ints, about
+    40 bytes per token. For corpora that do not fit comfortably in memory, use the
+    packed mode, which tokenizes once and memory-maps the cached tokens.
+    """
+
+    def __init__(self, paths: List[str], tokenizer, max_length: int = 1024, clean: bool = True,
+                 batch_size: int = 1000):
+        self.examples = []
+        batch = []
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as file:
+                for line in file:
+                    if not line.strip():
+                        continue
+                    batch.append(line)
+                    if len(batch) == batch_size:
+                        self._add(batch, tokenizer, max_length, clean)
+                        batch = []
+        if batch:
+            self._add(batch, tokenizer, max_length, clean)
+
+    def _add(self, batch: List[str], tokenizer, max_length: int, clean: bool):
+        if clean:
+            batch = clean_texts(batch)
+        encoded = tokenizer(batch, truncation=True, max_length=max_length, return_attention_mask=False)
+        self.examples.extend({'input_ids': ids} for ids in encoded['input_ids'] if ids)
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    def __getitem__(self, index: int) -> Dict:
+        return self.examples[index]
+
+def build_training_arguments(output_dir: str, num_train_epochs: float = 3, per_device_train_batch_size: int = 8,
+                             gradient_accumulation_steps: int = 4, dataloader_num_workers: int = 2,
+                             bf16: Optional[bool] = None, group_by_length: bool = False,
+                             **overrides) -> TrainingArguments:
+    """
+    Builds TrainingArguments for CPU training.
+
+    Args:
+        output_dir: Checkpoint directory.
+        num_train_epochs: Number of epochs.
+        per_device_train_batch_size: Examples per forward/backward pass.
+        gradient_accumulation_steps: Passes accumulated per optimizer step.
+        dataloader_num_workers: Worker processes preparing batches in parallel with training.
+        bf16: Whether to train with bf16 autocast; defaults to cpu_supports_bf16().
+        group_by_length: Whether to batch examples of similar length (dynamic padding).
+        **overrides: Further TrainingArguments, e.g. warmup_steps or logging_steps.
+    """
+    if bf16 is None:
+        bf16 = cpu_supports_bf16() and not torch.cuda.is_available()
+    options = dict(
+        output_dir=output_dir,
+        num_train_epochs=num_train_epochs,
+        per_device_train_batch_size=per_device_train_batch_size,
+        gradient_accumulation_steps=gradient_accumulation_steps,
+        dataloader_num_workers=dataloader_num_workers,
+        dataloader_persistent_workers=dataloader_num_workers > 0,
+        dataloader_drop_last=True,
+        group_by_length=group_by_length,
+        bf16=bf16,
+        include_num_input_tokens_seen=True,
+        warmup_steps=500,
+        weight_decay=0.01,
+        logging_dir=os.path.join(output_dir, 'logs'),
+        logging_steps=10,
+        save_strategy='epoch',
+        report_to=[],
+    )
+    options.update(overrides)
+    return TrainingArguments(**options)
+
+def train_gpt(corpus_paths: List[str], output_dir: str, model_name: str = 'gpt2', mode: str = 'packed',
+              block_size: int = 1024, cache_dir: str = './token_cache', num_threads: Optional[int] = None,
+              clean: bool = True, **training_options) -> Dict:
+    """
+    Fine-tunes a GPT-2 model on a text corpus and saves it to output_dir.
+
+    Args:
+        corpus_paths: Text files, one document per line.
+        output_dir: Directory for checkpoints and the final model.
+        model_name: Pretrained model and tokenizer name or path.
+        mode: 'packed' for cached fixed-length blocks, 'dynamic' for per-batch padding.
+        block_size: Block length in packed mode, maximum document length in dynamic mode.
+        cache_dir: Token cache directory for packed mode.
+        num_threads: Torch intra-op threads, see configure_torch_threads.
+        clean: Whether documents are cleaned with gpt_text_preprocessing first.
+        **training_options: Options of build_training_arguments.
+
+    Returns:
+        Training metrics, including tokens_per_second and main_process_peak_memory_mb.
+    """
+    if mode not in ('packed', 'dynamic'):
+        raise ValueError(f"Unknown mode {mode!r}, expected 'packed' or 'dynamic'")
+    dataloader_num_workers = training_options.get('dataloader_num_workers', 2)
+    threads = configure_torch_threads(num_threads, dataloader_num_workers)
+
+    tokenizer = GPT2TokenizerFast.from_pretrained(model_name)
+    tokenizer.pad_token = tokenizer.eos_token
+    model = GPT2LMHeadModel.from_pretrained(model_name)
+
+    if mode == 'packed':
+        train_dataset = load_token_dataset(corpus_paths, tokenizer, cache_dir, block_size, clean)
+        data_collator = default_data_collator
+    else:
+        train_dataset = DocumentDataset(corpus_paths, tokenizer, block_size, clean)
+        # Padding to a multiple of 8 keeps matrix shapes friendly to vectorized kernels.
+        data_collator = DataCollatorForLanguageModeling(tokenizer, mlm=False, pad_to_multiple_of=8)
+        training_options.setdefault('group_by_length', True)
+
+    training_args = build_training_arguments(output_dir, **training_options)
+    tokens_per_step = None
+    if mode == 'packed':
+        tokens_per_step = block_size * training_args.per_device_train_batch_size * training_args.gradient_accumulation_steps
+    throughput = ThroughputCallback(tokens_per_step)
+    trainer = Trainer(
+        model=model,
+        args=training_args,
+        data_collator=data_collator,
+        train_dataset=train_dataset,
+        callbacks=[throughput],
+    )
+    print(f"Training on {len(train_dataset)} examples ({mode}) with {threads} torch threads, "
+          f"{dataloader_num_workers} dataloader workers, bf16={training_args.bf16}")
+    result = trainer.train()
+    trainer.save_model(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    metrics = dict(result.metrics)
+    metrics.update(throughput.summary())
+    return metrics
+
+# Example usage
+if __name__ == "__main__":
+    corpus = ["/path/to/corpus.txt"]  # Example path
+    print(train_gpt(corpus, './results', mode='packed', per_device_train_batch_size=8, gradient_accumulation_steps=4))